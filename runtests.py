@@ -90,6 +90,7 @@ def runtests():
     if args.bench:
         benchmarks = [
             "wagtail.admin.tests.benches",
+            "wagtail.images.tests.benches",
         ]
 
         argv = [sys.argv[0], "test", "-v2"] + benchmarks + rest
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Category, Video
+from .media import segment_media_file
+from .models import Category, MediaFile, Video
 
 
 @admin.register(Category)
@@ -16,6 +17,20 @@ class CategoryAdmin(admin.ModelAdmin):
     video_count.short_description = 'Videos'
 
 
+@admin.register(MediaFile)
+class MediaFileAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'content_type', 'file_size', 'segment_status', 'segment_count', 'created_at']
+    list_filter = ['segment_status', 'content_type']
+    search_fields = ['title', 'file']
+    readonly_fields = ['file_size', 'file_hash', 'segment_count']
+    actions = ['segment_for_hls']
+    
+    @admin.action(description='Segment selected files for HLS streaming')
+    def segment_for_hls(self, request, queryset):
+        segmented = sum(1 for media_file in queryset if segment_media_file(media_file))
+        self.message_user(request, f'Segmented {segmented} of {queryset.count()} media files.')
+
+
 @admin.register(Video)
 class VideoAdmin(admin.ModelAdmin):
     list_display = [
@@ -33,6 +48,7 @@ class VideoAdmin(admin.ModelAdmin):
     search_fields = ['title', 'description', 'director', 'cast', 'tags']
     prepopulated_fields = {'slug': ('title',)}
     filter_horizontal = ['categories']
+    raw_id_fields = ['video_file', 'trailer_file']
     list_editable = ['is_featured', 'is_active']
     
     fieldsets = (
@@ -40,7 +56,7 @@ class VideoAdmin(admin.ModelAdmin):
             'fields': ('title', 'slug', 'description', 'video_type')
         }),
         ('Media Files', {
-            'fields': ('thumbnail', 'hero_image', 'video_url', 'trailer_url')
+            'fields': ('thumbnail', 'hero_image', 'video_url', 'video_file', 'trailer_url', 'trailer_file')
         }),
         ('Metadata', {
             'fields': ('year', 'duration_minutes', 'rating_percentage', 'age_rating')
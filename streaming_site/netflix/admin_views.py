@@ -1,10 +1,12 @@
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
-from django.db.models import Sum, Count, Q
+from django.core.paginator import Paginator
+from django.db.models import Sum, Count
 from django.utils import timezone
 from datetime import timedelta
 from .models import Video, Category
+from .pagination import DEFAULT_PER_PAGE, estimate_count, keyset_page
 from django.contrib.auth.models import User
 
 
@@ -55,32 +57,43 @@ def admin_dashboard(request):
 @login_required
 @user_passes_test(is_staff_user)
 def admin_video_list(request):
-    """List all videos with search and filter"""
+    """List all videos with search and filter, one page at a time"""
     
     query = request.GET.get('q', '')
     category_filter = request.GET.get('category', '')
     type_filter = request.GET.get('type', '')
     
-    videos = Video.objects.all().order_by('-created_at')
+    # Only the columns shown in the table
+    videos = Video.objects.only(
+        'id', 'title', 'thumbnail', 'video_type', 'year', 'rating_percentage',
+        'view_count', 'is_featured', 'is_active', 'created_at',
+    )
     
-    if query:
+    if category_filter.isdigit():
+        # A subquery on the join table's category_id index, so that it can
+        # also filter search results
         videos = videos.filter(
-            Q(title__icontains=query) |
-            Q(description__icontains=query) |
-            Q(director__icontains=query) |
-            Q(cast__icontains=query)
+            pk__in=Video.categories.through.objects.filter(category_id=category_filter).values('video_id')
         )
     
-    if category_filter:
-        videos = videos.filter(categories__slug=category_filter)
-    
     if type_filter:
         videos = videos.filter(video_type=type_filter)
     
+    if query:
+        # Full-text search through the search backend, best matches first.
+        # Relevance has no stable key to seek from, so results use page numbers.
+        page = Paginator(videos.search(query), DEFAULT_PER_PAGE).get_page(request.GET.get('page'))
+        video_count, count_is_exact = page.paginator.count, True
+    else:
+        page = keyset_page(videos, request.GET.get('cursor'))
+        video_count, count_is_exact = estimate_count(videos)
+    
     all_categories = Category.objects.filter(is_active=True)
     
     context = {
-        'videos': videos,
+        'videos': page,
+        'video_count': video_count,
+        'count_is_exact': count_is_exact,
         'all_categories': all_categories,
         'query': query,
         'category_filter': category_filter,
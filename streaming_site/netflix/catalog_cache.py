@@ -0,0 +1,69 @@
+"""
+Versioned cache for catalog-derived data (home page blocks and pages).
+
+Every cache key embeds a catalog generation number, which is bumped by
+signal handlers whenever a ``Video`` or ``Category`` is saved or deleted, or
+a video's categories change. Bumping the generation makes every older entry
+unreachable at once, so nothing needs to be deleted explicitly; stale entries
+simply expire.
+
+The generation lives in the configured cache backend, so with a shared cache
+(Redis, Memcached) an edit made through the content manager in one worker
+process invalidates the cached pages of all of them.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+GENERATION_KEY = 'netflix:catalog-generation'
+
+
+def get_cache():
+    return caches[getattr(settings, 'NETFLIX_CATALOG_CACHE_ALIAS', 'default')]
+
+
+def get_timeout():
+    return getattr(settings, 'NETFLIX_CATALOG_CACHE_TIMEOUT', 300)
+
+
+def get_generation():
+    """Return the current catalog generation"""
+    cache = get_cache()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # Start from the clock rather than 1, so a generation that was evicted
+        # from the cache never comes back with a number that was already used
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def bump_generation():
+    """Invalidate everything cached against the current catalog"""
+    cache = get_cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        # Key missing (never set, or evicted)
+        cache.set(GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+def make_key(*parts, generation=None):
+    if generation is None:
+        generation = get_generation()
+    return ':'.join(['netflix:catalog', str(generation), *map(str, parts)])
+
+
+def get_or_build(name, builder, generation=None):
+    """
+    Return the cached value for ``name`` in the current catalog generation,
+    calling ``builder()`` and caching its result on a miss.
+    """
+    cache = get_cache()
+    key = make_key('block', name, generation=generation)
+    value = cache.get(key)
+    if value is None:
+        value = builder()
+        cache.set(key, value, get_timeout())
+    return value
@@ -0,0 +1,169 @@
+import random
+import statistics
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from netflix.models import CARD_FIELDS, Category, Video, VideoCard
+from netflix.pagination import keyset_page
+from netflix.rails import browse_rails, home_rails
+from netflix.views import NetflixHomeView
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Print EXPLAIN output and timings for the queries behind each video view, '
+        'against a synthetic catalog that is rolled back afterwards'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--videos', type=int, default=100000, help='Number of synthetic videos to generate')
+        parser.add_argument('--categories', type=int, default=12, help='Number of synthetic categories')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per query')
+        parser.add_argument(
+            '--existing', action='store_true',
+            help='Benchmark the existing catalog instead of generating one',
+        )
+        parser.add_argument('--no-explain', action='store_true', help='Only print timings')
+
+    def handle(self, *args, **options):
+        self.repeat = options['repeat']
+        self.explain = not options['no_explain']
+
+        if options['existing']:
+            self.run_benchmarks()
+            return
+
+        try:
+            with transaction.atomic():
+                self.generate_catalog(options['videos'], options['categories'])
+                self.run_benchmarks()
+                raise Rollback
+        except Rollback:
+            self.stdout.write('Synthetic catalog rolled back')
+
+    def generate_catalog(self, video_count, category_count):
+        self.stdout.write(f'Generating {video_count} videos in {category_count} categories...')
+        started = time.perf_counter()
+        rng = random.Random(0)
+        prefix = uuid.uuid4().hex[:8]
+        now = timezone.now()
+
+        categories = Category.objects.bulk_create([
+            Category(name=f'Benchmark {prefix} {index}', slug=f'benchmark-{prefix}-{index}', order=100 + index)
+            for index in range(category_count)
+        ])
+        video_types = [choice for choice, _ in Video.VIDEO_TYPE_CHOICES]
+
+        batch_size = 5000
+        for offset in range(0, video_count, batch_size):
+            videos = Video.objects.bulk_create([
+                Video(
+                    title=f'Benchmark video {index}',
+                    slug=f'benchmark-{prefix}-{index}',
+                    description='Synthetic video for query benchmarks',
+                    video_type=rng.choice(video_types),
+                    thumbnail='https://example.com/thumbnail.jpg',
+                    video_url='https://example.com/video.mp4',
+                    year=rng.randint(1950, 2026),
+                    duration_minutes=rng.randint(5, 180),
+                    rating_percentage=rng.randint(0, 100),
+                    is_featured=rng.random() < 0.001,
+                    is_active=rng.random() < 0.95,
+                    view_count=int(rng.paretovariate(1.2) * 10),
+                )
+                for index in range(offset, min(offset + batch_size, video_count))
+            ])
+            VideoCard.objects.bulk_create([
+                VideoCard(video_id=video.pk, **{field: getattr(video, field) for field in CARD_FIELDS})
+                for video in videos
+            ])
+            Video.categories.through.objects.bulk_create([
+                Video.categories.through(video_id=video.pk, category_id=category.pk)
+                for video in videos
+                for category in rng.sample(categories, rng.randint(1, 3))
+            ])
+
+        # created_at is auto_now_add, so spread the new rows over two years afterwards
+        video_ids = Video.objects.filter(slug__startswith=f'benchmark-{prefix}-').values_list('pk', flat=True)
+        first_id, last_id = min(video_ids), max(video_ids)
+        days = 730
+        step = max((last_id - first_id + 1) // days, 1)
+        for day in range(days):
+            start = first_id + day * step
+            Video.objects.filter(pk__gte=start, pk__lt=start + step).update(
+                created_at=now - timedelta(days=days - day)
+            )
+
+        if connection.vendor in ('postgresql', 'sqlite'):
+            # Refresh the planner statistics so that EXPLAIN reflects the new rows
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        self.stdout.write(f'Generated in {time.perf_counter() - started:.1f}s')
+
+    def get_benchmarks(self):
+        home = NetflixHomeView()
+        video = Video.objects.filter(is_active=True).order_by('-view_count').first()
+        if video is not None:
+            category_ids = list(video.categories.values_list('id', flat=True))
+        admin_videos = Video.objects.only('id', 'title', 'created_at')
+
+        benchmarks = [
+            ('home: featured', home.get_featured_context),
+            ('home: rails', lambda: home_rails(limit=6)),
+            ('home: AI recommendations', home.get_ai_recommendations_context),
+        ]
+        for filter_type in [None, 'movie', 'series', 'documentary', 'new', 'mylist']:
+            benchmarks.append((f'browse: {filter_type or "all"}', lambda filter_type=filter_type: browse_rails(filter_type)))
+        if video is not None:
+            benchmarks.append(('player: recommended', lambda: list(
+                Video.objects.filter(categories__in=category_ids, is_active=True)
+                .exclude(id=video.id).distinct().cards()[:3]
+            )))
+        benchmarks += [
+            ('content manager: first page', lambda: keyset_page(admin_videos)),
+            ('content manager: by type', lambda: keyset_page(admin_videos.filter(video_type='movie'))),
+            ('recommendation engine build', lambda: list(
+                Video.objects.filter(is_active=True).order_by('-created_at', 'id')
+                .values_list('id', 'rating_percentage', 'view_count', 'created_at')
+            )),
+        ]
+        return benchmarks
+
+    def run_benchmarks(self):
+        for name, func in self.get_benchmarks():
+            with CaptureQueriesContext(connection) as queries:
+                func()
+
+            timings = []
+            for _ in range(self.repeat):
+                started = time.perf_counter()
+                func()
+                timings.append((time.perf_counter() - started) * 1000)
+
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(
+                f'  {len(queries)} queries, best {min(timings):.2f}ms, '
+                f'median {statistics.median(timings):.2f}ms over {self.repeat} runs'
+            )
+            if self.explain:
+                for query in queries:
+                    self.write_plan(query['sql'])
+
+    def write_plan(self, sql):
+        self.stdout.write(f'  {sql}')
+        with connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}')
+            for row in cursor.fetchall():
+                # SQLite's EXPLAIN QUERY PLAN rows are (id, parent, notused, detail)
+                self.stdout.write(f'    {row[-1]}')
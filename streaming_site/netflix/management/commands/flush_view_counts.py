@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from netflix.view_counters import CacheViewCounter, get_view_counter
+
+
+class Command(BaseCommand):
+    help = (
+        'Write buffered video view counts to the database. Only works with '
+        'CacheViewCounter, as other processes can\'t reach the buffer of an '
+        'InMemoryViewCounter'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='Only report buffered-vs-flushed metrics, without flushing',
+        )
+
+    def handle(self, *args, **options):
+        counter = get_view_counter()
+        if not isinstance(counter, CacheViewCounter):
+            raise CommandError(
+                'flush_view_counts requires NETFLIX_VIEW_COUNTER to use '
+                'netflix.view_counters.CacheViewCounter'
+            )
+
+        if not options['stats']:
+            flushed = counter.flush()
+            self.stdout.write(self.style.SUCCESS(f'Flushed {flushed} views'))
+
+        for name, value in counter.stats().items():
+            self.stdout.write(f'  {name}: {value}')
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from netflix.models import CARD_FIELDS, Video, VideoCard
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the denormalized VideoCard table from Video (e.g. after bulk updates that bypass signals)'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            VideoCard.objects.all().delete()
+            cards = (
+                VideoCard(video_id=values['id'], **{field: values[field] for field in CARD_FIELDS})
+                for values in Video.objects.values('id', *CARD_FIELDS).iterator()
+            )
+            VideoCard.objects.bulk_create(cards, batch_size=1000)
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {VideoCard.objects.count()} video cards'))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from netflix.media import get_ffmpeg_binary, segment_media_file
+from netflix.models import MediaFile
+
+
+class Command(BaseCommand):
+    # Uploads aren't segmented automatically, so run this after uploading
+    # (for example from cron)
+    help = 'Pre-segment uploaded video files into HLS segments and playlists'
+
+    def add_arguments(self, parser):
+        parser.add_argument('media_ids', nargs='*', type=int, help='Only segment these media files')
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Re-segment every media file, not only those still pending',
+        )
+        parser.add_argument('--timeout', type=int, default=None, help='Seconds allowed per file')
+
+    def handle(self, *args, **options):
+        if not get_ffmpeg_binary():
+            raise CommandError('ffmpeg was not found; install it or set NETFLIX_FFMPEG_BINARY')
+
+        media_files = MediaFile.objects.order_by('pk')
+        if options['media_ids']:
+            media_files = media_files.filter(pk__in=options['media_ids'])
+        elif not options['all']:
+            media_files = media_files.exclude(segment_status='ready')
+
+        for media_file in media_files.iterator():
+            if segment_media_file(media_file, timeout=options['timeout']):
+                self.stdout.write(f'  Segmented {media_file} ({media_file.segment_count} segments)')
+            else:
+                self.stdout.write(self.style.WARNING(f'  Failed to segment {media_file}'))
+
+        self.stdout.write(self.style.SUCCESS('Done.'))
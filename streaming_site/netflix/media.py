@@ -0,0 +1,116 @@
+"""
+HLS segmenting for MediaFile uploads.
+
+The source file is split into fixed-duration MPEG-TS segments plus an HLS
+``index.m3u8`` playlist with ffmpeg, written under
+``MEDIA_ROOT/videos/hls/<media id>/<version>/``. The version directory
+changes whenever the source or the segment duration does, so every segment
+URL can be cached by browsers and CDNs forever. New segments are written
+beside the current ones and only replace them once complete, so players
+keep streaming while a file is re-segmented.
+
+Uploading a file doesn't segment it, as that can take minutes: run the
+``segment_media`` management command (for example from cron) or the
+"Segment for HLS" admin action. Until then the file is streamed
+progressively.
+
+ffmpeg is found on ``PATH``, or set ``NETFLIX_FFMPEG_BINARY``. Without it
+media files are marked "unavailable" and are still streamed progressively
+(with range requests) from the source file.
+"""
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+PLAYLIST_NAME = 'index.m3u8'
+SEGMENT_PATTERN = 'segment_%05d.ts'
+
+
+def get_ffmpeg_binary():
+    return getattr(settings, 'NETFLIX_FFMPEG_BINARY', None) or shutil.which('ffmpeg')
+
+
+def build_segment_command(ffmpeg, source_path, output_dir, segment_duration):
+    # Stream copy keeps segmenting cheap; segments are cut on the next keyframe
+    # after each segment_duration, so the source should have regular keyframes
+    return [
+        ffmpeg,
+        '-y',
+        '-loglevel', 'error',
+        '-i', str(source_path),
+        '-map', '0',
+        '-c', 'copy',
+        '-f', 'hls',
+        '-hls_time', str(segment_duration),
+        '-hls_playlist_type', 'vod',
+        '-hls_segment_filename', str(output_dir / SEGMENT_PATTERN),
+        str(output_dir / PLAYLIST_NAME),
+    ]
+
+
+def segment_media_file(media_file, timeout=None):
+    """
+    Segment ``media_file`` for HLS and update its ``segment_status``.
+
+    Returns True if the segments and playlist were written.
+    """
+    ffmpeg = get_ffmpeg_binary()
+    if not ffmpeg:
+        media_file.segment_status = 'unavailable'
+        media_file.save(update_fields=['segment_status'])
+        return False
+
+    output_dir = media_file.segments_dir
+    # Segment into a new directory beside the current version. Its name starts
+    # with a dot, so the segment view never serves it.
+    output_dir.parent.mkdir(parents=True, exist_ok=True)
+    build_dir = Path(tempfile.mkdtemp(prefix=f'.{output_dir.name}-', dir=output_dir.parent))
+
+    command = build_segment_command(ffmpeg, media_file.file.path, build_dir, media_file.segment_duration)
+    try:
+        subprocess.run(command, check=True, capture_output=True, timeout=timeout)
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.warning('Failed to segment media file %s: %s', media_file.pk, getattr(e, 'stderr', None) or e)
+        shutil.rmtree(build_dir, ignore_errors=True)
+        media_file.segment_status = 'failed'
+        media_file.segment_count = 0
+        media_file.save(update_fields=['segment_status', 'segment_count'])
+        return False
+
+    segment_count = len(list(build_dir.glob('segment_*.ts')))
+    replace_segments_dir(build_dir, output_dir)
+
+    media_file.segment_status = 'ready'
+    media_file.segment_count = segment_count
+    media_file.save(update_fields=['segment_status', 'segment_count'])
+
+    # Older versions are no longer referenced by any playlist
+    for version_dir in output_dir.parent.iterdir():
+        if version_dir != output_dir and not version_dir.name.startswith('.'):
+            shutil.rmtree(version_dir, ignore_errors=True)
+    return True
+
+
+def replace_segments_dir(build_dir, output_dir):
+    """Move the segments and playlist in ``build_dir`` to ``output_dir``"""
+    if not output_dir.exists():
+        build_dir.rename(output_dir)
+        return
+
+    # Re-segmenting the current version: replace its files one at a time, each
+    # atomically, and the playlist last, so that every request finds a file
+    names = sorted(path.name for path in build_dir.iterdir())
+    names.sort(key=lambda name: name == PLAYLIST_NAME)
+    for name in names:
+        os.replace(build_dir / name, output_dir / name)
+    for path in output_dir.glob('segment_*.ts'):
+        if path.name not in names:
+            path.unlink()
+    build_dir.rmdir()
@@ -0,0 +1,83 @@
+"""
+Media origin views: serve uploaded video files and their HLS segments.
+
+Both go through Wagtail's streaming sendfile backend, which answers HTTP
+range requests (206/416) so players can seek without re-downloading the
+file, and which WSGI servers can send zero-copy with os.sendfile.
+"""
+import os
+import re
+
+from django.conf import settings
+from django.http import Http404
+from django.shortcuts import get_object_or_404, redirect
+from django.utils.http import quote_etag
+from django.views.decorators.http import etag, require_safe
+
+from wagtail.utils.sendfile_streaming_backend import sendfile
+
+from .models import MediaFile
+
+SEGMENT_VERSION_RE = re.compile(r'^[0-9a-f]{1,12}-\d+$')
+SEGMENT_NAME_RE = re.compile(r'^(index\.m3u8|segment_\d{5}\.ts)$')
+
+SEGMENT_CONTENT_TYPES = {
+    '.m3u8': 'application/vnd.apple.mpegurl',
+    '.ts': 'video/mp2t',
+}
+
+# The source file can be replaced, so browsers revalidate it with the ETag
+SOURCE_CACHE_CONTROL = 'public, max-age=3600'
+# Segment URLs are versioned by content, so they never change
+SEGMENT_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def media_source_etag(request, media_id):
+    return MediaFile.objects.filter(pk=media_id).values_list('file_hash', flat=True).first()
+
+
+@require_safe
+@etag(media_source_etag)
+def media_source(request, media_id):
+    """Serve an uploaded video file, with range request support"""
+    media_file = get_object_or_404(MediaFile, pk=media_id)
+
+    try:
+        local_path = media_file.file.path
+    except NotImplementedError:
+        # Remote storage; let it serve the file itself
+        return redirect(media_file.file.url)
+
+    if not os.path.exists(local_path):
+        raise Http404('Media file is missing from storage')
+
+    content_type = media_file.content_type or 'application/octet-stream'
+    response = sendfile(request, local_path, mimetype=content_type, etag=quote_etag(media_file.file_hash))
+    if response.status_code == 200:
+        response['Content-Type'] = content_type
+    response['Cache-Control'] = SOURCE_CACHE_CONTROL
+    return response
+
+
+def media_segment_etag(request, media_id, version, name):
+    return f'{version}-{name}'
+
+
+@require_safe
+@etag(media_segment_etag)
+def media_segment(request, media_id, version, name):
+    """Serve an HLS playlist or segment straight from disk (no database queries)"""
+    if not SEGMENT_VERSION_RE.match(version) or not SEGMENT_NAME_RE.match(name):
+        raise Http404
+
+    path = os.path.join(settings.MEDIA_ROOT, 'videos', 'hls', str(media_id), version, name)
+    if not os.path.exists(path):
+        raise Http404
+
+    content_type = SEGMENT_CONTENT_TYPES[os.path.splitext(name)[1]]
+    segment_etag = quote_etag(media_segment_etag(request, media_id, version, name))
+    response = sendfile(request, path, mimetype=content_type, etag=segment_etag)
+    if response.status_code == 200:
+        response['Content-Type'] = content_type
+    response['Cache-Control'] = SEGMENT_CACHE_CONTROL
+    return response
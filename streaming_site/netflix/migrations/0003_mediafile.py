@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netflix', '0002_video_ai_content_tags_video_ai_recommendation_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(blank=True, max_length=200)),
+                ('file', models.FileField(upload_to='videos/source/')),
+                ('content_type', models.CharField(blank=True, max_length=100)),
+                ('file_size', models.PositiveBigIntegerField(editable=False, null=True)),
+                ('file_hash', models.CharField(blank=True, editable=False, max_length=40)),
+                ('segment_duration', models.PositiveIntegerField(default=6, help_text='Target HLS segment duration in seconds')),
+                ('segment_status', models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed'), ('unavailable', 'Segmenter unavailable')], default='pending', max_length=20)),
+                ('segment_count', models.PositiveIntegerField(default=0, editable=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='video',
+            name='video_url',
+            field=models.URLField(blank=True, help_text='Video file URL or streaming link (if there is no uploaded video file)'),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='trailer_file',
+            field=models.ForeignKey(blank=True, help_text='Uploaded trailer file, served from our own media origin', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='netflix.mediafile'),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='video_file',
+            field=models.ForeignKey(blank=True, help_text='Uploaded video file, served from our own media origin', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='netflix.mediafile'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+CARD_FIELDS = ['title', 'thumbnail', 'rating_percentage', 'year', 'video_type', 'age_rating']
+
+
+def create_video_cards(apps, schema_editor):
+    Video = apps.get_model('netflix', 'Video')
+    VideoCard = apps.get_model('netflix', 'VideoCard')
+    
+    cards = (
+        VideoCard(video_id=values['id'], **{field: values[field] for field in CARD_FIELDS})
+        for values in Video.objects.values('id', *CARD_FIELDS).iterator()
+    )
+    VideoCard.objects.bulk_create(cards, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netflix', '0003_mediafile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VideoCard',
+            fields=[
+                ('video', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='card', serialize=False, to='netflix.video')),
+                ('title', models.CharField(max_length=200)),
+                ('thumbnail', models.URLField()),
+                ('rating_percentage', models.IntegerField()),
+                ('year', models.IntegerField()),
+                ('video_type', models.CharField(choices=[('movie', 'Movie'), ('series', 'TV Series'), ('documentary', 'Documentary'), ('short', 'Short Film')], max_length=20)),
+                ('age_rating', models.CharField(max_length=10)),
+            ],
+        ),
+        migrations.RunPython(create_video_cards, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,16 @@
+import mimetypes
+from pathlib import Path
+
+from django.conf import settings
 from django.db import models
+from django.db.models import Q
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.urls import reverse
+
+from modelsearch import index
+from modelsearch.queryset import SearchableQuerySetMixin
+from wagtail.utils.file import hash_filelike
 
 
 class Category(models.Model):
@@ -19,7 +30,84 @@ class Category(models.Model):
         return self.name
 
 
-class Video(models.Model):
+class MediaFile(models.Model):
+    """Video file stored on our own media origin (under MEDIA_ROOT), optionally pre-segmented for HLS"""
+    
+    SEGMENT_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+        ('unavailable', 'Segmenter unavailable'),
+    ]
+    
+    title = models.CharField(max_length=200, blank=True)
+    file = models.FileField(upload_to='videos/source/')
+    content_type = models.CharField(max_length=100, blank=True)
+    file_size = models.PositiveBigIntegerField(null=True, editable=False)
+    # A SHA-1 hash of the file contents, used for ETags and versioned segment URLs
+    file_hash = models.CharField(max_length=40, blank=True, editable=False)
+    
+    # HLS segmenting
+    segment_duration = models.PositiveIntegerField(default=6, help_text="Target HLS segment duration in seconds")
+    segment_status = models.CharField(max_length=20, choices=SEGMENT_STATUS_CHOICES, default='pending')
+    segment_count = models.PositiveIntegerField(default=0, editable=False)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return self.title or Path(self.file.name).name
+    
+    def save(self, *args, **kwargs):
+        # A newly assigned (uploaded) file is not committed to storage yet
+        if self.file and (not self.file_hash or not self.file._committed):
+            self._set_file_metadata()
+            self.segment_status = 'pending'
+            self.segment_count = 0
+        super().save(*args, **kwargs)
+    
+    def _set_file_metadata(self):
+        self.file.open('rb')
+        self.file_size = self.file.size
+        self.file_hash = hash_filelike(self.file)
+        self.file.seek(0)
+        if not self.content_type:
+            self.content_type = mimetypes.guess_type(self.file.name)[0] or 'application/octet-stream'
+    
+    @property
+    def segment_version(self):
+        """Changes whenever the source or segment duration does, so segment URLs can be cached forever"""
+        return f"{self.file_hash[:12]}-{self.segment_duration}"
+    
+    @property
+    def segments_dir(self):
+        return Path(settings.MEDIA_ROOT) / 'videos' / 'hls' / str(self.pk) / self.segment_version
+    
+    def get_source_url(self):
+        return reverse('netflix:media_source', args=[self.pk])
+    
+    def get_hls_url(self):
+        if self.segment_status != 'ready':
+            return None
+        return reverse('netflix:media_segment', args=[self.pk, self.segment_version, 'index.m3u8'])
+
+
+# Columns shown on a video tile ("card"), denormalized into VideoCard
+CARD_FIELDS = ['title', 'thumbnail', 'rating_percentage', 'year', 'video_type', 'age_rating']
+
+
+class VideoQuerySet(SearchableQuerySetMixin, models.QuerySet):
+    def cards(self):
+        """
+        Select only the VideoCard columns (plus the video id), skipping the large
+        text fields of Video. Use ``video.get_card()`` on the results.
+        """
+        return self.select_related('card').only('id', *[f'card__{field}' for field in CARD_FIELDS])
+
+
+class Video(index.Indexed, models.Model):
     """Main video/movie/show model"""
     
     VIDEO_TYPE_CHOICES = [
@@ -38,8 +126,16 @@ class Video(models.Model):
     # Media Files
     thumbnail = models.URLField(help_text="Thumbnail image URL (300x450px recommended)")
     hero_image = models.URLField(blank=True, help_text="Hero banner image URL (1920x1080px)")
-    video_url = models.URLField(help_text="Video file URL or streaming link")
+    video_url = models.URLField(blank=True, help_text="Video file URL or streaming link (if there is no uploaded video file)")
     trailer_url = models.URLField(blank=True, help_text="Trailer video URL")
+    video_file = models.ForeignKey(
+        MediaFile, null=True, blank=True, on_delete=models.SET_NULL, related_name='+',
+        help_text="Uploaded video file, served from our own media origin"
+    )
+    trailer_file = models.ForeignKey(
+        MediaFile, null=True, blank=True, on_delete=models.SET_NULL, related_name='+',
+        help_text="Uploaded trailer file, served from our own media origin"
+    )
     
     # Metadata
     year = models.IntegerField(validators=[MinValueValidator(1900), MaxValueValidator(2100)])
@@ -88,12 +184,104 @@ class Video(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = VideoQuerySet.as_manager()
+    
+    # Full-text search (see MODELSEARCH_BACKENDS); fields with a higher boost rank higher
+    search_fields = [
+        index.SearchField('title', boost=10),
+        index.AutocompleteField('title'),
+        index.SearchField('get_search_tags', boost=5),
+        index.SearchField('get_search_ai_content_tags', boost=3),
+        index.SearchField('director', boost=3),
+        index.AutocompleteField('director'),
+        index.SearchField('cast', boost=3),
+        index.AutocompleteField('cast'),
+        index.SearchField('description'),
+        index.FilterField('id'),
+        index.FilterField('is_active'),
+        index.FilterField('video_type'),
+        index.FilterField('created_at'),
+    ]
+    
     class Meta:
         ordering = ['-created_at']
+        # Every public query filters on is_active=True, so most of these are partial
+        # indexes over the active rows only (see the benchmark_video_queries command)
+        indexes = [
+            # Home page hero (featured, newest first)
+            models.Index(
+                fields=['-created_at'], name='video_featured_idx',
+                condition=Q(is_active=True, is_featured=True),
+            ),
+            # Default listings, new releases and the recommendation engine
+            models.Index(
+                fields=['-created_at', 'id'], name='video_active_created_idx',
+                condition=Q(is_active=True),
+            ),
+            # Highly rated content (rating_percentage__gte)
+            models.Index(
+                fields=['-rating_percentage'], name='video_active_rating_idx',
+                condition=Q(is_active=True),
+            ),
+            # Browse by type
+            models.Index(fields=['is_active', 'video_type', '-created_at'], name='video_active_type_created_idx'),
+            # Most viewed, then best rated
+            models.Index(fields=['is_active', '-view_count', '-rating_percentage'], name='video_active_views_idx'),
+            # Content manager list (keyset pagination over active and inactive videos)
+            models.Index(fields=['-created_at', '-id'], name='video_created_id_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} ({self.year})"
     
+    @staticmethod
+    def _split_tags(value):
+        return [tag.strip() for tag in value.split(',') if tag.strip()]
+    
+    def get_search_tags(self):
+        """Comma-separated tags as separate words for the search index"""
+        return ' '.join(self._split_tags(self.tags))
+    
+    def get_search_ai_content_tags(self):
+        return ' '.join(self._split_tags(self.ai_content_tags))
+    
+    def get_card(self):
+        """Tile data for rails and grids, from the denormalized VideoCard when available"""
+        try:
+            return self.card.as_dict()
+        except VideoCard.DoesNotExist:
+            # Not backfilled yet. On a .cards() queryset the card fields are
+            # deferred, so load them in one query rather than one per field.
+            deferred = self.get_deferred_fields().intersection(CARD_FIELDS)
+            if deferred:
+                self.refresh_from_db(fields=deferred)
+            return VideoCard.from_video(self).as_dict()
+    
+    def clean(self):
+        if not self.video_url and not self.video_file_id:
+            raise ValidationError("Either a video URL or an uploaded video file is required.")
+    
+    def get_video_url(self):
+        """Progressive (range-request) URL for the video, preferring our own media origin"""
+        if self.video_file_id:
+            return self.video_file.get_source_url()
+        return self.video_url
+    
+    def get_video_content_type(self):
+        if self.video_file_id and self.video_file.content_type:
+            return self.video_file.content_type
+        return 'video/mp4'
+    
+    def get_hls_url(self):
+        if self.video_file_id:
+            return self.video_file.get_hls_url()
+        return None
+    
+    def get_trailer_url(self):
+        if self.trailer_file_id:
+            return self.trailer_file.get_source_url()
+        return self.trailer_url
+    
     def get_duration_display(self):
         """Convert minutes to hours and minutes"""
         hours = self.duration_minutes // 60
@@ -107,40 +295,56 @@ class Video(models.Model):
         return f"{self.rating_percentage}%"
     
     def get_ai_recommendations(self, limit=6):
-        """AI-powered content recommendations based on categories, tags, and rating"""
-        # Get similar videos from same categories
-        same_categories = Video.objects.filter(
-            categories__in=self.categories.all(),
-            is_active=True
-        ).exclude(id=self.id).distinct()
-        
-        # Calculate similarity scores based on:
-        # 1. Shared categories (weight: 40%)
-        # 2. Similar ratings (weight: 30%)
-        # 3. View count popularity (weight: 20%)
-        # 4. Recent releases (weight: 10%)
-        
-        recommendations = []
-        for video in same_categories:
-            # Calculate category overlap
-            shared_cats = set(self.categories.values_list('id', flat=True)) & \
-                         set(video.categories.values_list('id', flat=True))
-            category_score = (len(shared_cats) / max(self.categories.count(), 1)) * 40
-            
-            # Rating similarity (closer ratings = higher score)
-            rating_diff = abs(self.rating_percentage - video.rating_percentage)
-            rating_score = max(0, (100 - rating_diff) / 100 * 30)
-            
-            # Popularity score
-            popularity_score = min(video.view_count / 1000, 1) * 20
-            
-            # Recency score (newer videos get boost)
-            days_old = (self.created_at - video.created_at).days
-            recency_score = max(0, (365 - abs(days_old)) / 365) * 10
-            
-            total_score = category_score + rating_score + popularity_score + recency_score
-            recommendations.append((video, total_score))
-        
-        # Sort by score and return top results
-        recommendations.sort(key=lambda x: x[1], reverse=True)
-        return [video for video, score in recommendations[:limit]]
+        """AI-powered content recommendations based on categories, rating, popularity and recency
+
+        Scoring (see ``netflix.recommendations``):
+        1. Shared categories (weight: 40%)
+        2. Similar ratings (weight: 30%)
+        3. View count popularity (weight: 20%)
+        4. Recent releases (weight: 10%)
+        """
+        from .recommendations import engine
+
+        video_ids = engine.recommend(self, limit=limit)
+        videos = Video.objects.in_bulk(video_ids)
+        return [videos[video_id] for video_id in video_ids if video_id in videos]
+
+
+class VideoCard(models.Model):
+    """
+    Denormalized projection of the Video columns shown on a tile, kept in sync
+    by signal handlers, so that rails of many tiles don't load each video's
+    description and AI content tags.
+    """
+    video = models.OneToOneField(Video, on_delete=models.CASCADE, primary_key=True, related_name='card')
+    title = models.CharField(max_length=200)
+    thumbnail = models.URLField()
+    rating_percentage = models.IntegerField()
+    year = models.IntegerField()
+    video_type = models.CharField(max_length=20, choices=Video.VIDEO_TYPE_CHOICES)
+    age_rating = models.CharField(max_length=10)
+    
+    def __str__(self):
+        return self.title
+    
+    @classmethod
+    def from_video(cls, video):
+        return cls(video=video, **{field: getattr(video, field) for field in CARD_FIELDS})
+    
+    @classmethod
+    def sync(cls, video):
+        """Create or update the card for ``video``"""
+        card = cls.from_video(video)
+        card.save()
+        return card
+    
+    def as_dict(self):
+        return {
+            'id': self.video_id,
+            'title': self.title,
+            'thumbnail': self.thumbnail,
+            'rating': f"{self.rating_percentage}%",
+            'year': self.year,
+            'video_type': self.get_video_type_display(),
+            'age_rating': self.age_rating,
+        }
@@ -0,0 +1,134 @@
+"""
+Keyset ("cursor") pagination for long video lists.
+
+Pages are addressed by the ``(created_at, id)`` of the row next to them
+rather than by an offset, so fetching a page is an index range scan whatever
+its depth, and rows inserted while someone is paging through the list (which
+are always newer) never shift the following pages.
+
+Exact ``COUNT(*)`` on a large table costs as much as reading it, so list
+headers use ``estimate_count`` instead.
+"""
+import base64
+import binascii
+from datetime import datetime
+
+from django.db import connections
+from django.db.models import Q
+
+DEFAULT_PER_PAGE = 50
+
+# Counts above this are shown as "10,000+" rather than counted exactly
+COUNT_CAP = 10000
+
+
+def encode_cursor(direction, created_at, pk):
+    value = f'{direction}|{created_at.isoformat()}|{pk}'
+    return base64.urlsafe_b64encode(value.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return ``(direction, created_at, pk)``, or None for a missing or malformed cursor"""
+    if not cursor:
+        return None
+    try:
+        value = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        direction, created_at, pk = value.split('|')
+        if direction not in ('next', 'prev'):
+            return None
+        return direction, datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+class KeysetPage:
+    """One page of a list ordered newest first, with cursors to its neighbours"""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+def keyset_page(queryset, cursor=None, per_page=DEFAULT_PER_PAGE):
+    """
+    Return the ``KeysetPage`` of ``queryset`` at ``cursor``, ordered by
+    ``(-created_at, -id)``. Any existing ordering on the queryset is replaced.
+    """
+    position = decode_cursor(cursor)
+
+    if position is None:
+        direction = 'next'
+        rows = queryset.order_by('-created_at', '-id')
+    else:
+        direction, created_at, pk = position
+        if direction == 'next':
+            rows = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+            ).order_by('-created_at', '-id')
+        else:
+            # Walk backwards from the cursor, then flip the page back around
+            rows = queryset.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+            ).order_by('created_at', 'id')
+
+    # One extra row tells us whether there is anything beyond this page
+    rows = list(rows[:per_page + 1])
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if direction == 'prev':
+        rows.reverse()
+
+    if not rows:
+        return KeysetPage([])
+
+    first, last = rows[0], rows[-1]
+    if direction == 'next':
+        has_next, has_previous = has_more, position is not None
+    else:
+        has_next, has_previous = True, has_more
+
+    return KeysetPage(
+        rows,
+        next_cursor=encode_cursor('next', last.created_at, last.pk) if has_next else None,
+        previous_cursor=encode_cursor('prev', first.created_at, first.pk) if has_previous else None,
+    )
+
+
+def estimate_count(queryset, cap=COUNT_CAP):
+    """
+    Return ``(count, is_exact)`` for ``queryset``.
+
+    An unfiltered table on PostgreSQL is estimated from the planner statistics
+    in ``pg_class``. Anything else is counted, but only up to ``cap`` rows, so
+    the count stops scanning early on large result sets.
+    """
+    model = queryset.model
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql' and not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                [model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 until the table has been vacuumed or analyzed
+        if row and row[0] > cap:
+            return int(row[0]), False
+
+    count = queryset.order_by()[:cap + 1].count()
+    if count > cap:
+        return cap, False
+    return count, True
@@ -0,0 +1,114 @@
+"""
+Category "rails" (the horizontal rows of video tiles on the home and browse pages).
+
+Every rail is fetched in a single query: the category/video join table is
+ranked with ``ROW_NUMBER() OVER (PARTITION BY category_id ...)`` and only the
+first ``limit`` rows of each partition are kept, so the number of queries no
+longer grows with the number of categories.
+"""
+from datetime import timedelta
+
+from django.db.models import Case, F, IntegerField, Max, Value, When, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .models import CARD_FIELDS, Video
+
+VideoCategory = Video.categories.through
+
+# Browse page filters (?type=...) that restrict the video type
+VIDEO_TYPE_FILTERS = {'series', 'movie', 'documentary'}
+
+NEW_RELEASE_DAYS = 30
+MY_LIST_MIN_RATING = 85
+
+
+def fetch_rails(limit, video_type=None, new=False, min_rating=None):
+    """
+    Return ``[(category, [video, ...]), ...]`` for every active category that
+    has at least one matching active video, in category display order.
+
+    * ``video_type`` - only include videos of this type
+    * ``new`` - only videos added in the last 30 days, newest first; a
+      category with none of those falls back to its most viewed and best
+      rated videos
+    * ``min_rating`` - only videos rated at least this, best rated first
+    """
+    memberships = VideoCategory.objects.filter(video__is_active=True, category__is_active=True)
+    if video_type:
+        memberships = memberships.filter(video__video_type=video_type)
+    if min_rating is not None:
+        memberships = memberships.filter(video__rating_percentage__gte=min_rating)
+
+    partition = F('category_id')
+    if new:
+        cutoff = timezone.now() - timedelta(days=NEW_RELEASE_DAYS)
+        memberships = memberships.annotate(
+            is_recent=Case(
+                When(video__created_at__gte=cutoff, then=Value(1)),
+                default=Value(0),
+                output_field=IntegerField(),
+            ),
+        ).annotate(
+            category_has_recent=Window(Max('is_recent'), partition_by=partition),
+        )
+        ordering = [
+            F('is_recent').desc(),
+            Case(When(is_recent=1, then=F('video__created_at'))).desc(nulls_last=True),
+            F('video__view_count').desc(),
+            F('video__rating_percentage').desc(),
+        ]
+    elif min_rating is not None:
+        ordering = [F('video__rating_percentage').desc()]
+    else:
+        # The default Video ordering
+        ordering = [F('video__created_at').desc()]
+
+    memberships = memberships.annotate(
+        position=Window(RowNumber(), partition_by=partition, order_by=[*ordering, F('video_id').desc()]),
+    ).filter(position__lte=limit)
+    if new:
+        # Categories with recent videos show only those
+        memberships = memberships.filter(is_recent=F('category_has_recent'))
+
+    # Only the category and the denormalized card columns are loaded
+    memberships = memberships.select_related('video__card', 'category').only(
+        'video_id', 'category_id', 'category__name', 'category__slug', 'category__order',
+        'video__id', *[f'video__card__{field}' for field in CARD_FIELDS],
+    ).order_by('category__order', 'category__name', 'category_id', 'position')
+
+    rails = []
+    for membership in memberships:
+        if not rails or rails[-1][0].pk != membership.category_id:
+            rails.append((membership.category, []))
+        rails[-1][1].append(membership.video)
+    return rails
+
+
+def home_rails(limit=6):
+    """Home page rails as ``{category slug: [card, ...]}``"""
+    return {
+        category.slug: [video.get_card() for video in videos]
+        for category, videos in fetch_rails(limit)
+    }
+
+
+def browse_rails(filter_type=None, limit=12):
+    """Browse page rails as ``[{'name': ..., 'videos': [card, ...]}, ...]`` for a ``?type=`` filter"""
+    if filter_type in VIDEO_TYPE_FILTERS:
+        rails = fetch_rails(limit, video_type=filter_type)
+    elif filter_type == 'new':
+        rails = fetch_rails(limit, new=True)
+    elif filter_type == 'mylist':
+        # User favorites are not yet implemented, so show highly rated content
+        rails = fetch_rails(limit, min_rating=MY_LIST_MIN_RATING)
+    else:
+        rails = fetch_rails(limit)
+
+    return [
+        {
+            'name': category.name,
+            'videos': [video.get_card() for video in videos],
+        }
+        for category, videos in rails
+    ]
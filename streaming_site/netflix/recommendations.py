@@ -0,0 +1,270 @@
+"""
+Precomputed similarity engine behind Video.get_ai_recommendations.
+
+All active videos are held in a NumPy feature matrix (category one-hot,
+rating, popularity and creation time) so that a recommendation query is a
+single matrix-vector product followed by ``argpartition``, instead of a
+handful of queries per candidate video.
+
+The scores are identical to the original per-video loop:
+
+1. Shared categories (weight: 40%)
+2. Similar ratings (weight: 30%)
+3. View count popularity (weight: 20%)
+4. Recent releases (weight: 10%)
+"""
+import threading
+import time
+from datetime import datetime
+from datetime import timezone as dt_timezone
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+CATEGORY_WEIGHT = 40
+RATING_WEIGHT = 30
+POPULARITY_WEIGHT = 20
+RECENCY_WEIGHT = 10
+
+# Views needed for a full popularity score
+POPULARITY_CAP = 1000
+RECENCY_WINDOW_DAYS = 365
+
+MICROSECONDS_PER_DAY = 86400 * 1000000
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def _to_microseconds(value):
+    """Convert a datetime to integer microseconds since the epoch (exact, unlike float seconds)"""
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value, dt_timezone.utc)
+    delta = value - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+class RecommendationEngine:
+    """
+    In-memory feature matrix for all active videos.
+
+    Rows are allocated per video and never reordered; removed videos are
+    simply masked out, so incremental updates after a ``Video`` save only
+    touch a single row. The matrix is rebuilt from scratch after
+    ``NETFLIX_RECOMMENDATIONS_MAX_AGE`` seconds so that writes made by other
+    worker processes are eventually picked up.
+    """
+
+    def __init__(self, max_age=None):
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._built_at = None
+        self._reset()
+
+    def _reset(self):
+        self.row_for_video = {}
+        self.column_for_category = {}
+        self.video_ids = np.zeros(0, dtype=np.int64)
+        self.active = np.zeros(0, dtype=bool)
+        self.categories = np.zeros((0, 0), dtype=np.int32)
+        self.ratings = np.zeros(0, dtype=np.float64)
+        self.popularity = np.zeros(0, dtype=np.float64)
+        self.created_us = np.zeros(0, dtype=np.int64)
+
+    def get_max_age(self):
+        if self.max_age is not None:
+            return self.max_age
+        return getattr(settings, 'NETFLIX_RECOMMENDATIONS_MAX_AGE', 300)
+
+    @property
+    def is_stale(self):
+        if self._built_at is None:
+            return True
+        max_age = self.get_max_age()
+        return max_age is not None and time.monotonic() - self._built_at > max_age
+
+    def invalidate(self):
+        """Drop the matrix; it will be rebuilt on the next query"""
+        with self._lock:
+            self._built_at = None
+            self._reset()
+
+    def build(self):
+        """Load every active video in two queries and build the feature matrix"""
+        from .models import Video
+
+        rows = list(
+            Video.objects.filter(is_active=True)
+            .order_by('-created_at', 'id')
+            .values_list('id', 'rating_percentage', 'view_count', 'created_at')
+        )
+        memberships = list(
+            Video.categories.through.objects.filter(video__is_active=True)
+            .values_list('video_id', 'category_id')
+        )
+
+        with self._lock:
+            self._reset()
+            count = len(rows)
+            self.video_ids = np.array([row[0] for row in rows], dtype=np.int64)
+            self.row_for_video = {video_id: index for index, video_id in enumerate(self.video_ids.tolist())}
+            self.active = np.ones(count, dtype=bool)
+            self.ratings = np.array([row[1] for row in rows], dtype=np.float64)
+            self.popularity = self._popularity(np.array([row[2] for row in rows], dtype=np.float64))
+            self.created_us = np.array([_to_microseconds(row[3]) for row in rows], dtype=np.int64)
+
+            category_ids = sorted({category_id for _, category_id in memberships})
+            self.column_for_category = {category_id: index for index, category_id in enumerate(category_ids)}
+            self.categories = np.zeros((count, len(category_ids)), dtype=np.int32)
+            for video_id, category_id in memberships:
+                self.categories[self.row_for_video[video_id], self.column_for_category[category_id]] = 1
+
+            self._built_at = time.monotonic()
+
+    def ensure_built(self):
+        if self.is_stale:
+            self.build()
+
+    @staticmethod
+    def _popularity(view_counts):
+        return np.minimum(view_counts / POPULARITY_CAP, 1)
+
+    def _category_vector(self, category_ids):
+        vector = np.zeros(self.categories.shape[1], dtype=np.int32)
+        for category_id in category_ids:
+            column = self.column_for_category.get(category_id)
+            if column is not None:
+                vector[column] = 1
+        return vector
+
+    def _add_category_columns(self, category_ids):
+        new_ids = [category_id for category_id in category_ids if category_id not in self.column_for_category]
+        if not new_ids:
+            return
+        for category_id in new_ids:
+            self.column_for_category[category_id] = len(self.column_for_category)
+        padding = np.zeros((self.categories.shape[0], len(new_ids)), dtype=np.int32)
+        self.categories = np.hstack([self.categories, padding])
+
+    def _allocate_row(self, video_id):
+        index = len(self.video_ids)
+        self.video_ids = np.append(self.video_ids, video_id)
+        self.active = np.append(self.active, False)
+        self.ratings = np.append(self.ratings, 0.0)
+        self.popularity = np.append(self.popularity, 0.0)
+        self.created_us = np.append(self.created_us, 0)
+        self.categories = np.vstack([self.categories, np.zeros((1, self.categories.shape[1]), dtype=np.int32)])
+        self.row_for_video[video_id] = index
+        return index
+
+    def update_video(self, video, category_ids=None):
+        """
+        Refresh the row for a single video after it has been saved.
+
+        ``category_ids`` may be passed in when already known; otherwise they
+        are read with one query.
+        """
+        with self._lock:
+            if self._built_at is None:
+                # Nothing to update yet; the next query builds from scratch
+                return
+
+            if not video.is_active:
+                self.remove_video(video.pk)
+                return
+
+            if category_ids is None:
+                category_ids = list(video.categories.values_list('id', flat=True))
+
+            index = self.row_for_video.get(video.pk)
+            if index is None:
+                index = self._allocate_row(video.pk)
+
+            self._add_category_columns(category_ids)
+            self.categories[index] = self._category_vector(category_ids)
+            self.ratings[index] = video.rating_percentage
+            self.popularity[index] = self._popularity(np.float64(video.view_count))
+            self.created_us[index] = _to_microseconds(video.created_at)
+            self.active[index] = True
+
+    def update_categories(self, video):
+        """Refresh only the category one-hot row, e.g. after ``video.categories.set(...)``"""
+        with self._lock:
+            index = self.row_for_video.get(video.pk)
+            if index is None or not self.active[index]:
+                return
+
+            category_ids = list(video.categories.values_list('id', flat=True))
+            self._add_category_columns(category_ids)
+            self.categories[index] = self._category_vector(category_ids)
+
+    def update_view_count(self, video_id, view_count):
+        """Cheap path for saves that only touched ``view_count``"""
+        with self._lock:
+            index = self.row_for_video.get(video_id)
+            if index is not None:
+                self.popularity[index] = self._popularity(np.float64(view_count))
+
+    def remove_video(self, video_id):
+        with self._lock:
+            index = self.row_for_video.get(video_id)
+            if index is not None:
+                self.active[index] = False
+                self.categories[index] = 0
+
+    def scores(self, video, category_ids):
+        """
+        Score every row against ``video``.
+
+        Returns ``(scores, candidates)`` where ``candidates`` is a boolean
+        mask of the rows that share at least one category with ``video``.
+        """
+        query = self._category_vector(category_ids)
+        shared = self.categories @ query
+
+        category_score = (shared / max(len(category_ids), 1)) * CATEGORY_WEIGHT
+
+        rating_diff = np.abs(video.rating_percentage - self.ratings)
+        rating_score = np.maximum(0, (100 - rating_diff) / 100 * RATING_WEIGHT)
+
+        popularity_score = self.popularity * POPULARITY_WEIGHT
+
+        # Whole days, rounded towards negative infinity like timedelta.days
+        days_old = (_to_microseconds(video.created_at) - self.created_us) // MICROSECONDS_PER_DAY
+        recency_score = np.maximum(0, (RECENCY_WINDOW_DAYS - np.abs(days_old)) / RECENCY_WINDOW_DAYS) * RECENCY_WEIGHT
+
+        scores = category_score + rating_score + popularity_score + recency_score
+
+        candidates = self.active & (shared > 0)
+        own_row = self.row_for_video.get(video.pk)
+        if own_row is not None:
+            candidates[own_row] = False
+
+        return scores, candidates
+
+    def recommend(self, video, limit=6):
+        """Return the ids of the ``limit`` best-scoring videos for ``video``, best first"""
+        category_ids = list(video.categories.values_list('id', flat=True))
+
+        with self._lock:
+            self.ensure_built()
+            scores, candidates = self.scores(video, category_ids)
+            candidate_rows = np.flatnonzero(candidates)
+            if limit <= 0 or not len(candidate_rows):
+                return []
+
+            candidate_scores = scores[candidate_rows]
+            if len(candidate_rows) > limit:
+                top = np.argpartition(-candidate_scores, limit - 1)[:limit]
+                # argpartition may cut through a group of tied scores; widen the
+                # selection to the whole tie group so the ordering below is exact
+                threshold = candidate_scores[top].min()
+                top = np.flatnonzero(candidate_scores >= threshold)
+                candidate_rows = candidate_rows[top]
+                candidate_scores = candidate_scores[top]
+
+            # Highest score first, ties broken by newest first (the default Video ordering)
+            order = np.lexsort((self.video_ids[candidate_rows], -self.created_us[candidate_rows], -candidate_scores))
+            return self.video_ids[candidate_rows[order[:limit]]].tolist()
+
+
+engine = RecommendationEngine()
@@ -0,0 +1,62 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from . import catalog_cache
+from .models import CARD_FIELDS, Category, Video, VideoCard
+from .recommendations import engine
+
+
+def update_recommendations_on_video_save(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) <= {'view_count'}:
+        engine.update_view_count(instance.pk, instance.view_count)
+    else:
+        engine.update_video(instance)
+
+
+def update_recommendations_on_video_delete(sender, instance, **kwargs):
+    engine.remove_video(instance.pk)
+
+
+def update_recommendations_on_categories_changed(sender, instance, action, reverse, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if reverse:
+        # category.videos.add(...) etc. can touch any number of videos
+        engine.invalidate()
+    else:
+        engine.update_categories(instance)
+
+
+def invalidate_recommendations(sender, **kwargs):
+    engine.invalidate()
+
+
+def bump_catalog_generation(sender, update_fields=None, **kwargs):
+    # View counts are flushed in bulk and don't need to invalidate cached pages
+    if update_fields is not None and set(update_fields) <= {'view_count'}:
+        return
+    catalog_cache.bump_generation()
+
+
+def bump_catalog_generation_on_categories_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        catalog_cache.bump_generation()
+
+
+def sync_video_card(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not set(update_fields) & set(CARD_FIELDS):
+        return
+    VideoCard.sync(instance)
+
+
+def register_signal_handlers():
+    post_save.connect(sync_video_card, sender=Video)
+    post_save.connect(update_recommendations_on_video_save, sender=Video)
+    post_delete.connect(update_recommendations_on_video_delete, sender=Video)
+    m2m_changed.connect(update_recommendations_on_categories_changed, sender=Video.categories.through)
+    post_delete.connect(invalidate_recommendations, sender=Category)
+
+    for model in (Video, Category):
+        post_save.connect(bump_catalog_generation, sender=model)
+        post_delete.connect(bump_catalog_generation, sender=model)
+    m2m_changed.connect(bump_catalog_generation_on_categories_changed, sender=Video.categories.through)
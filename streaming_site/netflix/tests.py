@@ -1,3 +1,1036 @@
-from django.test import TestCase
+import atexit
+import importlib
+import shutil
+import subprocess
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.files.base import ContentFile
+from django.core.management import CommandError, call_command
+from django.http import Http404
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import catalog_cache, media, media_views, view_counters
+from .models import Category, MediaFile, Video, VideoCard
+from .pagination import decode_cursor, encode_cursor, estimate_count, keyset_page
+from .rails import browse_rails, fetch_rails
+from .recommendations import RecommendationEngine, engine
+from .view_counters import CacheViewCounter, InMemoryViewCounter
+
+
+class VideoTestMixin:
+    """Helpers for creating videos with only the fields a test cares about"""
+
+    def create_video(self, title, categories=(), created_at=None, **kwargs):
+        video = Video.objects.create(
+            title=title,
+            slug=kwargs.pop('slug', title.lower().replace(' ', '-')),
+            description=kwargs.pop('description', f"About {title}"),
+            thumbnail='https://example.com/thumb.jpg',
+            video_url='https://example.com/video.mp4',
+            year=kwargs.pop('year', 2020),
+            duration_minutes=kwargs.pop('duration_minutes', 90),
+            rating_percentage=kwargs.pop('rating_percentage', 80),
+            **kwargs,
+        )
+        if categories:
+            video.categories.set(categories)
+        if created_at is not None:
+            # created_at is auto_now_add, so it can only be changed afterwards
+            Video.objects.filter(pk=video.pk).update(created_at=created_at)
+            video.created_at = created_at
+        return video
+
+
+def reference_recommendations(video, limit=6):
+    """
+    The original per-video scoring loop of Video.get_ai_recommendations, which
+    the recommendation engine must match exactly.
+    """
+    category_ids = set(video.categories.values_list('id', flat=True))
+    candidates = (
+        Video.objects.filter(categories__in=category_ids, is_active=True)
+        .exclude(id=video.id)
+        .distinct()
+        .order_by('-created_at', 'id')
+    )
+
+    recommendations = []
+    for candidate in candidates:
+        shared = category_ids & set(candidate.categories.values_list('id', flat=True))
+        category_score = (len(shared) / max(len(category_ids), 1)) * 40
+        rating_score = max(0, (100 - abs(video.rating_percentage - candidate.rating_percentage)) / 100 * 30)
+        popularity_score = min(candidate.view_count / 1000, 1) * 20
+        days_old = (video.created_at - candidate.created_at).days
+        recency_score = max(0, (365 - abs(days_old)) / 365) * 10
+        recommendations.append(
+            (candidate.pk, category_score + rating_score + popularity_score + recency_score)
+        )
+
+    # A stable sort, so ties keep the newest-first order
+    recommendations.sort(key=lambda item: item[1], reverse=True)
+    return recommendations[:limit]
+
+
+class RecommendationEngineTestCase(VideoTestMixin, TestCase):
+    def setUp(self):
+        self.drama = Category.objects.create(name='Drama', slug='drama')
+        self.comedy = Category.objects.create(name='Comedy', slug='comedy')
+        self.thriller = Category.objects.create(name='Thriller', slug='thriller')
+
+        now = timezone.now()
+        self.video = self.create_video(
+            'Source', [self.drama, self.comedy], created_at=now, rating_percentage=75
+        )
+        self.both = self.create_video(
+            'Both', [self.drama, self.comedy], created_at=now - timedelta(days=10),
+            rating_percentage=70, view_count=500,
+        )
+        self.drama_old = self.create_video(
+            'Drama old', [self.drama], created_at=now - timedelta(days=400),
+            rating_percentage=90, view_count=5000,
+        )
+        self.comedy_recent = self.create_video(
+            'Comedy recent', [self.comedy, self.thriller], created_at=now - timedelta(hours=30),
+            rating_percentage=20,
+        )
+        # Two videos with identical scores and creation times, tied on everything but id
+        tied_at = now - timedelta(days=50)
+        self.tie_a = self.create_video('Tie A', [self.drama], created_at=tied_at, view_count=100)
+        self.tie_b = self.create_video('Tie B', [self.drama], created_at=tied_at, view_count=100)
+        self.inactive = self.create_video(
+            'Inactive', [self.drama, self.comedy], created_at=now, is_active=False
+        )
+        self.unrelated = self.create_video('Unrelated', [self.thriller], created_at=now)
+
+        self.engine = RecommendationEngine(max_age=None)
+
+    def assertMatchesReference(self, video, limit=6):
+        expected = reference_recommendations(video, limit=limit)
+        self.assertEqual(self.engine.recommend(video, limit=limit), [pk for pk, _ in expected])
+
+        scores, candidates = self.engine.scores(
+            video, list(video.categories.values_list('id', flat=True))
+        )
+        for pk, score in expected:
+            row = self.engine.row_for_video[pk]
+            self.assertTrue(candidates[row])
+            self.assertEqual(scores[row], score)
+
+    def test_matches_reference(self):
+        self.assertMatchesReference(self.video)
+
+    def test_matches_reference_for_every_video_and_limit(self):
+        for video in Video.objects.filter(is_active=True):
+            for limit in (1, 2, 3, 10):
+                with self.subTest(video=video.title, limit=limit):
+                    self.assertMatchesReference(video, limit=limit)
+
+    def test_ties_are_ordered_newest_first_then_by_id(self):
+        recommended = self.engine.recommend(self.video, limit=10)
+        self.assertLess(recommended.index(self.tie_a.pk), recommended.index(self.tie_b.pk))
+
+        # A limit that cuts through the tie keeps the lower id
+        tie_position = recommended.index(self.tie_a.pk)
+        self.assertEqual(
+            self.engine.recommend(self.video, limit=tie_position + 1)[-1], self.tie_a.pk
+        )
+
+    def test_inactive_and_unrelated_videos_are_excluded(self):
+        recommended = self.engine.recommend(self.video, limit=10)
+        self.assertNotIn(self.inactive.pk, recommended)
+        self.assertNotIn(self.unrelated.pk, recommended)
+        self.assertNotIn(self.video.pk, recommended)
+
+    def test_update_video(self):
+        self.engine.ensure_built()
+
+        self.drama_old.rating_percentage = 75
+        self.drama_old.view_count = 10
+        self.drama_old.save()
+        self.engine.update_video(self.drama_old)
+
+        self.inactive.is_active = True
+        self.inactive.save()
+        self.engine.update_video(self.inactive)
+
+        new_category = Category.objects.create(name='Horror', slug='horror')
+        self.video.categories.add(new_category)
+        self.engine.update_categories(self.video)
+        added = self.create_video('Added', [new_category], created_at=timezone.now())
+        self.engine.update_video(added)
+
+        self.assertFalse(self.engine.is_stale)
+        self.assertMatchesReference(self.video, limit=10)
+        self.assertIn(added.pk, self.engine.recommend(self.video, limit=10))
+
+    def test_update_video_deactivating(self):
+        self.engine.ensure_built()
+
+        self.both.is_active = False
+        self.both.save()
+        self.engine.update_video(self.both)
+
+        self.assertNotIn(self.both.pk, self.engine.recommend(self.video, limit=10))
+        self.assertMatchesReference(self.video, limit=10)
+
+    def test_update_view_count(self):
+        self.engine.ensure_built()
+
+        Video.objects.filter(pk=self.tie_b.pk).update(view_count=900)
+        self.engine.update_view_count(self.tie_b.pk, 900)
+        self.tie_b.refresh_from_db()
+
+        self.assertMatchesReference(self.video, limit=10)
+
+    def test_remove_video(self):
+        self.engine.ensure_built()
+
+        both_pk = self.both.pk
+        self.both.delete()
+        self.engine.remove_video(both_pk)
+
+        self.assertNotIn(both_pk, self.engine.recommend(self.video, limit=10))
+        self.assertMatchesReference(self.video, limit=10)
+
+    def test_get_ai_recommendations(self):
+        # The shared engine may hold rows from other tests' rolled-back videos
+        engine.invalidate()
+        expected = [pk for pk, _ in reference_recommendations(self.video)]
+        self.assertEqual([video.pk for video in self.video.get_ai_recommendations()], expected)
+
+
+class ViewCounterTestMixin(VideoTestMixin):
+    def setUp(self):
+        self.first = self.create_video('First')
+        self.second = self.create_video('Second')
+
+    def assertViewCounts(self, first, second):
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertEqual((self.first.view_count, self.second.view_count), (first, second))
+
+    def test_flush(self):
+        for _ in range(3):
+            self.counter.add(self.first.pk, 1)
+        self.counter.add(self.second.pk, 2)
+        self.assertViewCounts(0, 0)
+        self.assertEqual(self.counter.stats()['buffered_views'], 5)
+
+        self.assertEqual(self.counter.flush(), 5)
+        self.assertViewCounts(3, 2)
+
+        stats = self.counter.stats()
+        self.assertEqual(stats['buffered_views'], 0)
+        self.assertEqual(stats['flushed_views'], 5)
+        self.assertEqual(stats['flushes'], 1)
+
+        # Views after a flush are buffered again
+        self.counter.add(self.first.pk, 1)
+        self.assertEqual(self.counter.flush(), 1)
+        self.assertViewCounts(4, 2)
+        self.assertEqual(self.counter.flush(), 0)
+
+    def test_increment_flushes_when_buffer_is_full(self):
+        self.counter.max_buffered = 3
+        # Start the flush interval, so that only the buffer size triggers a flush
+        self.counter.flush_due()
+        self.counter.increment(self.first.pk)
+        self.counter.increment(self.first.pk)
+        self.assertViewCounts(0, 0)
+        self.counter.increment(self.second.pk)
+        self.assertViewCounts(2, 1)
+
+    def test_failed_flush_requeues_views(self):
+        self.counter.add(self.first.pk, 2)
+        self.counter.add(self.second.pk, 1)
+
+        with mock.patch.object(view_counters, 'write_view_counts', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.counter.flush()
+        self.assertViewCounts(0, 0)
+        self.assertEqual(self.counter.stats()['buffered_views'], 3)
+
+        self.counter.add(self.first.pk, 1)
+        self.assertEqual(self.counter.flush(), 4)
+        self.assertViewCounts(3, 1)
+        self.assertEqual(self.counter.stats()['buffered_views'], 0)
+
+
+class InMemoryViewCounterTestCase(ViewCounterTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.counter = InMemoryViewCounter(flush_interval=3600, max_buffered=1000)
+        self.addCleanup(atexit.unregister, self.counter._flush_at_exit)
+
+    def test_flush_at_exit(self):
+        self.counter.add(self.first.pk, 2)
+
+        self.counter._flush_at_exit()
+        self.assertViewCounts(2, 0)
+
+        # A failed flush is logged, as there is nothing to raise it to
+        self.counter.add(self.second.pk, 1)
+        with mock.patch.object(view_counters, 'write_view_counts', side_effect=RuntimeError):
+            with self.assertLogs('netflix.view_counters', level='ERROR'):
+                self.counter._flush_at_exit()
+
+    def test_flush_command_requires_cache_counter(self):
+        with mock.patch.object(view_counters, '_view_counter', self.counter):
+            with self.assertRaisesMessage(CommandError, 'CacheViewCounter'):
+                call_command('flush_view_counts', stdout=StringIO())
+
+
+@override_settings(
+    CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'view-counter': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'view-counter',
+        },
+    }
+)
+class CacheViewCounterTestCase(ViewCounterTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        caches['view-counter'].clear()
+        self.counter = CacheViewCounter(
+            cache_alias='view-counter', flush_interval=3600, max_buffered=1000
+        )
+
+    def test_flush_while_journal_entry_is_being_written(self):
+        self.counter.add(self.first.pk, 1)
+
+        # Flush in between add() numbering the journal entry for the second
+        # video and writing it
+        cache_set = self.counter.cache.set
+
+        def set_after_flush(key, value, **kwargs):
+            if key.startswith(self.counter._key('journal')) and value == self.second.pk:
+                self.assertEqual(self.counter.flush(), 1)
+            cache_set(key, value, **kwargs)
+
+        with mock.patch.object(self.counter.cache, 'set', side_effect=set_after_flush):
+            self.counter.add(self.second.pk, 2)
+        self.assertViewCounts(1, 0)
+
+        self.assertEqual(self.counter.flush(), 2)
+        self.assertViewCounts(1, 2)
+
+        # The second video's later views are journalled and flushed too
+        self.counter.add(self.second.pk, 1)
+        self.assertEqual(self.counter.flush(), 1)
+        self.assertViewCounts(1, 3)
+
+    def test_journal_entry_that_is_never_written_is_skipped(self):
+        # add() died after numbering its journal entry
+        self.counter.cache.add(self.counter._key('pending', self.second.pk), 1)
+        self.counter._incr(self.counter._key('journal'))
+        self.counter.add(self.first.pk, 1)
+
+        self.assertEqual(self.counter.flush(), 1)
+        self.assertViewCounts(1, 0)
+        self.assertEqual(self.counter._journal_range(), (0, 2))
+
+        with mock.patch.object(
+            view_counters.time, 'time',
+            return_value=view_counters.time.time() + self.counter.journal_gap_timeout,
+        ):
+            self.counter.add(self.first.pk, 1)
+            self.assertEqual(self.counter.flush(), 1)
+        self.assertViewCounts(2, 0)
+        self.assertEqual(self.counter._journal_range(), (3, 3))
+
+    def test_flush_from_another_process(self):
+        self.counter.add(self.first.pk, 2)
+
+        other_counter = CacheViewCounter(cache_alias='view-counter')
+        self.assertEqual(other_counter.flush(), 2)
+        self.assertViewCounts(2, 0)
+        self.assertEqual(self.counter.stats()['flushed_views'], 2)
+
+    def test_flush_command(self):
+        self.counter.add(self.first.pk, 2)
+
+        stdout = StringIO()
+        with mock.patch.object(view_counters, '_view_counter', self.counter):
+            call_command('flush_view_counts', stdout=stdout)
+        self.assertIn('Flushed 2 views', stdout.getvalue())
+        self.assertViewCounts(2, 0)
+
+    def test_concurrent_flushes_write_views_once(self):
+        self.counter.add(self.first.pk, 2)
+        self.counter.add(self.second.pk, 1)
+        self.counter.max_buffered = 3
+        other_counter = CacheViewCounter(
+            cache_alias='view-counter', flush_interval=3600, max_buffered=3
+        )
+
+        # Another process flushes, both directly and because the buffer is
+        # full, while the first flush is writing the counts it read
+        write = view_counters.write_view_counts
+
+        def write_during_other_flushes(counts):
+            self.assertEqual(other_counter.flush(), 0)
+            other_counter.increment(self.first.pk)
+            return write(counts)
+
+        with mock.patch.object(
+            view_counters, 'write_view_counts', side_effect=write_during_other_flushes
+        ):
+            self.assertEqual(self.counter.flush(), 3)
+        self.assertViewCounts(2, 1)
+
+        # The view recorded during the flush is written by the next one
+        self.assertEqual(other_counter.flush(), 1)
+        self.assertViewCounts(3, 1)
+        self.assertEqual(self.counter.stats()['buffered_views'], 0)
+
+
+class RailsTestCase(VideoTestMixin, TestCase):
+    def setUp(self):
+        # Anonymous pages and home page blocks are cached per catalog generation
+        cache.clear()
+        self.add_categories(['Trending', 'Popular', 'New Releases', 'Documentaries'])
+
+    def add_categories(self, names):
+        start = Category.objects.count()
+        for order, name in enumerate(names, start=start):
+            category = Category.objects.create(
+                name=name, slug=name.lower().replace(' ', '-'), order=order
+            )
+            for i in range(3):
+                self.create_video(
+                    f"{name} {i}", [category], video_type='movie' if i else 'series',
+                    created_at=timezone.now() - timedelta(days=i * 20),
+                    rating_percentage=70 + i * 10, is_featured=not i,
+                )
+
+    def assertConstantQueries(self, num, url):
+        """The page takes ``num`` queries, however many categories there are"""
+        with self.assertNumQueries(num):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        self.add_categories(['Comedy', 'Drama', 'Thriller'])
+        cache.clear()
+        with self.assertNumQueries(num):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_home_page(self):
+        # The featured videos, the rails and the AI recommendations
+        self.assertConstantQueries(3, reverse('netflix:home'))
+
+    def test_browse_page(self):
+        response = self.assertConstantQueries(1, reverse('netflix:browse'))
+        self.assertEqual(len(response.context['categories']), 7)
+
+    def test_browse_page_filters(self):
+        for filter_type in ['series', 'movie', 'new', 'mylist']:
+            with self.subTest(filter_type=filter_type):
+                cache.clear()
+                with self.assertNumQueries(1):
+                    response = self.client.get(reverse('netflix:browse'), {'type': filter_type})
+                self.assertEqual(response.status_code, 200)
+
+    def test_player_rails(self):
+        video = Video.objects.get(title='Popular 0')
+        # The video and the recommended rail
+        response = self.assertConstantQueries(2, reverse('netflix:player', args=[video.pk]))
+        self.assertEqual(
+            [card['title'] for card in response.context['recommended']],
+            ['Popular 1', 'Popular 2'],
+        )
+
+    def test_fetch_rails(self):
+        with self.assertNumQueries(1):
+            rails = fetch_rails(2)
+        self.assertEqual(
+            [(category.name, [video.title for video in videos]) for category, videos in rails],
+            [
+                ('Trending', ['Trending 0', 'Trending 1']),
+                ('Popular', ['Popular 0', 'Popular 1']),
+                ('New Releases', ['New Releases 0', 'New Releases 1']),
+                ('Documentaries', ['Documentaries 0', 'Documentaries 1']),
+            ],
+        )
+
+    def test_browse_rails_filters(self):
+        with self.assertNumQueries(1):
+            rails = browse_rails('series')
+        self.assertEqual(rails[0], {'name': 'Trending', 'videos': [mock.ANY]})
+        self.assertEqual(rails[0]['videos'][0]['title'], 'Trending 0')
+
+        # Only videos rated at least 85
+        rails = browse_rails('mylist')
+        self.assertEqual([card['title'] for card in rails[0]['videos']], ['Trending 2'])
+
+
+class CatalogCacheTestCase(VideoTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='Trending', slug='trending')
+        self.video = self.create_video(
+            'Cached title', [self.category], description='A cached video', is_featured=True
+        )
+
+    def get_home(self):
+        response = self.client.get(reverse('netflix:home'))
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_anonymous_home_page_is_cached(self):
+        self.assertIn('Cached title', self.get_home())
+        with self.assertNumQueries(0):
+            self.assertIn('Cached title', self.get_home())
+
+    def test_video_change_invalidates_home_page(self):
+        generation = catalog_cache.get_generation()
+        self.get_home()
+
+        self.video.title = 'Renamed title'
+        self.video.save()
+        self.assertNotEqual(catalog_cache.get_generation(), generation)
+
+        content = self.get_home()
+        self.assertIn('Renamed title', content)
+        self.assertNotIn('Cached title', content)
+
+    def test_category_changes_invalidate_home_page(self):
+        self.get_home()
+        generation = catalog_cache.get_generation()
+
+        self.video.categories.clear()
+        self.assertNotEqual(catalog_cache.get_generation(), generation)
+        generation = catalog_cache.get_generation()
+
+        self.category.delete()
+        self.assertNotEqual(catalog_cache.get_generation(), generation)
+
+    def test_view_count_flush_keeps_home_page(self):
+        self.get_home()
+        generation = catalog_cache.get_generation()
+
+        self.video.view_count = 10
+        self.video.save(update_fields=['view_count'])
+        self.assertEqual(catalog_cache.get_generation(), generation)
+        with self.assertNumQueries(0):
+            self.get_home()
+
+    def test_evicted_generation_is_not_reused(self):
+        generation = catalog_cache.get_generation()
+        self.get_home()
+
+        cache.delete(catalog_cache.GENERATION_KEY)
+        self.assertGreater(catalog_cache.get_generation(), generation)
+
+        catalog_cache.bump_generation()
+        cache.delete(catalog_cache.GENERATION_KEY)
+        catalog_cache.bump_generation()
+        self.assertGreater(catalog_cache.get_generation(), generation)
+
+    def test_authenticated_home_page_is_not_cached(self):
+        self.get_home()
+        user = User.objects.create_user('viewer', password='password')
+        self.client.force_login(user)
+
+        response = self.client.get(reverse('netflix:home'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['user'], user)
+
+
+class MediaTestMixin:
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def create_media_file(self, content=b'0123456789' * 100, name='clip.mp4', **kwargs):
+        media_file = MediaFile(**kwargs)
+        media_file.file.save(name, ContentFile(content), save=False)
+        media_file.save()
+        return media_file
+
+
+class MediaSourceViewTestCase(MediaTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.media_file = self.create_media_file()
+        self.url = self.media_file.get_source_url()
+
+    def test_get(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789' * 100)
+        self.assertEqual(response['Content-Type'], 'video/mp4')
+        self.assertEqual(response['ETag'], f'"{self.media_file.file_hash}"')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=3600')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+    def test_range(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-14')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), b'01234')
+        self.assertEqual(response['Content-Range'], 'bytes 10-14/1000')
+        self.assertEqual(response['Content-Length'], '5')
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2000-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */1000')
+
+    def test_if_none_match(self):
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=f'"{self.media_file.file_hash}"')
+        self.assertEqual(response.status_code, 304)
+
+        # A replaced file has a new ETag
+        self.media_file.file.save('other.mp4', ContentFile(b'replaced'))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=f'"{self.media_file.file_hash}"')
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'replaced')
+
+    def test_missing(self):
+        request = RequestFactory().get(self.url)
+        with self.assertRaises(Http404):
+            media_views.media_source(request, self.media_file.pk + 1)
+
+        Path(self.media_file.file.path).unlink()
+        with self.assertRaises(Http404):
+            media_views.media_source(request, self.media_file.pk)
+
+    def test_post_not_allowed(self):
+        self.assertEqual(self.client.post(self.url).status_code, 405)
+
+
+class MediaSegmentViewTestCase(MediaTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.media_file = self.create_media_file()
+        self.media_file.segments_dir.mkdir(parents=True)
+        (self.media_file.segments_dir / 'index.m3u8').write_text('#EXTM3U\n')
+        (self.media_file.segments_dir / 'segment_00000.ts').write_bytes(b'segment data')
+        self.version = self.media_file.segment_version
+
+    def get_url(self, name, version=None):
+        return reverse('netflix:media_segment', args=[self.media_file.pk, version or self.version, name])
+
+    def test_playlist(self):
+        self.media_file.segment_status = 'ready'
+        self.assertEqual(self.media_file.get_hls_url(), self.get_url('index.m3u8'))
+
+        # Segments are served straight from disk
+        with self.assertNumQueries(0):
+            response = self.client.get(self.get_url('index.m3u8'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'#EXTM3U\n')
+        self.assertEqual(response['Content-Type'], 'application/vnd.apple.mpegurl')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+
+    def test_segment(self):
+        url = self.get_url('segment_00000.ts')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'video/mp2t')
+        self.assertEqual(response['ETag'], f'"{self.version}-segment_00000.ts"')
+
+        response = self.client.get(url, HTTP_RANGE='bytes=0-6')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), b'segment')
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=f'"{self.version}-segment_00000.ts"')
+        self.assertEqual(response.status_code, 304)
+
+    def test_not_found(self):
+        request = RequestFactory().get('/')
+        for version, name in [
+            (self.version, 'segment_00001.ts'),
+            ('0000-6', 'index.m3u8'),
+            # Only playlists and segments in a version directory can be requested
+            (self.version, 'clip.mp4'),
+            ('..', 'index.m3u8'),
+        ]:
+            with self.subTest(version=version, name=name), self.assertRaises(Http404):
+                media_views.media_segment(request, self.media_file.pk, version, name)
+
+    def test_hls_url_only_when_ready(self):
+        self.assertEqual(self.media_file.segment_status, 'pending')
+        self.assertIsNone(self.media_file.get_hls_url())
+
+
+class SegmentMediaTestCase(MediaTestMixin, TestCase):
+    def test_ffmpeg_unavailable(self):
+        media_file = self.create_media_file()
+        with override_settings(NETFLIX_FFMPEG_BINARY=None), mock.patch.object(media.shutil, 'which', return_value=None):
+            self.assertFalse(media.segment_media_file(media_file))
+            with self.assertRaises(CommandError):
+                call_command('segment_media', stdout=StringIO())
+
+        media_file.refresh_from_db()
+        self.assertEqual(media_file.segment_status, 'unavailable')
+
+    def test_ffmpeg_failure(self):
+        media_file = self.create_media_file()
+        with override_settings(NETFLIX_FFMPEG_BINARY=shutil.which('false') or '/bin/false'):
+            with self.assertLogs('netflix.media', 'WARNING'):
+                self.assertFalse(media.segment_media_file(media_file))
+
+        media_file.refresh_from_db()
+        self.assertEqual(media_file.segment_status, 'failed')
+        self.assertEqual(media_file.segment_count, 0)
+        self.assertFalse(media_file.segments_dir.exists())
+
+    def test_build_segment_command(self):
+        command = media.build_segment_command('ffmpeg', '/in/clip.mp4', Path('/out'), 4)
+        self.assertEqual(command[command.index('-hls_time') + 1], '4')
+        self.assertEqual(command[command.index('-hls_segment_filename') + 1], '/out/segment_%05d.ts')
+        self.assertEqual(command[-1], '/out/index.m3u8')
+
+    def segment_with_fake_ffmpeg(self, media_file, segment_count, during_run=None):
+        def run(command, **kwargs):
+            output_dir = Path(command[-1]).parent
+            for number in range(segment_count):
+                (output_dir / f'segment_{number:05d}.ts').write_bytes(b'segment')
+            (output_dir / 'index.m3u8').write_text(f'#EXTM3U\n# {segment_count} segments\n')
+            if during_run:
+                during_run()
+
+        with override_settings(NETFLIX_FFMPEG_BINARY='ffmpeg'), mock.patch.object(
+            media.subprocess, 'run', side_effect=run
+        ):
+            self.assertTrue(media.segment_media_file(media_file))
+
+    def assertSegmentServed(self, media_file, name):
+        url = reverse('netflix:media_segment', args=[media_file.pk, media_file.segment_version, name])
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_resegment_serves_current_segments_until_replaced(self):
+        media_file = self.create_media_file()
+        self.segment_with_fake_ffmpeg(media_file, 3)
+        self.assertEqual(media_file.segment_count, 3)
+
+        def during_run():
+            self.assertSegmentServed(media_file, 'index.m3u8')
+            self.assertSegmentServed(media_file, 'segment_00002.ts')
+
+        self.segment_with_fake_ffmpeg(media_file, 2, during_run)
+
+        media_file.refresh_from_db()
+        self.assertEqual(media_file.segment_status, 'ready')
+        self.assertEqual(media_file.segment_count, 2)
+        self.assertEqual(
+            sorted(path.name for path in media_file.segments_dir.parent.iterdir()),
+            [media_file.segment_version],
+        )
+        self.assertEqual(
+            sorted(path.name for path in media_file.segments_dir.iterdir()),
+            ['index.m3u8', 'segment_00000.ts', 'segment_00001.ts'],
+        )
+        self.assertIn('2 segments', (media_file.segments_dir / 'index.m3u8').read_text())
+
+    def test_new_version_replaces_old_version_once_ready(self):
+        media_file = self.create_media_file()
+        self.segment_with_fake_ffmpeg(media_file, 3)
+        old_segments_dir = media_file.segments_dir
+
+        media_file.segment_duration = 4
+        media_file.save()
+
+        def during_run():
+            self.assertTrue(old_segments_dir.exists())
+
+        self.segment_with_fake_ffmpeg(media_file, 1, during_run)
+
+        self.assertFalse(old_segments_dir.exists())
+        self.assertEqual(
+            [path.name for path in media_file.segments_dir.parent.iterdir()],
+            [media_file.segment_version],
+        )
+        self.assertSegmentServed(media_file, 'segment_00000.ts')
+
+    @skipUnless(shutil.which('ffmpeg'), 'ffmpeg is not installed')
+    def test_segment_media(self):
+        source = Path(self.enterContext(tempfile.TemporaryDirectory())) / 'sample.mp4'
+        subprocess.run(
+            [
+                'ffmpeg', '-loglevel', 'error', '-f', 'lavfi', '-i', 'testsrc=duration=3:size=64x48:rate=10',
+                '-g', '10', '-pix_fmt', 'yuv420p', str(source),
+            ],
+            check=True,
+        )
+        media_file = self.create_media_file(source.read_bytes(), name='sample.mp4', segment_duration=1)
+        ready = self.create_media_file(b'ready', name='ready.mp4')
+        MediaFile.objects.filter(pk=ready.pk).update(segment_status='ready')
+
+        stdout = StringIO()
+        call_command('segment_media', stdout=stdout)
+        self.assertIn(f'Segmented {media_file}', stdout.getvalue())
+        # Only pending media files are segmented by default
+        self.assertNotIn(f'{ready}', stdout.getvalue())
+
+        media_file.refresh_from_db()
+        self.assertEqual(media_file.segment_status, 'ready')
+        self.assertGreaterEqual(media_file.segment_count, 2)
+
+        response = self.client.get(media_file.get_hls_url())
+        self.assertEqual(response.status_code, 200)
+        playlist = b''.join(response.streaming_content).decode()
+        self.assertIn('segment_00000.ts', playlist)
+        self.assertIn('#EXT-X-ENDLIST', playlist)
+
+
+class VideoCardTestCase(VideoTestMixin, TestCase):
+    def setUp(self):
+        self.video = self.create_video('Card title', video_type='series', rating_percentage=91)
+
+    def assertCardMatchesVideo(self, video):
+        card = VideoCard.objects.get(video=video)
+        video.refresh_from_db()
+        self.assertEqual(card.as_dict(), VideoCard.from_video(video).as_dict())
+
+    def test_card_created_and_refreshed_on_save(self):
+        self.assertCardMatchesVideo(self.video)
+
+        self.video.title = 'New title'
+        self.video.thumbnail = 'https://example.com/new.jpg'
+        self.video.save()
+        self.assertEqual(VideoCard.objects.get(video=self.video).title, 'New title')
+        self.assertCardMatchesVideo(self.video)
+
+    def test_card_not_written_for_other_fields(self):
+        self.video.view_count = 5
+        self.video.description = 'Not on the card'
+        with mock.patch.object(VideoCard, 'sync') as sync:
+            self.video.save(update_fields=['view_count', 'description'])
+        sync.assert_not_called()
+
+        self.video.title = 'Updated'
+        self.video.save(update_fields=['title'])
+        self.assertEqual(VideoCard.objects.get(video=self.video).title, 'Updated')
+
+    def test_card_deleted_with_video(self):
+        self.video.delete()
+        self.assertFalse(VideoCard.objects.exists())
+
+    def test_cards_queryset(self):
+        self.create_video('Other')
+        with self.assertNumQueries(1):
+            cards = [video.get_card() for video in Video.objects.order_by('title').cards()]
+        self.assertEqual(
+            cards[0],
+            {
+                'id': self.video.pk,
+                'title': 'Card title',
+                'thumbnail': 'https://example.com/thumb.jpg',
+                'rating': '91%',
+                'year': 2020,
+                'video_type': 'TV Series',
+                'age_rating': self.video.age_rating,
+            },
+        )
+        self.assertEqual(cards[1]['title'], 'Other')
+
+    def test_get_card_without_card(self):
+        VideoCard.objects.all().delete()
+        video = Video.objects.get(pk=self.video.pk)
+        self.assertEqual(video.get_card(), VideoCard.from_video(self.video).as_dict())
+
+    def test_cards_queryset_without_cards(self):
+        self.create_video('Other')
+        VideoCard.objects.filter(video=self.video).delete()
+
+        # One query for the videos, and one for the video without a card
+        with self.assertNumQueries(2):
+            cards = [video.get_card() for video in Video.objects.order_by('title').cards()]
+        self.assertEqual(cards[0], VideoCard.from_video(self.video).as_dict())
+        self.assertEqual(cards[1]['title'], 'Other')
+
+    def test_rebuild_video_cards(self):
+        other = self.create_video('Other')
+        # Bulk updates bypass the signal handlers
+        Video.objects.filter(pk=self.video.pk).update(title='Bulk updated')
+        VideoCard.objects.filter(video=other).delete()
+
+        stdout = StringIO()
+        call_command('rebuild_video_cards', stdout=stdout)
+        self.assertIn('Rebuilt 2 video cards', stdout.getvalue())
+        self.assertEqual(VideoCard.objects.get(video=self.video).title, 'Bulk updated')
+        self.assertCardMatchesVideo(other)
+
+    def test_backfill_migration(self):
+        other = self.create_video('Other')
+        VideoCard.objects.all().delete()
+
+        migration = importlib.import_module('netflix.migrations.0004_videocard')
+        migration.create_video_cards(apps, None)
+        self.assertCardMatchesVideo(self.video)
+        self.assertCardMatchesVideo(other)
+
+
+class SearchTestCase(VideoTestMixin, TestCase):
+    def setUp(self):
+        self.space_title = self.create_video('Space Odyssey', description='A long voyage')
+        self.space_description = self.create_video(
+            'The Voyage', description='A crew travels through space'
+        )
+        self.space_tag = self.create_video('Starlight', tags='space, adventure')
+        self.director = self.create_video('Ocean Deep', director='Jane Spacek')
+        self.inactive = self.create_video('Space Hidden', is_active=False)
+
+    def search(self, query):
+        response = self.client.get(reverse('netflix:search'), {'q': query})
+        self.assertEqual(response.status_code, 200)
+        categories = response.context['categories']
+        if not categories:
+            return []
+        self.assertEqual(categories[0]['name'], 'Top Results')
+        return [card['title'] for card in categories[0]['videos']]
+
+    def autocomplete(self, query):
+        response = self.client.get(reverse('netflix:search_autocomplete'), {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return [result['title'] for result in response.json()['results']]
+
+    def test_search(self):
+        # Title, tag and description matches, but not inactive videos (the
+        # ranking itself is up to the search backend)
+        self.assertCountEqual(self.search('space'), ['Space Odyssey', 'The Voyage', 'Starlight'])
+
+    def test_search_other_fields(self):
+        self.assertEqual(self.search('adventure'), ['Starlight'])
+        self.assertEqual(self.search('Spacek'), ['Ocean Deep'])
+        self.assertEqual(self.search('travels'), ['The Voyage'])
+
+    def test_search_no_results(self):
+        self.assertEqual(self.search('nonexistent'), [])
+
+    def test_empty_search(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('netflix:search'), {'q': '  '})
+        self.assertEqual(response.context['categories'], [])
+        self.assertEqual(response.context['page_title'], 'Search')
+
+    def test_search_results_are_cards(self):
+        card = self.client.get(reverse('netflix:search'), {'q': 'odyssey'}).context['categories'][0]['videos'][0]
+        self.assertEqual(card, VideoCard.from_video(self.space_title).as_dict())
+
+    def test_autocomplete(self):
+        self.assertEqual(self.autocomplete('Odys'), ['Space Odyssey'])
+        self.assertCountEqual(self.autocomplete('spa'), ['Space Odyssey', 'Ocean Deep'])
+        self.assertEqual(self.autocomplete(''), [])
+
+    def test_autocomplete_limit(self):
+        for i in range(10):
+            self.create_video(f'Spaceship {i}')
+        self.assertEqual(len(self.autocomplete('spaceship')), 8)
+
+
+class KeysetPaginationTestCase(VideoTestMixin, TestCase):
+    def setUp(self):
+        # Groups of videos tied on created_at, so that pages have to break
+        # ties by id
+        now = timezone.now()
+        for i in range(8):
+            self.create_video(f'Video {i}', created_at=now - timedelta(hours=i // 3))
+        self.expected = list(Video.objects.order_by('-created_at', '-id'))
+
+    def walk_forward(self, per_page):
+        pages = [keyset_page(Video.objects.all(), per_page=per_page)]
+        while pages[-1].has_next():
+            pages.append(keyset_page(Video.objects.all(), pages[-1].next_cursor, per_page=per_page))
+        return pages
+
+    def test_next_pages(self):
+        for per_page in (1, 2, 3, 4, 8):
+            with self.subTest(per_page=per_page):
+                pages = self.walk_forward(per_page)
+                self.assertEqual([video for page in pages for video in page], self.expected)
+                self.assertFalse(pages[0].has_previous())
+                self.assertTrue(all(page.has_previous() for page in pages[1:]))
+                self.assertTrue(all(len(page) == per_page for page in pages[:-1]))
+
+    def test_previous_pages(self):
+        for per_page in (1, 2, 3, 4):
+            with self.subTest(per_page=per_page):
+                pages = self.walk_forward(per_page)
+
+                page = pages[-1]
+                for expected_page in reversed(pages[:-1]):
+                    page = keyset_page(Video.objects.all(), page.previous_cursor, per_page=per_page)
+                    self.assertEqual(page.object_list, expected_page.object_list)
+                    self.assertTrue(page.has_next())
+                self.assertFalse(page.has_previous())
+
+    def test_new_rows_do_not_shift_next_pages(self):
+        first_page = keyset_page(Video.objects.all(), per_page=3)
+        self.create_video('Newest')
+        second_page = keyset_page(Video.objects.all(), first_page.next_cursor, per_page=3)
+        self.assertEqual(second_page.object_list, self.expected[3:6])
+
+    def test_ordering_is_replaced(self):
+        page = keyset_page(Video.objects.order_by('title'), per_page=8)
+        self.assertEqual(page.object_list, self.expected)
+
+    def test_empty(self):
+        page = keyset_page(Video.objects.none())
+        self.assertEqual(len(page), 0)
+        self.assertFalse(page.has_next())
+        self.assertFalse(page.has_previous())
+
+    def test_cursors(self):
+        video = self.expected[0]
+        cursor = encode_cursor('prev', video.created_at, video.pk)
+        self.assertEqual(decode_cursor(cursor), ('prev', video.created_at, video.pk))
+
+        for cursor in ['', 'not base64!', encode_cursor('up', video.created_at, 1), 'bmV4dHx4fDE']:
+            with self.subTest(cursor=cursor):
+                self.assertIsNone(decode_cursor(cursor))
+                # An invalid cursor shows the first page
+                self.assertEqual(keyset_page(Video.objects.all(), cursor, per_page=2).object_list, self.expected[:2])
+
+    def test_estimate_count(self):
+        self.assertEqual(estimate_count(Video.objects.all()), (8, True))
+        self.assertEqual(estimate_count(Video.objects.all(), cap=5), (5, False))
+        self.assertEqual(estimate_count(Video.objects.filter(title='Video 1'), cap=5), (1, True))
+
+
+class BenchmarkVideoQueriesTestCase(VideoTestMixin, TestCase):
+    def test_synthetic_catalog(self):
+        stdout = StringIO()
+        call_command('benchmark_video_queries', videos=60, categories=3, repeat=1, stdout=stdout)
+        output = stdout.getvalue()
+
+        self.assertIn('Generating 60 videos in 3 categories', output)
+        for name in ['home: rails', 'browse: new', 'player: recommended', 'content manager: first page']:
+            self.assertIn(name, output)
+        # Rails take a single query whatever the number of categories
+        self.assertIn('browse: all\n  1 queries', output)
+        self.assertIn('Synthetic catalog rolled back', output)
+        self.assertFalse(Video.objects.exists())
+        self.assertFalse(Category.objects.exists())
+
+    def test_existing_catalog(self):
+        category = Category.objects.create(name='Drama', slug='drama')
+        self.create_video('Existing', [category])
+
+        stdout = StringIO()
+        call_command('benchmark_video_queries', existing=True, no_explain=True, repeat=1, stdout=stdout)
+        output = stdout.getvalue()
+
+        self.assertIn('player: recommended', output)
+        self.assertNotIn('SELECT', output)
+        self.assertNotIn('rolled back', output)
+        self.assertEqual(Video.objects.count(), 1)
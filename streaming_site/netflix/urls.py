@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views, admin_views
+from . import views, admin_views, media_views
 
 app_name = 'netflix'
 
@@ -8,10 +8,16 @@ urlpatterns = [
     path('', views.NetflixHomeView.as_view(), name='home'),
     path('watch/<int:video_id>/', views.VideoPlayerView.as_view(), name='player'),
     path('browse/', views.BrowseView.as_view(), name='browse'),
+    path('search/', views.SearchView.as_view(), name='search'),
+    path('search/autocomplete/', views.SearchAutocompleteView.as_view(), name='search_autocomplete'),
     path('login/', views.LoginView.as_view(), name='login'),
     path('register/', views.RegisterView.as_view(), name='register'),
     path('logout/', views.LogoutView.as_view(), name='logout'),
     
+    # Media origin (uploaded video files and HLS segments)
+    path('stream/<int:media_id>/source/', media_views.media_source, name='media_source'),
+    path('stream/<int:media_id>/hls/<str:version>/<str:name>', media_views.media_segment, name='media_segment'),
+    
     # Netflix-Style Admin Panel
     path('content-manager/', admin_views.admin_dashboard, name='admin_dashboard'),
     path('content-manager/videos/', admin_views.admin_video_list, name='admin_video_list'),
@@ -0,0 +1,340 @@
+"""
+Write-behind view counting for VideoPlayerView.
+
+Instead of a read-modify-write ``video.save(update_fields=['view_count'])``
+on every page load, views are collected in a buffer and periodically written
+out as ``F('view_count') + n`` bulk updates (one UPDATE per distinct ``n``).
+
+The backend is configured with the ``NETFLIX_VIEW_COUNTER`` setting::
+
+    NETFLIX_VIEW_COUNTER = {
+        'BACKEND': 'netflix.view_counters.CacheViewCounter',
+        'FLUSH_INTERVAL': 10,  # seconds between automatic flushes
+        'MAX_BUFFERED': 1000,  # flush early once this many views are pending
+        'OPTIONS': {'cache_alias': 'default'},
+    }
+
+``CacheViewCounter`` (the default) keeps the buffer in the cache backend,
+so a shared cache (Redis, Memcached) lets any process, such as the
+``flush_view_counts`` management command, write it out. ``InMemoryViewCounter``
+keeps the buffer in the worker process, so it can only be flushed from that
+process: on a view once the flush interval has passed, and when the process
+exits. Views buffered by a worker that is killed are lost.
+"""
+import atexit
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'BACKEND': 'netflix.view_counters.CacheViewCounter',
+    'FLUSH_INTERVAL': 10,
+    'MAX_BUFFERED': 1000,
+    'OPTIONS': {},
+}
+
+
+def write_view_counts(counts):
+    """Apply ``{video_id: views}`` with one ``F()`` UPDATE per distinct increment"""
+    from .models import Video
+
+    by_increment = defaultdict(list)
+    for video_id, views in counts.items():
+        if views > 0:
+            by_increment[views].append(video_id)
+
+    for views, video_ids in by_increment.items():
+        Video.objects.filter(pk__in=video_ids).update(view_count=F('view_count') + views)
+
+    return sum(counts.values())
+
+
+class BaseViewCounter:
+    def __init__(self, flush_interval=10, max_buffered=1000, **options):
+        self.flush_interval = flush_interval
+        self.max_buffered = max_buffered
+
+    def increment(self, video_id, views=1):
+        """Record ``views`` new views of ``video_id``, flushing if it is due"""
+        self.add(video_id, views)
+        if self.flush_due():
+            self.flush()
+
+    def add(self, video_id, views):
+        raise NotImplementedError
+
+    def flush_due(self):
+        raise NotImplementedError
+
+    def flush(self):
+        """Write the buffered views to the database and return how many were written"""
+        raise NotImplementedError
+
+    def stats(self):
+        """
+        Return a dict of buffered-vs-flushed metrics:
+
+        * ``buffered_views`` - views not yet written (lost if the buffer is lost)
+        * ``buffered_videos`` - number of videos with buffered views
+        * ``flushed_views`` - views written since the counter was created
+        * ``flushes`` - number of flushes that wrote at least one view
+        * ``last_flush_at`` - time of the last such flush, or None
+        """
+        raise NotImplementedError
+
+
+class InMemoryViewCounter(BaseViewCounter):
+    """
+    Buffer views in a dict in the current process.
+
+    Nothing outside the process can flush the buffer, so it is also flushed
+    when the process exits.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._lock = threading.Lock()
+        self._pending = defaultdict(int)
+        self._buffered_views = 0
+        self._flushed_views = 0
+        self._flushes = 0
+        self._last_flush_at = None
+        self._last_flush = time.monotonic()
+        atexit.register(self._flush_at_exit)
+
+    def _flush_at_exit(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Failed to flush %s buffered views at exit', self._buffered_views)
+
+    def add(self, video_id, views):
+        with self._lock:
+            self._pending[video_id] += views
+            self._buffered_views += views
+
+    def flush_due(self):
+        return (
+            self._buffered_views >= self.max_buffered
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        )
+
+    def flush(self):
+        with self._lock:
+            pending = self._pending
+            self._pending = defaultdict(int)
+            self._buffered_views = 0
+            self._last_flush = time.monotonic()
+
+        if not pending:
+            return 0
+
+        try:
+            flushed = write_view_counts(pending)
+        except Exception:
+            # Put the views back so that they are retried on the next flush
+            with self._lock:
+                for video_id, views in pending.items():
+                    self._pending[video_id] += views
+                    self._buffered_views += views
+            raise
+
+        with self._lock:
+            self._flushed_views += flushed
+            self._flushes += 1
+            self._last_flush_at = timezone.now()
+        return flushed
+
+    def stats(self):
+        with self._lock:
+            return {
+                'buffered_views': self._buffered_views,
+                'buffered_videos': len(self._pending),
+                'flushed_views': self._flushed_views,
+                'flushes': self._flushes,
+                'last_flush_at': self._last_flush_at,
+            }
+
+
+class CacheViewCounter(BaseViewCounter):
+    """
+    Buffer views in a Django cache backend, shared between processes.
+
+    Each video's pending views live in their own counter key. The first view
+    of a video since it was last flushed appends its id to a journal (a
+    sequence of keys numbered by an atomic ``incr``), which is what a flush
+    walks to find the videos with pending views.
+    """
+
+    key_prefix = 'netflix:view-counter'
+
+    # Seconds after which a journal entry that is still missing (because the
+    # process adding it died between numbering and writing it) is skipped
+    journal_gap_timeout = 60
+    # Seconds after which a video's pending marker expires, so that a video
+    # whose journal entry was skipped is journalled again on its next view
+    pending_timeout = 3600
+    # Seconds after which a flush lock is assumed to have been abandoned by a
+    # process that died while flushing
+    flush_lock_timeout = 300
+
+    def __init__(self, cache_alias='default', **kwargs):
+        super().__init__(**kwargs)
+        self.cache = caches[cache_alias]
+
+    def _key(self, *parts):
+        return ':'.join([self.key_prefix, *map(str, parts)])
+
+    def _incr(self, key, delta=1):
+        self.cache.add(key, 0, timeout=None)
+        return self.cache.incr(key, delta)
+
+    def add(self, video_id, views):
+        if self.cache.add(self._key('pending', video_id), 1, timeout=self.pending_timeout):
+            sequence = self._incr(self._key('journal'))
+            self.cache.set(self._key('journal', sequence), video_id, timeout=None)
+        self._incr(self._key('views', video_id), views)
+        self._incr(self._key('buffered'), views)
+
+    def flush_due(self):
+        if (self.cache.get(self._key('buffered')) or 0) >= self.max_buffered:
+            return True
+        # Only the first process to get here in each interval flushes
+        return self.cache.add(self._key('flush-lock'), 1, timeout=self.flush_interval)
+
+    def _journal_range(self):
+        start = self.cache.get(self._key('journal', 'flushed')) or 0
+        end = self.cache.get(self._key('journal')) or 0
+        return start, end
+
+    def _journal_entries(self, start, end):
+        """Return ``{sequence: video_id}`` for the journal entries written so far"""
+        keys = {self._key('journal', sequence): sequence for sequence in range(start + 1, end + 1)}
+        return {keys[key]: video_id for key, video_id in self.cache.get_many(list(keys)).items()}
+
+    def _gap_expired(self, sequence):
+        """
+        Return whether the missing journal entry ``sequence`` has been missing
+        for longer than ``journal_gap_timeout``.
+        """
+        gap = self.cache.get(self._key('journal', 'gap'))
+        if gap is not None and gap[0] == sequence:
+            return time.time() - gap[1] >= self.journal_gap_timeout
+        self.cache.set(self._key('journal', 'gap'), (sequence, time.time()), timeout=None)
+        return False
+
+    def _read_up_to(self, start, end, entries):
+        """
+        Return the last sequence up to which every journal entry has been read.
+
+        ``add()`` numbers a journal entry before writing it, so an entry may be
+        missing because it is still being written; the journal must not be
+        advanced past it, or its video would never be flushed.
+        """
+        for sequence in range(start + 1, end + 1):
+            if sequence not in entries and not self._gap_expired(sequence):
+                return sequence - 1
+        return end
+
+    def flush(self):
+        # A flush reads the pending counts before taking them away, so two
+        # flushes at once would both write the same views. Only one process
+        # flushes at a time; the others leave the views to it.
+        key = self._key('flush-running')
+        token = uuid.uuid4().hex
+        if not self.cache.add(key, token, timeout=self.flush_lock_timeout):
+            return 0
+        try:
+            return self._flush()
+        finally:
+            if self.cache.get(key) == token:
+                self.cache.delete(key)
+
+    def _flush(self):
+        start, end = self._journal_range()
+        if end <= start:
+            return 0
+
+        entries = self._journal_entries(start, end)
+        read_up_to = self._read_up_to(start, end, entries)
+        video_ids = set(entries.values())
+
+        # Clear the pending markers before reading the counts, so that a view
+        # recorded while we flush is journalled again rather than lost
+        self.cache.delete_many([self._key('pending', video_id) for video_id in video_ids])
+        view_keys = {self._key('views', video_id): video_id for video_id in video_ids}
+        counts = {
+            view_keys[key]: views
+            for key, views in self.cache.get_many(list(view_keys)).items()
+            if views
+        }
+        for video_id, views in counts.items():
+            self.cache.decr(self._key('views', video_id), views)
+
+        try:
+            flushed = write_view_counts(counts)
+        except Exception:
+            for video_id, views in counts.items():
+                self.add(video_id, views)
+            self._incr(self._key('buffered'), -sum(counts.values()))
+            raise
+
+        # Entries after a missing one are read again by the next flush, which
+        # is harmless as the counts are taken from the per-video counters
+        if read_up_to > start:
+            self.cache.set(self._key('journal', 'flushed'), read_up_to, timeout=None)
+            self.cache.delete_many(
+                [self._key('journal', sequence) for sequence in range(start + 1, read_up_to + 1)]
+            )
+        if flushed:
+            self._incr(self._key('buffered'), -flushed)
+            self._incr(self._key('flushed'), flushed)
+            self._incr(self._key('flushes'))
+            self.cache.set(self._key('last-flush-at'), timezone.now(), timeout=None)
+        return flushed
+
+    def stats(self):
+        start, end = self._journal_range()
+        video_ids = set(self._journal_entries(start, end).values())
+        counts = self.cache.get_many([self._key('views', video_id) for video_id in video_ids])
+        values = self.cache.get_many(
+            [self._key('flushed'), self._key('flushes'), self._key('last-flush-at')]
+        )
+        return {
+            'buffered_views': sum(counts.values()),
+            'buffered_videos': sum(1 for views in counts.values() if views),
+            'flushed_views': values.get(self._key('flushed'), 0),
+            'flushes': values.get(self._key('flushes'), 0),
+            'last_flush_at': values.get(self._key('last-flush-at')),
+        }
+
+
+_view_counter = None
+_view_counter_lock = threading.Lock()
+
+
+def get_view_counter():
+    """Return the process-wide view counter configured by ``NETFLIX_VIEW_COUNTER``"""
+    global _view_counter
+
+    if _view_counter is None:
+        with _view_counter_lock:
+            if _view_counter is None:
+                config = {**DEFAULT_SETTINGS, **getattr(settings, 'NETFLIX_VIEW_COUNTER', {})}
+                backend_class = import_string(config['BACKEND'])
+                _view_counter = backend_class(
+                    flush_interval=config['FLUSH_INTERVAL'],
+                    max_buffered=config['MAX_BUFFERED'],
+                    **config['OPTIONS'],
+                )
+    return _view_counter
@@ -4,18 +4,49 @@ from django.views import View
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
 from django.contrib import messages
-from django.utils import timezone
-from datetime import timedelta
-from .models import Video, Category
+from django.http import HttpResponse, JsonResponse
+from . import catalog_cache
+from .models import Video
+from .rails import browse_rails, home_rails
+from .view_counters import get_view_counter
 import json
 
 
 class NetflixHomeView(TemplateView):
     template_name = 'netflix/home.html'
     
+    def get(self, request, *args, **kwargs):
+        # Anonymous visitors all see the same page, so cache the rendered HTML
+        # for the current catalog generation (see netflix.catalog_cache)
+        if request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+        
+        cache = catalog_cache.get_cache()
+        key = catalog_cache.make_key('page', 'home')
+        content = cache.get(key)
+        if content is not None:
+            return HttpResponse(content)
+        
+        response = super().get(request, *args, **kwargs)
+        response.add_post_render_callback(
+            lambda response: cache.set(key, response.content, catalog_cache.get_timeout())
+        )
+        return response
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
+        # Each block only changes when the catalog does, so is cached per catalog generation
+        generation = catalog_cache.get_generation()
+        context.update(catalog_cache.get_or_build('home:featured', self.get_featured_context, generation))
+        context.update(catalog_cache.get_or_build('home:rails', self.get_rails_context, generation))
+        context.update(catalog_cache.get_or_build('home:ai', self.get_ai_recommendations_context, generation))
+        
+        return context
+    
+    def get_featured_context(self):
+        context = {}
+        
         # Get multiple featured videos for hero rotation
         featured_videos = Video.objects.filter(is_featured=True, is_active=True)[:5]
         if featured_videos:
@@ -36,24 +67,13 @@ class NetflixHomeView(TemplateView):
             context['featured_videos'] = []
             context['featured_videos_json'] = '[]'
         
-        # Get videos organized by categories
-        categories = Category.objects.filter(is_active=True).prefetch_related('videos')
+        return context
+    
+    def get_rails_context(self):
+        context = {}
         
-        category_videos = {}
-        for category in categories:
-            videos = category.videos.filter(is_active=True)[:6]  # Limit to 6 videos per category
-            if videos:
-                # Convert to dict format for template compatibility
-                category_videos[category.slug] = [
-                    {
-                        'id': video.id,
-                        'title': video.title,
-                        'thumbnail': video.thumbnail,
-                        'rating': video.get_rating_display(),
-                        'year': video.year,
-                    }
-                    for video in videos
-                ]
+        # Get videos organized by categories (one query for all rails)
+        category_videos = home_rails(limit=6)  # Limit to 6 videos per category
         
         # Assign to context with common category names
         context['trending'] = category_videos.get('trending', [])
@@ -63,37 +83,22 @@ class NetflixHomeView(TemplateView):
         
         # If categories don't exist, show all videos in a single row
         if not category_videos:
-            all_videos = Video.objects.filter(is_active=True)[:12]
-            context['all_videos'] = [
-                {
-                    'id': video.id,
-                    'title': video.title,
-                    'thumbnail': video.thumbnail,
-                    'rating': video.get_rating_display(),
-                    'year': video.year,
-                }
-                for video in all_videos
-            ]
+            all_videos = Video.objects.filter(is_active=True).cards()[:12]
+            context['all_videos'] = [video.get_card() for video in all_videos]
         
+        return context
+    
+    def get_ai_recommendations_context(self):
         # AI-Powered Recommendations
         # Generate recommendations based on highest-rated videos and viewing patterns
         ai_recommended_videos = Video.objects.filter(
             is_active=True,
             rating_percentage__gte=85  # High-rated content
-        ).order_by('-view_count', '-rating_percentage')[:6]
-        
-        context['ai_recommendations'] = [
-            {
-                'id': video.id,
-                'title': video.title,
-                'thumbnail': video.thumbnail,
-                'rating': video.get_rating_display(),
-                'year': video.year,
-            }
-            for video in ai_recommended_videos
-        ]
+        ).order_by('-view_count', '-rating_percentage').cards()[:6]
         
-        return context
+        return {
+            'ai_recommendations': [video.get_card() for video in ai_recommended_videos]
+        }
 
 
 class VideoPlayerView(TemplateView):
@@ -104,11 +109,10 @@ class VideoPlayerView(TemplateView):
         video_id = self.kwargs.get('video_id')
         
         # Get the requested video
-        video = get_object_or_404(Video, id=video_id, is_active=True)
+        video = get_object_or_404(Video.objects.select_related('video_file'), id=video_id, is_active=True)
         
-        # Increment view count
-        video.view_count += 1
-        video.save(update_fields=['view_count'])
+        # Increment view count (buffered and written to the database in batches)
+        get_view_counter().increment(video.id)
         
         context['video'] = {
             'id': video.id,
@@ -117,7 +121,9 @@ class VideoPlayerView(TemplateView):
             'year': video.year,
             'rating': video.get_rating_display(),
             'duration': video.get_duration_display(),
-            'video_url': video.video_url,
+            'video_url': video.get_video_url(),
+            'video_content_type': video.get_video_content_type(),
+            'hls_url': video.get_hls_url(),
             'director': video.director,
             'cast': video.cast,
             'age_rating': video.age_rating,
@@ -128,16 +134,9 @@ class VideoPlayerView(TemplateView):
         recommended = Video.objects.filter(
             categories__in=video_categories,
             is_active=True
-        ).exclude(id=video.id).distinct()[:3]
+        ).exclude(id=video.id).distinct().cards()[:3]
         
-        context['recommended'] = [
-            {
-                'id': v.id,
-                'title': v.title,
-                'thumbnail': v.thumbnail
-            }
-            for v in recommended
-        ]
+        context['recommended'] = [v.get_card() for v in recommended]
         
         return context
 
@@ -169,52 +168,52 @@ class BrowseView(TemplateView):
             context['page_title'] = 'Browse All Content'
             context['page_subtitle'] = 'Discover thousands of shows and movies across all genres'
         
-        # Get all active categories with their videos
-        categories_data = []
-        for category in Category.objects.filter(is_active=True).prefetch_related('videos'):
-            videos = category.videos.filter(is_active=True)
-            
-            # Apply type filter
-            if filter_type == 'series':
-                videos = videos.filter(video_type='series')
-            elif filter_type == 'movie':
-                videos = videos.filter(video_type='movie')
-            elif filter_type == 'documentary':
-                videos = videos.filter(video_type='documentary')
-            elif filter_type == 'new':
-                # Get recently added videos or highly viewed content
-                thirty_days_ago = timezone.now() - timedelta(days=30)
-                recent_videos = videos.filter(created_at__gte=thirty_days_ago)
-                if not recent_videos.exists():
-                    # If no recent videos, show top rated and most viewed
-                    videos = videos.order_by('-view_count', '-rating_percentage')
-                else:
-                    videos = recent_videos.order_by('-created_at')
-            elif filter_type == 'mylist':
-                # For My List, show highly rated content (user favorites not yet implemented)
-                videos = videos.filter(rating_percentage__gte=85).order_by('-rating_percentage')
-            
-            if videos:
-                categories_data.append({
-                    'name': category.name,
-                    'videos': [
-                        {
-                            'id': video.id,
-                            'title': video.title,
-                            'thumbnail': video.thumbnail,
-                            'year': video.year,
-                            'video_type': video.get_video_type_display(),
-                            'age_rating': video.age_rating,
-                        }
-                        for video in videos[:12]  # Limit to 12 per category
-                    ]
-                })
+        # Get all active categories with their videos (one query for all rails)
+        categories_data = browse_rails(filter_type, limit=12)  # Limit to 12 per category
         
         context['categories'] = categories_data
         
         return context
 
 
+class SearchView(TemplateView):
+    """Full-text video search, ranked by relevance (see Video.search_fields)"""
+    template_name = 'netflix/browse.html'
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        search_query = self.request.GET.get('q', '').strip()
+        
+        context['search_query'] = search_query
+        context['page_title'] = f'Results for "{search_query}"' if search_query else 'Search'
+        context['page_subtitle'] = 'Movies, TV shows and documentaries matching your search'
+        context['categories'] = []
+        
+        if search_query:
+            results = Video.objects.filter(is_active=True).cards().search(search_query)[:48]
+            if results:
+                context['categories'] = [{
+                    'name': 'Top Results',
+                    'videos': [video.get_card() for video in results],
+                }]
+        
+        return context
+
+
+class SearchAutocompleteView(View):
+    """Title suggestions for the search box, as JSON"""
+    
+    def get(self, request):
+        search_query = request.GET.get('q', '').strip()
+        results = []
+        if search_query:
+            results = [
+                {'id': video.id, 'title': video.title}
+                for video in Video.objects.filter(is_active=True).only('id', 'title').autocomplete(search_query)[:8]
+            ]
+        return JsonResponse({'results': results})
+
+
 class LoginView(View):
     def get(self, request):
         if request.user.is_authenticated:
@@ -25,6 +25,7 @@ BASE_DIR = PROJECT_DIR.parent
 
 INSTALLED_APPS = [
     "netflix",  # StreamFlix main app
+    "modelsearch",  # Full-text video search
     "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
@@ -141,11 +142,45 @@ STORAGES = {
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Search
+# https://docs.wagtail.org/en/stable/topics/search/backends.html
+# The database backend uses SQLite FTS5 locally (PostgreSQL full-text search in production)
+
+MODELSEARCH_BACKENDS = {
+    "default": {
+        "BACKEND": "modelsearch.backends.database",
+    }
+}
+
 # StreamFlix Settings
 SITE_NAME = "StreamFlix"
 SITE_DESCRIPTION = "AI-Powered Video Streaming Platform"
 
+# Seconds before the in-memory recommendation matrix is rebuilt from the
+# database, so that edits made in other worker processes are picked up
+NETFLIX_RECOMMENDATIONS_MAX_AGE = 300
+
+# Home page blocks and anonymous pages are cached per catalog generation,
+# which is bumped whenever a Video or Category changes (netflix/catalog_cache.py).
+# Configure a shared CACHES backend in production so that an edit in one worker
+# process invalidates the others
+NETFLIX_CATALOG_CACHE_ALIAS = 'default'
+NETFLIX_CATALOG_CACHE_TIMEOUT = 300
+
+# ffmpeg used to pre-segment uploaded videos for HLS (netflix/media.py);
+# None looks for `ffmpeg` on PATH
+NETFLIX_FFMPEG_BINARY = None
+
 # Authentication URLs
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/login/'
+
+# Write-behind view counter for the video player (see netflix/view_counters.py).
+# Configure a shared CACHES backend in production so that any process can
+# flush the buffered views, e.g. with `python manage.py flush_view_counts`
+NETFLIX_VIEW_COUNTER = {
+    'BACKEND': 'netflix.view_counters.CacheViewCounter',
+    'FLUSH_INTERVAL': 10,
+    'MAX_BUFFERED': 1000,
+}
@@ -1,13 +1,45 @@
+import base64
+import binascii
+import datetime
+import json
 from collections import OrderedDict
 
 from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q, QuerySet
+from django.db.models.expressions import F
 from rest_framework.pagination import BasePagination
 from rest_framework.response import Response
 
+from wagtail.coreutils import safe_md5
+
 from .utils import BadRequestError
 
+TOTAL_COUNT_EXACT = "exact"
+TOTAL_COUNT_CACHED = "cached"
+
+
+class CursorJSONEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder truncates times to milliseconds, but cursor values
+        # must compare equal to the database values
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
 
 class WagtailPagination(BasePagination):
+    """
+    Paginates listings with the ``offset`` and ``limit`` parameters, or with
+    ``cursor`` (and ``limit``) for keyset pagination over the active ordering.
+
+    Cursor pagination is opt-in: pass an empty ``cursor`` parameter to get the
+    first page, then the ``next`` or ``previous`` token from ``meta`` to move
+    between pages. Unlike ``offset``, it costs the same however deep the page.
+    """
+
     def paginate_queryset(self, queryset, request, view=None):
         limit_max = getattr(settings, "WAGTAILAPI_LIMIT_MAX", 20)
 
@@ -29,24 +61,230 @@ class WagtailPagination(BasePagination):
         if limit_max and limit > limit_max:
             raise BadRequestError("limit cannot be higher than %d" % limit_max)
 
+        self.view = view
+        self.total_count = self.get_total_count(queryset)
+
+        if "cursor" in request.GET:
+            if "offset" in request.GET:
+                raise BadRequestError("cursor and offset cannot be used together")
+            self.cursor_mode = True
+            return self.paginate_queryset_by_cursor(
+                queryset, request.GET["cursor"], limit
+            )
+
+        self.cursor_mode = False
         start = offset
         stop = offset + limit
-
-        self.view = view
-        self.total_count = queryset.count()
         return queryset[start:stop]
 
+    def get_total_count(self, queryset):
+        """
+        Return the total count for ``meta.total_count``, according to the
+        ``WAGTAILAPI_TOTAL_COUNT`` setting:
+
+        * ``"exact"`` (the default) - count the results on every request
+        * ``"cached"`` - count the results and cache the count for
+          ``WAGTAILAPI_TOTAL_COUNT_CACHE_TIMEOUT`` seconds (default 60)
+        * ``None`` - leave out ``total_count``, skipping the count query
+        """
+        mode = getattr(settings, "WAGTAILAPI_TOTAL_COUNT", TOTAL_COUNT_EXACT)
+        if not mode:
+            return None
+
+        if mode == TOTAL_COUNT_CACHED and isinstance(queryset, QuerySet):
+            try:
+                sql, params = (
+                    queryset.order_by().query.get_compiler(queryset.db).as_sql()
+                )
+            except EmptyResultSet:
+                # The queryset can't match anything, such as after .none()
+                return 0
+            cache_key = (
+                "wagtailapi_total_count:"
+                + safe_md5(
+                    f"{queryset.db}:{sql}:{params!r}".encode(), usedforsecurity=False
+                ).hexdigest()
+            )
+            total_count = cache.get(cache_key)
+            if total_count is None:
+                total_count = queryset.count()
+                cache.set(
+                    cache_key,
+                    total_count,
+                    getattr(settings, "WAGTAILAPI_TOTAL_COUNT_CACHE_TIMEOUT", 60),
+                )
+            return total_count
+
+        return queryset.count()
+
+    def get_cursor_ordering(self, queryset):
+        """
+        Return the queryset's ordering as a list of ``(field, descending)``
+        pairs, ending with a unique field so that every row has a distinct
+        position.
+        """
+        if not isinstance(queryset, QuerySet):
+            raise BadRequestError("cursor pagination is not supported with search")
+
+        model = queryset.model
+        ordering = queryset.query.order_by or model._meta.ordering
+        cursor_ordering = []
+        for item in ordering:
+            if not isinstance(item, str) or item == "?":
+                raise BadRequestError(
+                    "cursor pagination is not supported with this ordering"
+                )
+
+            descending = item.startswith("-")
+            field_name = item.lstrip("-")
+            try:
+                field = (
+                    model._meta.pk
+                    if field_name == "pk"
+                    else model._meta.get_field(field_name)
+                )
+            except FieldDoesNotExist as e:
+                raise BadRequestError(
+                    "cursor pagination is not supported with this ordering"
+                ) from e
+            if field.is_relation or not field.concrete:
+                raise BadRequestError(
+                    f"cursor pagination does not support ordering by '{field_name}'"
+                )
+
+            cursor_ordering.append((field, descending))
+            if field.unique and not field.null:
+                return cursor_ordering
+
+        cursor_ordering.append((model._meta.pk, False))
+        return cursor_ordering
+
+    def paginate_queryset_by_cursor(self, queryset, cursor, limit):
+        ordering = self.get_cursor_ordering(queryset)
+        ordering_key = [
+            ("-" if descending else "") + field.name for field, descending in ordering
+        ]
+
+        direction, values = "next", None
+        if cursor:
+            direction, values = self.decode_cursor(cursor, ordering, ordering_key)
+
+        # Nulls always come last, so that the ordering is the same on every
+        # database. Previous pages are fetched in reverse and flipped back.
+        backwards = direction == "previous"
+        nulls = {"nulls_first": True} if backwards else {"nulls_last": True}
+        queryset = queryset.order_by(
+            *[
+                F(field.attname).desc(**nulls)
+                if descending != backwards
+                else F(field.attname).asc(**nulls)
+                for field, descending in ordering
+            ]
+        )
+        if values is not None:
+            queryset = queryset.filter(
+                self.get_cursor_filter(ordering, values, backwards)
+            )
+
+        # Fetch one more row than needed to tell whether there is another page
+        results = list(queryset[: limit + 1])
+        has_more = len(results) > limit
+        results = results[:limit]
+        if backwards:
+            results.reverse()
+
+        if direction == "next":
+            has_next, has_previous = has_more, values is not None
+        else:
+            has_next, has_previous = True, has_more
+
+        self.next_cursor = self.previous_cursor = None
+        if results:
+            if has_next:
+                self.next_cursor = self.encode_cursor(
+                    "next", ordering_key, ordering, results[-1]
+                )
+            if has_previous:
+                self.previous_cursor = self.encode_cursor(
+                    "previous", ordering_key, ordering, results[0]
+                )
+        return results
+
+    def get_cursor_filter(self, ordering, values, backwards):
+        """
+        Build the filter for the rows after (or, if ``backwards``, before) the
+        row with the given ``values`` for the ordering fields, where nulls sort
+        after all other values.
+        """
+        condition = None
+        equal_so_far = Q()
+        for (field, descending), value in zip(ordering, values):
+            if value is None:
+                # Only non-null values come before a null
+                beyond = Q(**{f"{field.attname}__isnull": False}) if backwards else None
+                equal = Q(**{f"{field.attname}__isnull": True})
+            else:
+                lookup = "lt" if descending != backwards else "gt"
+                beyond = Q(**{f"{field.attname}__{lookup}": value})
+                if not backwards and field.null:
+                    beyond |= Q(**{f"{field.attname}__isnull": True})
+                equal = Q(**{field.attname: value})
+
+            if beyond is not None:
+                beyond = equal_so_far & beyond
+                condition = beyond if condition is None else condition | beyond
+            equal_so_far &= equal
+        # A row that sorts last in every field has nothing after it
+        return condition if condition is not None else Q(pk__in=[])
+
+    def encode_cursor(self, direction, ordering_key, ordering, obj):
+        values = [field.value_from_object(obj) for field, _ in ordering]
+        payload = json.dumps([direction, ordering_key, values], cls=CursorJSONEncoder)
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor, ordering, ordering_key):
+        try:
+            payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            direction, cursor_ordering_key, values = json.loads(payload)
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as e:
+            raise BadRequestError("invalid cursor") from e
+
+        if (
+            direction not in ("next", "previous")
+            or cursor_ordering_key != ordering_key
+            or not isinstance(values, list)
+            or len(values) != len(ordering_key)
+        ):
+            # Cursors are only valid for the ordering they were created with
+            raise BadRequestError("invalid cursor")
+
+        try:
+            values = [
+                None if value is None else self.decode_cursor_value(field, value)
+                for (field, _), value in zip(ordering, values)
+            ]
+        except (ValidationError, TypeError, ValueError) as e:
+            raise BadRequestError("invalid cursor") from e
+        return direction, values
+
+    def decode_cursor_value(self, field, value):
+        # Cursors can be tampered with, so only accept values that make sense
+        # for the field
+        if not isinstance(value, (str, int, float, bool)):
+            raise TypeError(f"unexpected cursor value {value!r}")
+        return field.to_python(value)
+
     def get_paginated_response(self, data):
+        meta = OrderedDict()
+        if self.total_count is not None:
+            meta["total_count"] = self.total_count
+        if self.cursor_mode:
+            meta["next"] = self.next_cursor
+            meta["previous"] = self.previous_cursor
+
         data = OrderedDict(
             [
-                (
-                    "meta",
-                    OrderedDict(
-                        [
-                            ("total_count", self.total_count),
-                        ]
-                    ),
-                ),
+                ("meta", meta),
                 ("items", data),
             ]
         )
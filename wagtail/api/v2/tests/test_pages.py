@@ -1,3 +1,4 @@
+import base64
 import collections
 import json
 from io import StringIO
@@ -6,13 +7,19 @@ from unittest import mock
 from django.contrib.auth.models import Group
 from django.contrib.contenttypes.models import ContentType
 from django.core import management
+from django.db import connection
 from django.test import TestCase, TransactionTestCase
-from django.test.utils import override_settings
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.urls import reverse
 from rest_framework.test import APIClient
 
 from wagtail.api.v2 import signal_handlers
-from wagtail.api.v2.views import PagesAPIViewSet
+from wagtail.api.v2.pagination import WagtailPagination
+from wagtail.api.v2.views import (
+    PagesAPIViewSet,
+    clear_serializer_class_cache,
+    serializer_class_cache_info,
+)
 from wagtail.models import Locale, Page, Site
 from wagtail.models.view_restrictions import BaseViewRestriction
 from wagtail.test.demosite import models
@@ -1084,6 +1091,176 @@ class TestPageListing(WagtailTestUtils, TestCase):
         self.assertEqual(response.status_code, 400)
         self.assertEqual(content, {"message": "offset must be a positive integer"})
 
+    # CURSOR
+
+    def get_all_pages_by_cursor(self, **params):
+        page_id_list = []
+        cursor = ""
+        while cursor is not None:
+            response = self.get_response(cursor=cursor, **params)
+            content = json.loads(response.content.decode("UTF-8"))
+            page_id_list.extend(self.get_page_id_list(content))
+            cursor = content["meta"]["next"]
+        return page_id_list
+
+    def test_cursor_first_page(self):
+        response = self.get_response(cursor="", limit=5)
+        content = json.loads(response.content.decode("UTF-8"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.get_page_id_list(content),
+            self.get_page_id_list(
+                json.loads(self.get_response(limit=5).content.decode("UTF-8"))
+            ),
+        )
+        self.assertIn("total_count", content["meta"])
+        self.assertIsNotNone(content["meta"]["next"])
+        self.assertIsNone(content["meta"]["previous"])
+
+    @override_settings(WAGTAILAPI_LIMIT_MAX=None)
+    def test_cursor_walks_every_page_in_order(self):
+        response = self.get_response(limit=100)
+        content = json.loads(response.content.decode("UTF-8"))
+
+        self.assertEqual(
+            self.get_all_pages_by_cursor(limit=3), self.get_page_id_list(content)
+        )
+
+    @override_settings(WAGTAILAPI_LIMIT_MAX=None)
+    def test_cursor_with_nullable_ordering(self):
+        Page.objects.filter(id__in=[4, 5]).update(first_published_at=None)
+        response = self.get_response(order="-first_published_at", limit=100)
+        content = json.loads(response.content.decode("UTF-8"))
+
+        page_id_list = self.get_all_pages_by_cursor(
+            order="-first_published_at", limit=2
+        )
+        self.assertEqual(sorted(page_id_list), sorted(self.get_page_id_list(content)))
+        # Nulls come last
+        null_ids = set(
+            Page.objects.filter(
+                id__in=page_id_list, first_published_at__isnull=True
+            ).values_list("id", flat=True)
+        )
+        self.assertIn(5, null_ids)
+        self.assertEqual(set(page_id_list[-len(null_ids) :]), null_ids)
+
+    def test_cursor_previous(self):
+        response = self.get_response(cursor="", limit=3)
+        first_page = json.loads(response.content.decode("UTF-8"))
+        response = self.get_response(cursor=first_page["meta"]["next"], limit=3)
+        second_page = json.loads(response.content.decode("UTF-8"))
+        response = self.get_response(cursor=second_page["meta"]["previous"], limit=3)
+        content = json.loads(response.content.decode("UTF-8"))
+
+        self.assertEqual(
+            self.get_page_id_list(content), self.get_page_id_list(first_page)
+        )
+        self.assertIsNone(content["meta"]["previous"])
+        self.assertEqual(content["meta"]["next"], first_page["meta"]["next"])
+
+    def test_cursor_invalid_gives_error(self):
+        response = self.get_response(cursor="abc")
+        content = json.loads(response.content.decode("UTF-8"))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(content, {"message": "invalid cursor"})
+
+    def test_cursor_from_other_ordering_gives_error(self):
+        response = self.get_response(cursor="", limit=2)
+        cursor = json.loads(response.content.decode("UTF-8"))["meta"]["next"]
+        response = self.get_response(cursor=cursor, order="title")
+        content = json.loads(response.content.decode("UTF-8"))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(content, {"message": "invalid cursor"})
+
+    def test_cursor_with_tampered_values_gives_error(self):
+        response = self.get_response(cursor="", limit=2)
+        cursor = json.loads(response.content.decode("UTF-8"))["meta"]["next"]
+        direction, ordering_key, values = json.loads(
+            base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        )
+
+        for value in ["abc", {"id": 1}, [1]]:
+            with self.subTest(value=value):
+                tampered_cursor = base64.urlsafe_b64encode(
+                    json.dumps([direction, ordering_key, [value] * len(values)])
+                    .encode()
+                ).decode()
+                response = self.get_response(cursor=tampered_cursor)
+                content = json.loads(response.content.decode("UTF-8"))
+
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(content, {"message": "invalid cursor"})
+
+    def test_cursor_with_offset_gives_error(self):
+        response = self.get_response(cursor="", offset=10)
+        content = json.loads(response.content.decode("UTF-8"))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            content, {"message": "cursor and offset cannot be used together"}
+        )
+
+    def test_cursor_with_random_ordering_gives_error(self):
+        response = self.get_response(cursor="", order="random")
+        content = json.loads(response.content.decode("UTF-8"))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            content,
+            {"message": "cursor pagination is not supported with this ordering"},
+        )
+
+    # TOTAL COUNT
+
+    def test_total_count_disabled(self):
+        # Warm up any caches used by the listing
+        self.get_response()
+
+        with CaptureQueriesContext(connection) as exact_queries:
+            self.get_response()
+        with override_settings(WAGTAILAPI_TOTAL_COUNT=None):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.get_response()
+        content = json.loads(response.content.decode("UTF-8"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("total_count", content["meta"])
+        self.assertEqual(len(queries), len(exact_queries) - 1)
+
+    @override_settings(WAGTAILAPI_TOTAL_COUNT="cached")
+    def test_total_count_cached(self):
+        response = self.get_response()
+        total_count = json.loads(response.content.decode("UTF-8"))["meta"][
+            "total_count"
+        ]
+
+        # The count is served from the cache until it expires
+        Page.objects.get(id=16).delete()
+        response = self.get_response()
+        content = json.loads(response.content.decode("UTF-8"))
+        self.assertEqual(content["meta"]["total_count"], total_count)
+        self.assertNotIn(16, self.get_page_id_list(content))
+
+    @override_settings(WAGTAILAPI_TOTAL_COUNT="cached")
+    def test_total_count_cached_with_no_results(self):
+        self.assertEqual(WagtailPagination().get_total_count(Page.objects.none()), 0)
+        self.assertEqual(
+            WagtailPagination().get_total_count(Page.objects.filter(id__in=[])), 0
+        )
+
+        # The listing is empty when no site matches the request
+        Site.objects.all().delete()
+        response = self.get_response()
+        content = json.loads(response.content.decode("UTF-8"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(content["meta"]["total_count"], 0)
+        self.assertEqual(content["items"], [])
+
     # REGRESSION TESTS
 
     def test_issue_3967(self):
@@ -1166,6 +1343,15 @@ class TestPageListingSearch(WagtailTestUtils, TransactionTestCase):
 
         self.assertEqual(set(page_id_list), {16, 18, 19})
 
+    def test_search_with_cursor_gives_error(self):
+        response = self.get_response(search="blog", cursor="")
+        content = json.loads(response.content.decode("UTF-8"))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            content, {"message": "cursor pagination is not supported with search"}
+        )
+
     def test_search_with_invalid_type(self):
         # Check that a 400 error is returned when the type doesn't exist
         response = self.get_response(type="demosite.InvalidPageType", search="blog")
@@ -1934,3 +2120,70 @@ class TestAPIDetailQueryCount(WagtailTestUtils, TestCase):
         with self.assertNumQueries(16):
             response = self.client.get("/api/main/pages/2/")
             self.assertEqual(response.status_code, 200)
+
+
+class TestSerializerClassCache(TestCase):
+    fixtures = ["demosite.json"]
+
+    def setUp(self):
+        clear_serializer_class_cache()
+
+    def get_response(self, **params):
+        return self.client.get(reverse("wagtailapi_v2:pages:listing"), params)
+
+    def test_serializer_classes_are_reused(self):
+        params = {"type": "demosite.BlogEntryPage", "fields": "title,date,feed_image"}
+        response = self.get_response(**params)
+        self.assertEqual(response.status_code, 200)
+        cache_info = serializer_class_cache_info()
+        # The listing serializer and the nested feed_image serializer
+        self.assertEqual(cache_info.misses, 2)
+        self.assertEqual(cache_info.hits, 0)
+
+        second_response = self.get_response(**params)
+        self.assertEqual(second_response.content, response.content)
+        cache_info = serializer_class_cache_info()
+        self.assertEqual(cache_info.misses, 2)
+        self.assertEqual(cache_info.hits, 1)
+
+    def test_field_order_does_not_matter(self):
+        response = self.get_response(
+            type="demosite.BlogEntryPage", fields="title,date,feed_image"
+        )
+        second_response = self.get_response(
+            type="demosite.BlogEntryPage", fields="feed_image,date,title"
+        )
+        self.assertEqual(second_response.content, response.content)
+        cache_info = serializer_class_cache_info()
+        self.assertEqual(cache_info.misses, 2)
+        self.assertEqual(cache_info.hits, 1)
+
+    def test_repeated_fields_keep_their_order(self):
+        response = self.get_response(
+            type="demosite.BlogEntryPage", fields="title,date,-title"
+        )
+        content = json.loads(response.content.decode("UTF-8"))
+        self.assertNotIn("title", content["items"][0])
+
+        response = self.get_response(
+            type="demosite.BlogEntryPage", fields="-title,date,title"
+        )
+        content = json.loads(response.content.decode("UTF-8"))
+        self.assertIn("title", content["items"][0])
+        self.assertEqual(serializer_class_cache_info().misses, 2)
+
+    def test_different_fields_get_different_serializer_classes(self):
+        self.get_response(type="demosite.BlogEntryPage", fields="_,title")
+        response = self.get_response(type="demosite.BlogEntryPage", fields="_,date")
+        content = json.loads(response.content.decode("UTF-8"))
+
+        self.assertIn("date", content["items"][0])
+        self.assertNotIn("title", content["items"][0])
+        self.assertEqual(serializer_class_cache_info().misses, 2)
+
+    def test_unknown_fields_are_not_cached(self):
+        for _ in range(2):
+            response = self.get_response(fields="123")
+            self.assertEqual(response.status_code, 400)
+
+        self.assertEqual(serializer_class_cache_info().currsize, 0)
@@ -1,8 +1,11 @@
+import functools
 from collections import OrderedDict
 
 from django.apps import apps
 from django.conf import settings
 from django.core.exceptions import FieldDoesNotExist
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.http import Http404
 from django.shortcuts import redirect
 from django.urls import path, reverse
@@ -35,6 +38,67 @@ from .utils import (
     parse_fields_parameter,
 )
 
+# The number of generated serializer classes to keep (each distinct combination of
+# endpoint, model, ?fields= configuration and listing/detail/nested view has its own)
+SERIALIZER_CLASS_CACHE_SIZE = 1000
+
+
+def _freeze_fields_config(fields_config):
+    """
+    Convert a fields config, as returned by parse_fields_parameter, into
+    nested tuples so that it can be used as a cache key.
+
+    The fields are sorted by name, so that ``fields=a,b`` and ``fields=b,a``
+    share a cache entry. A leading ``*`` or ``_`` stays first, and the sort is
+    stable so repeated mentions of a field (such as ``title,-title``) keep
+    their order.
+    """
+    frozen = [
+        (
+            field_name,
+            negated,
+            _freeze_fields_config(sub_fields) if sub_fields else None,
+        )
+        for field_name, negated, sub_fields in fields_config
+    ]
+    start = 1 if frozen and frozen[0][0] in ("*", "_") else 0
+    frozen[start:] = sorted(frozen[start:], key=lambda field: field[0])
+    return tuple(frozen)
+
+
+@functools.lru_cache(maxsize=SERIALIZER_CLASS_CACHE_SIZE)
+def _build_serializer_class(
+    viewset, router, model, fields_config, show_details, nested
+):
+    return viewset._build_serializer_class(
+        router, model, fields_config, show_details=show_details, nested=nested
+    )
+
+
+def serializer_class_cache_info():
+    """
+    Return the hits, misses and current size of the cache of generated
+    serializer classes, as a ``functools.lru_cache`` ``CacheInfo`` tuple
+    """
+    return _build_serializer_class.cache_info()
+
+
+def clear_serializer_class_cache():
+    """
+    Clear the cache of generated serializer classes. Only needed if the API
+    fields of a model or endpoint are changed at runtime
+    """
+    _build_serializer_class.cache_clear()
+
+
+@receiver(setting_changed)
+def reset_serializer_class_cache(**kwargs):
+    """
+    Clear the serializer class cache when settings are changed, as the default
+    fields can depend on them (such as WAGTAIL_I18N_ENABLED)
+    """
+    clear_serializer_class_cache()
+
 
 class BaseAPIViewSet(GenericViewSet):
     @classproperty
@@ -57,6 +121,7 @@ class BaseAPIViewSet(GenericViewSet):
         [
             "limit",
             "offset",
+            "cursor",
             "fields",
             "order",
             "search",
@@ -246,6 +311,24 @@ class BaseAPIViewSet(GenericViewSet):
     @classmethod
     def _get_serializer_class(
         cls, router, model, fields_config, show_details=False, nested=False
+    ):
+        """
+        Return the serializer class for the given model and fields config.
+        Classes are generated once for each distinct combination of arguments
+        and then reused (see ``serializer_class_cache_info``).
+        """
+        return _build_serializer_class(
+            cls,
+            router,
+            model,
+            _freeze_fields_config(fields_config),
+            show_details,
+            nested,
+        )
+
+    @classmethod
+    def _build_serializer_class(
+        cls, router, model, fields_config, show_details=False, nested=False
     ):
         # Get all available fields
         body_fields = cls.get_body_fields_names(model)
@@ -1,7 +1,7 @@
 import itertools
 import json
 import uuid
-from collections import OrderedDict, defaultdict
+from collections import defaultdict
 from collections.abc import Mapping, MutableSequence
 from pickle import PickleError
 
@@ -712,24 +712,46 @@ class StreamValue(MutableSequence):
         Fetching is done via the block's bulk_to_python method, so that database lookups are
         batched into a single query where possible.
         """
-        child_block = self.stream_block.child_blocks[type_name]
-        # create a mapping of all the child blocks matching the given block type,
-        # mapping (index within the stream) => (raw block value)
-        raw_values = OrderedDict(
-            (i, raw_item["value"])
-            for i, raw_item in enumerate(self._raw_data)
-            if self._bound_blocks[i] is None and raw_item["type"] == type_name
-        )
-        # pass the raw block values to bulk_to_python as a list
-        converted_values = child_block.bulk_to_python(raw_values.values())
-
-        # reunite the converted values with their stream indexes, along with the block ID
-        # if one exists
-        for i, value in zip(raw_values.keys(), converted_values):
-            self._bound_blocks[i] = StreamValue.StreamChild(
-                child_block, value, id=self._raw_data[i].get("id")
+        StreamValue.bulk_prefetch_blocks([self], type_name)
+
+    @staticmethod
+    def bulk_prefetch_blocks(stream_values, type_name=None):
+        """
+        Populate _bound_blocks for the items (of type `type_name`, or of all types) in all of
+        the given StreamValues that exist in _raw_data but do not already exist in _bound_blocks.
+
+        The raw values of each child block are collected across all of the streams and passed
+        to its bulk_to_python method in a single call, so that database lookups (including
+        those of blocks nested within StructBlocks and ListBlocks) are batched across all of
+        the streams where possible.
+        """
+        # mapping of id(child block) => (child block, [(stream value, index within the stream)])
+        items_by_block = {}
+        for stream_value in stream_values:
+            child_blocks = stream_value.stream_block.child_blocks
+            for i, raw_item in enumerate(stream_value._raw_data):
+                if stream_value._bound_blocks[i] is not None or (
+                    type_name is not None and raw_item["type"] != type_name
+                ):
+                    continue
+                child_block = child_blocks[raw_item["type"]]
+                items_by_block.setdefault(id(child_block), (child_block, []))[1].append(
+                    (stream_value, i)
+                )
+
+        for child_block, items in items_by_block.values():
+            # pass the raw block values to bulk_to_python as a list
+            converted_values = child_block.bulk_to_python(
+                [stream_value._raw_data[i]["value"] for stream_value, i in items]
             )
 
+            # reunite the converted values with their stream indexes, along with the block ID
+            # if one exists
+            for (stream_value, i), value in zip(items, converted_values):
+                stream_value._bound_blocks[i] = StreamValue.StreamChild(
+                    child_block, value, id=stream_value._raw_data[i].get("id")
+                )
+
     def get_prep_value(self):
         prep_value = []
 
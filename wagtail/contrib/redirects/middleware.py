@@ -8,13 +8,22 @@ from wagtail.contrib.redirects import models
 from wagtail.models import Site
 
 
-def _get_redirect(request, path):
+def _get_redirect(request, path, lookup=None):
     if (
         "\0" in path
     ):  # reject URLs with null characters, which crash on Postgres (#4496)
         return None
 
-    site = Site.find_for_request(request)
+    if lookup is not None:
+        # Only find the site for paths that some redirect exists for
+        if path not in lookup.all_paths:
+            return None
+        site = Site.find_for_request(request)
+        if not lookup.may_have_redirect(site, path):
+            return None
+    else:
+        site = Site.find_for_request(request)
+
     try:
         return models.Redirect.get_for_site(site).get(old_path=path)
     except models.Redirect.MultipleObjectsReturned:
@@ -24,12 +33,13 @@ def _get_redirect(request, path):
         return None
 
 
-def get_redirect(request, encoded_path):
+def get_redirect(request, encoded_path, lookup=None):
     # Receives the ASCII percent-encoded path as obtained from request.get_full_path()
+    # If a RedirectLookup is given, paths it has no redirects for are not queried
     decoded_path = uri_to_iri(encoded_path)
-    redirect = _get_redirect(request, decoded_path)
+    redirect = _get_redirect(request, decoded_path, lookup)
     if not redirect and decoded_path != encoded_path:
-        redirect = _get_redirect(request, encoded_path)
+        redirect = _get_redirect(request, encoded_path, lookup)
     return redirect
 
 
@@ -46,8 +56,10 @@ class RedirectMiddleware(MiddlewareMixin):
             request.get_full_path(), decode_unicode=False
         )
 
-        # Find redirect
-        redirect = get_redirect(request, path)
+        # Find redirect, skipping the database queries for paths that no
+        # redirect exists for
+        lookup = models.get_redirect_lookup()
+        redirect = get_redirect(request, path, lookup)
         if redirect is None:
             # Get the path without the query string or params
             path_without_query = urlparse(path).path
@@ -56,7 +68,7 @@ class RedirectMiddleware(MiddlewareMixin):
                 # don't try again if we know we will get the same response
                 return response
 
-            redirect = get_redirect(request, path_without_query)
+            redirect = get_redirect(request, path_without_query, lookup)
             if redirect is None:
                 return response
 
@@ -1,6 +1,10 @@
+import uuid
+from collections import defaultdict
 from urllib.parse import urlparse
 
-from django.db import models
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
 from django.urls import Resolver404
 from django.utils.encoding import uri_to_iri
 from django.utils.functional import cached_property
@@ -231,7 +235,94 @@ class Redirect(models.Model):
         else:
             self.redirect_page_route_path = ""
 
+    @staticmethod
+    def clear_redirect_lookup_cache():
+        """
+        Make every process rebuild its in-memory table of redirect paths on its
+        next lookup. This is repeated once the current transaction is
+        committed, as other processes may rebuild their tables from the
+        uncommitted data in the meantime.
+        """
+        cache.delete(REDIRECT_LOOKUP_GENERATION_CACHE_KEY)
+        transaction.on_commit(
+            lambda: cache.delete(REDIRECT_LOOKUP_GENERATION_CACHE_KEY)
+        )
+
     class Meta:
         verbose_name = _("redirect")
         verbose_name_plural = _("redirects")
         unique_together = [("old_path", "site")]
+
+
+REDIRECT_LOOKUP_GENERATION_CACHE_KEY = "wagtail_redirect_lookup_generation"
+
+# The RedirectLookup for the current generation, shared by all threads of this process
+_redirect_lookup = None
+
+
+class RedirectLookup:
+    """
+    An in-memory table of the paths that redirects exist for, grouped by site,
+    used to rule out a redirect for a path without querying the database.
+
+    Each process keeps one table, tagged with the generation it was built for.
+    The current generation is held in the default cache, and is discarded
+    whenever a redirect is saved or deleted, so every process rebuilds its
+    table on its next lookup.
+    """
+
+    def __init__(self, generation, redirects):
+        self.generation = generation
+        self.paths_by_site_id = defaultdict(set)
+        self.all_paths = set()
+
+        for site_id, old_path in redirects:
+            self.paths_by_site_id[site_id].add(old_path)
+            self.all_paths.add(old_path)
+
+    @classmethod
+    def get(cls):
+        """
+        Return the table for the current generation, building it if this
+        process doesn't have it yet.
+        """
+        global _redirect_lookup
+
+        generation = cache.get(REDIRECT_LOOKUP_GENERATION_CACHE_KEY)
+        redirect_lookup = _redirect_lookup
+        if (
+            generation is None
+            or redirect_lookup is None
+            or redirect_lookup.generation != generation
+        ):
+            if generation is None:
+                generation = uuid.uuid4().hex
+                cache.set(REDIRECT_LOOKUP_GENERATION_CACHE_KEY, generation, 3600)
+
+            redirect_lookup = _redirect_lookup = cls(
+                generation, Redirect.objects.values_list("site_id", "old_path")
+            )
+        return redirect_lookup
+
+    def may_have_redirect(self, site, path):
+        """
+        Return ``False`` if there is no redirect from the given path that
+        applies to ``site``, as found by ``Redirect.get_for_site()``. Otherwise
+        the redirect has to be looked up in the database.
+        """
+        if site is None:
+            return path in self.all_paths
+
+        site_paths = self.paths_by_site_id.get(site.pk, ())
+        all_sites_paths = self.paths_by_site_id.get(None, ())
+        return path in site_paths or path in all_sites_paths
+
+
+def get_redirect_lookup():
+    """
+    Return the in-memory table of redirect paths, or ``None`` unless it is
+    enabled by the ``WAGTAILREDIRECTS_LOOKUP_CACHE`` setting.
+    """
+    if not getattr(settings, "WAGTAILREDIRECTS_LOOKUP_CACHE", False):
+        return None
+    return RedirectLookup.get()
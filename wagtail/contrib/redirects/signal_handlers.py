@@ -30,6 +30,10 @@ class BatchRedirectCreator(BatchCreator):
         Redirect.objects.filter(automatically_created=True).filter(clashes_q).delete()
 
     def post_process(self):
+        # Redirects created with bulk_create() don't send post_save
+        if self.items:
+            Redirect.clear_redirect_lookup_cache()
+
         if not apps.is_installed("wagtail.contrib.frontend_cache"):
             return
 
@@ -43,6 +47,10 @@ class BatchRedirectCreator(BatchCreator):
         batch.purge()
 
 
+def clear_redirect_lookup_cache(**kwargs):
+    Redirect.clear_redirect_lookup_cache()
+
+
 def autocreate_redirects_on_slug_change(
     instance_before: Page, instance: Page, **kwargs
 ):
@@ -2,13 +2,17 @@ from io import BytesIO
 
 from django.conf import settings
 from django.contrib.auth.models import Permission
-from django.test import TestCase, override_settings
+from django.core.cache import cache
+from django.http import HttpResponseNotFound
+from django.test import RequestFactory, TestCase, override_settings
 from django.urls import reverse
 from openpyxl.reader.excel import load_workbook
 
 from wagtail.admin.admin_url_finder import AdminURLFinder
 from wagtail.contrib.frontend_cache.tests import PURGED_URLS
 from wagtail.contrib.redirects import models
+from wagtail.contrib.redirects.middleware import RedirectMiddleware
+from wagtail.contrib.redirects.signal_handlers import BatchRedirectCreator
 from wagtail.log_actions import registry as log_registry
 from wagtail.models import Page, Site
 from wagtail.test.routablepage.models import RoutablePageTest
@@ -645,6 +649,93 @@ class TestRedirects(TestCase):
         self.assertIs(redirect.is_permanent, True)
 
 
+@override_settings(
+    WAGTAILREDIRECTS_LOOKUP_CACHE=True,
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+)
+class TestRedirectsWithLookupCache(TestRedirects):
+    """
+    Run the redirect tests against the in-memory redirect lookup, which should
+    find exactly the same redirects as querying the database for every path.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def get_response(self, path, **extra):
+        request = RequestFactory().get(path, **extra)
+        return RedirectMiddleware(lambda request: None).process_response(
+            request, HttpResponseNotFound()
+        )
+
+    def test_unknown_path_needs_no_queries(self):
+        models.Redirect.objects.create(
+            old_path="/redirectme", redirect_link="/redirectto"
+        )
+        self.get_response("/redirectme/")
+
+        with self.assertNumQueries(0):
+            response = self.get_response("/wp-login.php?action=login")
+        self.assertEqual(response.status_code, 404)
+
+        with self.assertNumQueries(0):
+            response = self.get_response("/%C3%A9t%C3%A9/")
+        self.assertEqual(response.status_code, 404)
+
+    def test_redirect_changes_invalidate_lookup(self):
+        self.assertEqual(self.get_response("/redirectme/").status_code, 404)
+
+        redirect = models.Redirect.objects.create(
+            old_path="/redirectme", redirect_link="/redirectto"
+        )
+        self.assertEqual(self.get_response("/redirectme/").status_code, 301)
+
+        redirect.old_path = "/redirectme-too"
+        redirect.save()
+        self.assertEqual(self.get_response("/redirectme/").status_code, 404)
+        self.assertEqual(self.get_response("/redirectme-too/").status_code, 301)
+
+        redirect.delete()
+        self.assertEqual(self.get_response("/redirectme-too/").status_code, 404)
+
+    def test_bulk_created_redirects_invalidate_lookup(self):
+        self.assertEqual(self.get_response("/redirectme/").status_code, 404)
+
+        batch = BatchRedirectCreator(max_size=10)
+        batch.add(old_path="/redirectme", redirect_link="/redirectto")
+        batch.process()
+        self.assertEqual(self.get_response("/redirectme/").status_code, 301)
+
+    def create_site_specific_redirect(self):
+        contact_page = Page.objects.get(url_path="/home/contact-us/")
+        other_site = Site.objects.create(
+            hostname="other.example.com", port=80, root_page=contact_page
+        )
+        models.Redirect.objects.create(
+            old_path="/xmas", redirect_link="/christmas", site=other_site
+        )
+        self.get_response("/xmas/", HTTP_HOST="other.example.com")
+
+    @override_settings(WAGTAIL_SITE_LOOKUP_CACHE=False)
+    def test_site_specific_redirect_not_found_for_other_sites(self):
+        self.create_site_specific_redirect()
+
+        # Only the site is looked up, not the redirect
+        with self.assertNumQueries(1):
+            response = self.get_response("/xmas/", HTTP_HOST="localhost")
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(WAGTAIL_SITE_LOOKUP_CACHE=True)
+    def test_site_specific_redirect_not_found_for_other_sites_with_site_lookup(self):
+        self.create_site_specific_redirect()
+
+        # The site comes from the in-memory site lookup too
+        with self.assertNumQueries(0):
+            response = self.get_response("/xmas/", HTTP_HOST="localhost")
+        self.assertEqual(response.status_code, 404)
+
+
 @override_settings(
     CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
 )
@@ -0,0 +1,125 @@
+import copy
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# The name of the request attribute holding the generations fetched for it
+REQUEST_GENERATIONS_ATTR_NAME = "_wagtail_settings_generations"
+
+# Setting instances held by this process, keyed by model label and site ID
+# (``None`` for generic settings), along with the generation they were loaded for
+_entries = {}
+_entries_lock = threading.Lock()
+
+
+def is_settings_cache_enabled():
+    return getattr(settings, "WAGTAILSETTINGS_CACHE", False)
+
+
+def get_generation_key(model):
+    return f"wagtail-settings-generation-{model._meta.label_lower}"
+
+
+def get_generations(models, request=None):
+    """
+    Return a dict mapping the label of each of the given setting models to its
+    current generation, fetched from the default cache with a single
+    ``get_many()`` call. If ``request`` is given, the generations are reused
+    for the rest of the request.
+
+    A generation is ``None`` if it has just been replaced by another process,
+    in which case nothing should be stored under it.
+    """
+    generations = getattr(request, REQUEST_GENERATIONS_ATTR_NAME, {})
+    to_fetch = {
+        get_generation_key(model): model._meta.label_lower
+        for model in models
+        if model._meta.label_lower not in generations
+    }
+
+    if to_fetch:
+        fetched = cache.get_many(to_fetch)
+        for key, label in to_fetch.items():
+            generation = fetched.get(key)
+            if generation is None:
+                generation = uuid.uuid4().hex
+                if not cache.add(key, generation, None):
+                    generation = None
+            generations[label] = generation
+
+        if request is not None:
+            setattr(request, REQUEST_GENERATIONS_ATTR_NAME, generations)
+
+    return {
+        model._meta.label_lower: generations[model._meta.label_lower]
+        for model in models
+    }
+
+
+def preload_settings(request):
+    """
+    Fetch the current generations of all registered setting models for the
+    request in one round-trip, so that the settings this process already
+    holds are then returned without any further queries.
+    """
+    from .registry import registry
+
+    if is_settings_cache_enabled() and registry:
+        get_generations(registry, request)
+
+
+def _copy_instance(instance):
+    # Instances are shared by all requests in the process, which may set
+    # attributes (such as ``_request``) on them
+    instance = copy.deepcopy(instance)
+    instance._page_url_cache = {}
+    return instance
+
+
+def get_setting(model, site_id, load, request=None):
+    """
+    Return the instance of the setting model for the site with the given ID
+    (or ``None`` for generic settings), loading it with ``load()`` if this
+    process doesn't hold it for the current generation.
+
+    Related objects are not held, so that changes to them (such as a page
+    being renamed) are always seen.
+    """
+    if not is_settings_cache_enabled():
+        return load()
+
+    label = model._meta.label_lower
+    generation = get_generations([model], request)[label]
+    if generation is not None:
+        with _entries_lock:
+            entry = _entries.get((label, site_id))
+        if entry is not None and entry[0] == generation:
+            return _copy_instance(entry[1])
+
+    instance = load()
+    if generation is not None:
+        stored = _copy_instance(instance)
+        stored._state.fields_cache = {}
+        with _entries_lock:
+            _entries[label, site_id] = (generation, stored)
+    return instance
+
+
+def clear_setting_cache_signal_handler(sender, **kwargs):
+    if is_settings_cache_enabled():
+        clear_setting_cache(sender)
+
+
+def clear_setting_cache(model):
+    """
+    Make every process load the given setting model from the database again on
+    its next lookup. This is repeated once the current transaction is
+    committed, as other processes may load the uncommitted data in the
+    meantime.
+    """
+    key = get_generation_key(model)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
@@ -1,3 +1,4 @@
+from wagtail.contrib.settings.cache import preload_settings
 from wagtail.contrib.settings.models import BaseGenericSetting, BaseSiteSetting
 from wagtail.models import Site
 
@@ -72,4 +73,7 @@ class SettingModuleProxy(dict):
 
 
 def settings(request):
+    # Fetch the generations of all settings in one round-trip, if the settings
+    # cache is enabled
+    preload_settings(request)
     return {"settings": SettingProxy(request_or_site=request)}
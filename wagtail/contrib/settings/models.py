@@ -7,6 +7,7 @@ from wagtail.models import Site
 from wagtail.permission_policies import ModelPermissionPolicy
 from wagtail.permission_policies.sites import SitePermissionPolicy
 
+from .cache import get_setting
 from .registry import register_setting
 
 __all__ = [
@@ -135,7 +136,7 @@ class BaseSiteSetting(AbstractSetting):
         if hasattr(request, attr_name):
             return getattr(request, attr_name)
         site = Site.find_for_request(request)
-        site_settings = cls.for_site(site)
+        site_settings = cls._for_site(site, request)
         # to allow more efficient page url generation
         site_settings._request = request
         setattr(request, attr_name, site_settings)
@@ -152,11 +153,20 @@ class BaseSiteSetting(AbstractSetting):
         """
         Get or create an instance of this setting for the site.
         """
+        return cls._for_site(site)
+
+    @classmethod
+    def _for_site(cls, site, request=None):
         if site is None:
             raise cls.DoesNotExist("%s does not exist for site None." % cls)
-        queryset = cls.base_queryset()
-        instance, created = queryset.get_or_create(site=site)
-        return instance
+
+        def load():
+            queryset = cls.base_queryset()
+            instance, created = queryset.get_or_create(site=site)
+            return instance
+
+        # Reuses the instance held by this process if the settings cache is enabled
+        return get_setting(cls, site.pk, load, request)
 
     def __str__(self):
         return _("%(site_setting)s for %(site)s") % {
@@ -200,16 +210,17 @@ class BaseGenericSetting(AbstractSetting):
         """
 
         # We can only cache on the request, so if there is no request then
-        # we know there's nothing in the cache.
+        # we know there's nothing in the cache (other than the process-level
+        # cache, if enabled).
         if request_or_site is None or isinstance(request_or_site, Site):
-            return cls._get_or_create()
+            return get_setting(cls, None, cls._get_or_create)
 
         # Check if we already have this in the cache and return it if so.
         attr_name = cls.get_cache_attr_name()
         if hasattr(request_or_site, attr_name):
             return getattr(request_or_site, attr_name)
 
-        obj = cls._get_or_create()
+        obj = get_setting(cls, None, cls._get_or_create, request_or_site)
 
         # Cache for next time.
         setattr(request_or_site, attr_name, obj)
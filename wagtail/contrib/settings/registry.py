@@ -1,5 +1,6 @@
 from django.apps import apps
 from django.contrib.auth.models import Permission
+from django.db.models.signals import post_delete, post_save
 from django.urls import reverse
 from django.utils.text import capfirst
 
@@ -10,6 +11,7 @@ from wagtail.admin.admin_url_finder import (
 )
 from wagtail.admin.menu import MenuItem
 
+from .cache import clear_setting_cache_signal_handler
 from .forms import SitePermissionForm
 
 
@@ -96,6 +98,10 @@ class Registry(list):
             def group_permission_panel():
                 return SitePermissionFormSubclass
 
+        # Discard the instances held in the settings cache when they change
+        post_save.connect(clear_setting_cache_signal_handler, sender=model)
+        post_delete.connect(clear_setting_cache_signal_handler, sender=model)
+
         # Register an admin URL finder
         permission_policy = model.get_permission_policy()
 
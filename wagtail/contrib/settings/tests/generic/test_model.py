@@ -1,7 +1,8 @@
+from django.core.cache import cache
 from django.test import TestCase, override_settings
 
 from wagtail.models import Site
-from wagtail.test.testapp.models import ImportantPagesGenericSetting
+from wagtail.test.testapp.models import ImportantPagesGenericSetting, TestGenericSetting
 
 from .base import GenericSettingsTestMixin
 
@@ -121,3 +122,40 @@ class GenericSettingModelTestCase(GenericSettingsTestMixin, TestCase):
             str(ImportantPagesGenericSetting.load()),
             "important pages settings",
         )
+
+
+@override_settings(
+    ALLOWED_HOSTS=["localhost", "other"],
+    WAGTAILSETTINGS_CACHE=True,
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+)
+class GenericSettingModelCacheTestCase(GenericSettingsTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        super().setUp()
+
+    def test_load_reuses_settings_between_requests(self):
+        TestGenericSetting.load(self.get_request())
+
+        for request_or_site in (self.get_request(), self.other_site, None):
+            with self.subTest(request_or_site=request_or_site):
+                with self.assertNumQueries(0):
+                    settings = TestGenericSetting.load(request_or_site)
+                self.assertEqual(settings, self.default_settings)
+                self.assertEqual(settings.title, self.default_settings.title)
+
+    def test_save_invalidates_cache(self):
+        TestGenericSetting.load(self.get_request())
+
+        self.default_settings.title = "New title"
+        self.default_settings.save()
+        with self.assertNumQueries(1):
+            settings = TestGenericSetting.load(self.get_request())
+        self.assertEqual(settings.title, "New title")
+
+    def test_delete_invalidates_cache(self):
+        TestGenericSetting.load(self.get_request())
+
+        self.default_settings.delete()
+        settings = TestGenericSetting.load(self.get_request())
+        self.assertNotEqual(settings.pk, self.default_settings.pk)
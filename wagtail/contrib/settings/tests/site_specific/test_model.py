@@ -1,9 +1,17 @@
 import pickle
+from unittest import mock
 
+from django.core.cache import cache
 from django.test import RequestFactory, TestCase, override_settings
 
+from wagtail.contrib.settings import cache as settings_cache
+from wagtail.contrib.settings.cache import preload_settings
 from wagtail.models import Site
-from wagtail.test.testapp.models import ImportantPagesSiteSetting, TestSiteSetting
+from wagtail.test.testapp.models import (
+    ImportantPagesSiteSetting,
+    TestGenericSetting,
+    TestSiteSetting,
+)
 
 from .base import SiteSettingsTestMixin
 
@@ -223,3 +231,91 @@ class SettingModelTestCase(SiteSettingsTestMixin, TestCase):
                 self.assertEqual(settings.get_page_url("test_attribute"), "")
                 # when called indirectly via shortcut
                 self.assertEqual(settings.page_url.test_attribute, "")
+
+
+@override_settings(
+    ALLOWED_HOSTS=["localhost", "other"],
+    WAGTAILSETTINGS_CACHE=True,
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+)
+class SettingModelCacheTestCase(SiteSettingsTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        super().setUp()
+
+    def get_request(self, site=None):
+        request = super().get_request(site=site)
+        # force site query beforehand
+        Site.find_for_request(request)
+        return request
+
+    def test_for_request_reuses_settings_between_requests(self):
+        TestSiteSetting.for_request(self.get_request())
+        TestSiteSetting.for_request(self.get_request(site=self.other_site))
+
+        for site, expected_settings in (
+            (self.default_site, self.default_settings),
+            (self.other_site, self.other_settings),
+        ):
+            with self.subTest(site=site):
+                request = self.get_request(site=site)
+                with self.assertNumQueries(0):
+                    settings = TestSiteSetting.for_request(request)
+                self.assertEqual(settings, expected_settings)
+                self.assertEqual(settings.title, expected_settings.title)
+
+    def test_for_site_reuses_settings(self):
+        TestSiteSetting.for_site(self.default_site)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                TestSiteSetting.for_site(self.default_site), self.default_settings
+            )
+
+    def test_instances_are_not_shared_between_requests(self):
+        TestSiteSetting.for_request(self.get_request()).title = "Changed"
+        self.assertEqual(
+            TestSiteSetting.for_request(self.get_request()).title, "Site title"
+        )
+
+    def test_save_invalidates_cache(self):
+        TestSiteSetting.for_request(self.get_request())
+
+        self.default_settings.title = "New title"
+        self.default_settings.save()
+        request = self.get_request()
+        with self.assertNumQueries(1):
+            settings = TestSiteSetting.for_request(request)
+        self.assertEqual(settings.title, "New title")
+
+    def test_related_objects_are_not_cached(self):
+        obj = ImportantPagesSiteSetting.objects.create(
+            site=self.default_site,
+            sign_up_page=self.default_site.root_page,
+            general_terms_page=self.default_site.root_page,
+            privacy_policy_page=self.other_site.root_page,
+        )
+        ImportantPagesSiteSetting.for_request(self.get_request())
+
+        page = obj.sign_up_page
+        page.title = "New title"
+        page.save()
+        settings = ImportantPagesSiteSetting.for_request(self.get_request())
+        self.assertEqual(settings.sign_up_page.title, "New title")
+
+    def test_preload_settings(self):
+        TestGenericSetting.objects.create(title="Generic title")
+        TestSiteSetting.for_request(self.get_request())
+        TestGenericSetting.load(self.get_request())
+
+        request = self.get_request()
+        preload_settings(request)
+
+        # The generations of all settings were fetched by preload_settings()
+        with mock.patch.object(settings_cache, "cache") as mock_cache:
+            with self.assertNumQueries(0):
+                self.assertEqual(
+                    TestSiteSetting.for_request(request), self.default_settings
+                )
+                TestGenericSetting.load(request)
+        mock_cache.get_many.assert_not_called()
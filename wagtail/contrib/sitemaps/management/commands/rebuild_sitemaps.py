@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from wagtail.contrib.sitemaps.pregenerated import PregeneratedSitemap
+from wagtail.models import Site
+
+
+class Command(BaseCommand):
+    help = "Rebuild the pre-generated sitemap files for each site"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--site",
+            action="append",
+            dest="sites",
+            type=int,
+            help="ID of a site to rebuild (can be given more than once; defaults to all sites)",
+        )
+
+    def handle(self, *args, **options):
+        sites = Site.objects.select_related("root_page").order_by("pk")
+        if options["sites"]:
+            sites = sites.filter(pk__in=options["sites"])
+            missing = set(options["sites"]) - {site.pk for site in sites}
+            if missing:
+                raise CommandError(
+                    "Site(s) not found: %s" % ", ".join(map(str, sorted(missing)))
+                )
+
+        for site in sites:
+            shards = PregeneratedSitemap(site).build()
+            if options["verbosity"] >= 1:
+                self.stdout.write(
+                    "%s: %d URLs in %d sitemap file(s)"
+                    % (
+                        site,
+                        sum(shard["url_count"] for shard in shards),
+                        len(shards),
+                    )
+                )
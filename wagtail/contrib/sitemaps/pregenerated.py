@@ -0,0 +1,331 @@
+import gzip
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+from django.template.loader import render_to_string
+from django.urls import NoReverseMatch, reverse
+from django.utils.dateparse import parse_date, parse_datetime
+
+from wagtail.coreutils import safe_md5
+
+from .sitemap_generator import Sitemap
+
+# The maximum number of URLs allowed in a single sitemap file by the sitemaps protocol
+SHARD_MAX_URLS = 50000
+
+# Sorts after every character treebeard uses in page paths
+PATH_MAX_SUFFIX = "~"
+
+
+def get_sitemap_storage():
+    return storages[getattr(settings, "WAGTAILSITEMAPS_STORAGE", "default")]
+
+
+def is_pregenerated_sitemap_routed():
+    """
+    Return whether the view serving pre-generated sitemap files is in the URL
+    configuration, which is required to use pre-generated sitemaps.
+    """
+    try:
+        reverse(PregeneratedSitemap.shard_url_name, kwargs={"section": 1})
+    except NoReverseMatch:
+        return False
+    return True
+
+
+def _serialize_lastmod(value):
+    return value.isoformat() if value is not None else None
+
+
+def _parse_lastmod(value):
+    if value is None:
+        return None
+    return parse_datetime(value) or parse_date(value)
+
+
+class PregeneratedSitemap:
+    """
+    Pre-generated, gzip-compressed sitemap files for one site.
+
+    The site's live, public pages are split by tree path into shards of up to
+    ``max_urls`` URLs each, plus a sitemap index that lists them. Each shard
+    covers the range of paths from its ``first_path`` up to the next shard's,
+    so publishing or unpublishing a page only regenerates the shards that
+    cover the page and its descendants.
+
+    The files and a ``manifest.json`` describing them are kept in the storage
+    named by the ``WAGTAILSITEMAPS_STORAGE`` setting, under ``sitemaps/<site id>/``.
+    Changes to them are serialised by a lock held in the default cache.
+    """
+
+    sitemap_class = Sitemap
+    max_urls = SHARD_MAX_URLS
+    shard_url_name = "wagtailsitemaps_shard"
+    # Seconds after which a lock is assumed to have been abandoned by a
+    # crashed process
+    lock_timeout = 300
+
+    def __init__(self, site, storage=None):
+        self.site = site
+        self.storage = storage or get_sitemap_storage()
+        self.directory = f"sitemaps/{site.pk}/"
+
+    @property
+    def manifest_name(self):
+        return self.directory + "manifest.json"
+
+    def load_manifest(self):
+        """
+        Return the manifest for the site's sitemap, or ``None`` if it has
+        not been built.
+        """
+        try:
+            with self.storage.open(self.manifest_name) as f:
+                return json.loads(f.read())
+        except FileNotFoundError:
+            return None
+
+    @contextmanager
+    def lock(self):
+        """
+        Wait until no other process is changing the site's sitemap files,
+        and keep the others waiting until the block exits.
+        """
+        key = f"wagtail-sitemaps-lock-{self.site.pk}"
+        token = uuid.uuid4().hex
+        # The lock expires after lock_timeout, so this doesn't wait forever
+        while not cache.add(key, token, self.lock_timeout):
+            time.sleep(0.1)
+        try:
+            yield
+        finally:
+            if cache.get(key) == token:
+                cache.delete(key)
+
+    def build(self):
+        """
+        Regenerate every shard and the index, replacing the current files.
+        """
+        with self.lock():
+            old_manifest = self.load_manifest()
+            shards = [
+                self.save_shard(first_path, urls)
+                for first_path, urls in self.generate_shards("", None)
+            ]
+            self.save_manifest(shards, old_manifest)
+            return shards
+
+    def update(self, path):
+        """
+        Regenerate the shards that cover the page with the given path and its
+        descendants. Does nothing if the sitemap has not been built.
+
+        Returns ``True`` if any shard was changed.
+        """
+        with self.lock():
+            return self._update(path)
+
+    def _update(self, path):
+        old_manifest = self.load_manifest()
+        if old_manifest is None:
+            return False
+
+        shards = old_manifest["shards"]
+        first_paths = [shard["first_path"] for shard in shards]
+        start = max(i for i, first_path in enumerate(first_paths) if first_path <= path)
+        stop = max(
+            i
+            for i, first_path in enumerate(first_paths)
+            if first_path <= path + PATH_MAX_SUFFIX
+        )
+        end_path = first_paths[stop + 1] if stop + 1 < len(shards) else None
+
+        old_shards = {shard["etag"]: shard for shard in shards[start : stop + 1]}
+        new_shards = []
+        for first_path, urls in self.generate_shards(first_paths[start], end_path):
+            if not urls and len(shards) > 1:
+                # Leave the range to the previous shard, rather than keeping
+                # an empty file around
+                continue
+
+            content = self.render_shard(urls)
+            etag = self.get_etag(content)
+            if etag in old_shards and old_shards[etag]["first_path"] == first_path:
+                new_shards.append(old_shards[etag])
+            else:
+                new_shards.append(self.save_shard(first_path, urls, content))
+
+        if new_shards == shards[start : stop + 1]:
+            return False
+
+        shards = shards[:start] + new_shards + shards[stop + 1 :]
+        if not shards:
+            shards = [self.save_shard("", [])]
+        shards[0]["first_path"] = ""
+        self.save_manifest(shards, old_manifest)
+        return True
+
+    def get_pages(self, start_path, end_path):
+        sitemap = self.sitemap_class(site=self.site)
+        pages = sitemap.items()
+        if start_path:
+            pages = pages.filter(path__gte=start_path)
+        if end_path is not None:
+            pages = pages.filter(path__lt=end_path)
+        return sitemap, pages
+
+    def generate_shards(self, start_path, end_path):
+        """
+        Yield a ``(first_path, urls)`` pair for each shard needed to cover
+        the pages with paths from ``start_path`` up to (not including)
+        ``end_path``. The URLs of a single page are never split across shards.
+        """
+        sitemap, pages = self.get_pages(start_path, end_path)
+        first_path, urls = start_path, []
+        for page in pages.iterator():
+            page_urls = page.get_sitemap_urls(sitemap.request)
+            if urls and len(urls) + len(page_urls) > self.max_urls:
+                yield first_path, urls
+                first_path, urls = page.path, []
+            urls.extend(page_urls)
+        yield first_path, urls
+
+    def render_shard(self, urls):
+        # A fixed mtime keeps the output (and so the ETag) the same when the
+        # content is unchanged
+        return gzip.compress(
+            render_to_string("sitemap.xml", {"urlset": urls}).encode(), mtime=0
+        )
+
+    def get_etag(self, content):
+        return '"%s"' % safe_md5(content, usedforsecurity=False).hexdigest()
+
+    def save_file(self, name, content):
+        return self.storage.save(self.directory + name, ContentFile(content))
+
+    def save_shard(self, first_path, urls, content=None):
+        if content is None:
+            content = self.render_shard(urls)
+
+        last_mods = {url_info.get("lastmod") for url_info in urls}
+        # last_mods might be empty if the whole range is private
+        lastmod = max(last_mods) if last_mods and None not in last_mods else None
+
+        return {
+            "first_path": first_path,
+            "name": self.save_file(f"sitemap-{uuid.uuid4().hex}.xml.gz", content),
+            "etag": self.get_etag(content),
+            "last_modified": int(time.time()),
+            "lastmod": _serialize_lastmod(lastmod),
+            "url_count": len(urls),
+        }
+
+    def get_shard_url(self, section):
+        return self.site.root_url + reverse(
+            self.shard_url_name, kwargs={"section": section}
+        )
+
+    def render_index(self, shards):
+        return render_to_string(
+            "sitemap_index.xml",
+            {
+                "sitemaps": [
+                    {
+                        "location": self.get_shard_url(section),
+                        "last_mod": _parse_lastmod(shard["lastmod"]),
+                    }
+                    for section, shard in enumerate(shards, 1)
+                ]
+            },
+        ).encode()
+
+    def save_manifest(self, shards, old_manifest=None):
+        content = self.render_index(shards)
+        manifest = {
+            "shards": shards,
+            "index": {
+                "name": self.save_file(f"sitemap-{uuid.uuid4().hex}.xml", content),
+                "etag": self.get_etag(content),
+                "last_modified": int(time.time()),
+            },
+        }
+
+        self.write_manifest(json.dumps(manifest).encode())
+
+        # Remove files that are no longer referenced
+        if old_manifest is not None:
+            names = {shard["name"] for shard in shards}
+            for entry in old_manifest["shards"] + [old_manifest["index"]]:
+                if entry["name"] not in names:
+                    self.storage.delete(entry["name"])
+
+        return manifest
+
+    def write_manifest(self, content):
+        """
+        Replace ``manifest.json`` with ``content``. The new manifest is written
+        in full under another name first, and then moved over the old one on
+        local storage, so readers never see it missing or partly written.
+        Other storages overwrite it in place if they allow that, or delete it
+        and save it again.
+        """
+        new_name = self.save_file(f"manifest-{uuid.uuid4().hex}.json", content)
+        try:
+            new_path = self.storage.path(new_name)
+        except NotImplementedError:
+            new_path = None
+        # Some storages (such as InMemoryStorage) have paths that aren't on disk
+        if new_path is not None and os.path.exists(new_path):
+            os.replace(new_path, self.storage.path(self.manifest_name))
+            return
+
+        if self.storage.get_available_name(self.manifest_name) != self.manifest_name:
+            self.storage.delete(self.manifest_name)
+        self.storage.save(self.manifest_name, ContentFile(content))
+        self.storage.delete(new_name)
+
+    def delete(self):
+        with self.lock():
+            manifest = self.load_manifest()
+            if manifest is None:
+                return
+
+            for entry in manifest["shards"] + [manifest["index"]]:
+                self.storage.delete(entry["name"])
+            self.storage.delete(self.manifest_name)
+
+
+def update_pregenerated_sitemaps(path):
+    """
+    Update the pre-generated sitemaps of every site that contains the page
+    with the given path.
+    """
+    from wagtail.models import Site
+
+    if not is_pregenerated_sitemap_routed():
+        return
+
+    sites = Site.objects.select_related("root_page")
+    try:
+        directories, _ = get_sitemap_storage().listdir("sitemaps")
+    except FileNotFoundError:
+        return
+    except NotImplementedError:
+        pass
+    else:
+        # Avoid querying the sites when none of them has a sitemap to update
+        site_ids = [directory for directory in directories if directory.isdigit()]
+        if not site_ids:
+            return
+        sites = sites.filter(pk__in=site_ids)
+
+    for site in sites:
+        if path.startswith(site.root_page.path):
+            PregeneratedSitemap(site).update(path)
@@ -0,0 +1,32 @@
+from django.apps import apps
+from django.db import transaction
+
+from wagtail.signals import page_published, page_unpublished
+
+from .pregenerated import is_pregenerated_sitemap_routed
+from .tasks import update_pregenerated_sitemaps_task
+
+
+def update_pregenerated_sitemaps_signal_handler(instance, **kwargs):
+    # Sites that don't serve pre-generated sitemaps have none to update
+    if is_pregenerated_sitemap_routed():
+        # The page is published or unpublished inside a transaction, so the
+        # sitemap is only updated once the change is visible to the task
+        transaction.on_commit(
+            lambda: update_pregenerated_sitemaps_task.enqueue(instance.path)
+        )
+
+
+def register_signal_handlers():
+    # Get list of models that are page types
+    Page = apps.get_model("wagtailcore", "Page")
+    indexed_models = [model for model in apps.get_models() if issubclass(model, Page)]
+
+    # Loop through list and register signal handlers for each one
+    for model in indexed_models:
+        page_published.connect(
+            update_pregenerated_sitemaps_signal_handler, sender=model
+        )
+        page_unpublished.connect(
+            update_pregenerated_sitemaps_signal_handler, sender=model
+        )
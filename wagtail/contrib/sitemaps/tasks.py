@@ -0,0 +1,8 @@
+from django_tasks import task
+
+from .pregenerated import update_pregenerated_sitemaps
+
+
+@task()
+def update_pregenerated_sitemaps_task(path):
+    update_pregenerated_sitemaps(path)
@@ -1,14 +1,24 @@
 import datetime
+import gzip
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
 
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.sites.shortcuts import get_current_site
+from django.core import management
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage
 from django.test import RequestFactory, TestCase, override_settings
 from django.utils import timezone
 
 from wagtail.models import Page, PageViewRestriction, Site
 from wagtail.test.testapp.models import EventIndex, SimplePage
 
+from .pregenerated import PregeneratedSitemap, update_pregenerated_sitemaps
 from .sitemap_generator import Sitemap
 
 
@@ -284,3 +294,260 @@ class TestSitemapView(TestCase):
 
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response["Content-Type"], "application/xml")
+
+
+@override_settings(
+    STORAGES={
+        **settings.STORAGES,
+        "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+    }
+)
+class TestPregeneratedSitemap(TestCase):
+    def setUp(self):
+        self.site = Site.objects.get(is_default_site=True)
+        self.home_page = self.site.root_page
+        self.pages = [
+            self.home_page.add_child(
+                instance=SimplePage(
+                    title=f"Page {i}", slug=f"page-{i}", content="hello", live=True
+                )
+            )
+            for i in range(5)
+        ]
+
+        # Two URLs to a shard, to test sharding without thousands of pages
+        patcher = mock.patch.object(PregeneratedSitemap, "max_urls", 2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(lambda: PregeneratedSitemap(self.site).delete())
+
+    def build(self):
+        return PregeneratedSitemap(self.site).build()
+
+    def get_shard(self, section, **headers):
+        return self.client.get(
+            f"/pregenerated-sitemap-{section}.xml.gz", headers=headers
+        )
+
+    def get_shard_content(self, section):
+        response = self.get_shard(section)
+        self.assertEqual(response.status_code, 200)
+        return gzip.decompress(response.content).decode()
+
+    def get_all_urls(self):
+        manifest = PregeneratedSitemap(self.site).load_manifest()
+        return "".join(
+            self.get_shard_content(section)
+            for section in range(1, len(manifest["shards"]) + 1)
+        )
+
+    def test_not_built(self):
+        self.assertEqual(self.client.get("/pregenerated-sitemap.xml").status_code, 404)
+        self.assertEqual(self.get_shard(1).status_code, 404)
+
+    def test_build(self):
+        shards = self.build()
+
+        # The homepage and five children, two to a shard
+        self.assertEqual([shard["url_count"] for shard in shards], [2, 2, 2])
+
+        response = self.client.get("/pregenerated-sitemap.xml")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/xml")
+        for section in (1, 2, 3):
+            self.assertContains(
+                response,
+                f"<loc>http://localhost/pregenerated-sitemap-{section}.xml.gz</loc>",
+            )
+
+        response = self.get_shard(1)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertEqual(response["ETag"], shards[0]["etag"])
+        self.assertIn("Last-Modified", response)
+        content = gzip.decompress(response.content).decode()
+        self.assertIn("<loc>http://localhost/</loc>", content)
+        self.assertIn("<loc>http://localhost/page-0/</loc>", content)
+        self.assertNotIn("page-1", content)
+
+        self.assertEqual(self.get_shard(4).status_code, 404)
+        self.assertEqual(self.get_shard(0).status_code, 404)
+
+    def test_conditional_get(self):
+        shards = self.build()
+
+        response = self.get_shard(1, if_none_match=shards[0]["etag"])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], shards[0]["etag"])
+
+        response = self.get_shard(1, if_none_match='"other"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_rebuild_removes_old_files(self):
+        storage = PregeneratedSitemap(self.site).storage
+        old_shards = self.build()
+        with mock.patch.object(PregeneratedSitemap, "max_urls", 50000):
+            self.build()
+
+        for shard in old_shards:
+            self.assertFalse(storage.exists(shard["name"]))
+
+    def test_publish_updates_affected_shard_only(self):
+        old_shards = self.build()
+
+        new_page = self.pages[2].add_child(
+            instance=SimplePage(title="New", slug="new", content="hello", live=False)
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            new_page.save_revision().publish()
+
+        # The new page comes after page 2, so its shard is split in two. The
+        # unchanged files are kept as they are
+        shards = PregeneratedSitemap(self.site).load_manifest()["shards"]
+        self.assertEqual(len(shards), 4)
+        self.assertEqual(shards[0], old_shards[0])
+        self.assertEqual(shards[1], old_shards[1])
+        self.assertEqual(shards[2]["first_path"], new_page.path)
+        self.assertEqual(shards[3], old_shards[2])
+        self.assertIn("http://localhost/page-2/new/", self.get_shard_content(3))
+
+    def test_unpublish_removes_page(self):
+        self.build()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pages[3].unpublish()
+
+        urls = self.get_all_urls()
+        self.assertNotIn("http://localhost/page-3/", urls)
+        self.assertIn("http://localhost/page-4/", urls)
+
+    def test_update_waits_for_commit(self):
+        self.build()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.pages[3].unpublish()
+        self.assertIn("http://localhost/page-3/", self.get_all_urls())
+
+        for callback in callbacks:
+            callback()
+        self.assertNotIn("http://localhost/page-3/", self.get_all_urls())
+
+    def test_unpublish_all_pages_in_shard(self):
+        old_shards = self.build()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pages[1].unpublish()
+            self.pages[2].unpublish()
+
+        shards = PregeneratedSitemap(self.site).load_manifest()["shards"]
+        self.assertEqual(len(shards), 2)
+        self.assertEqual(shards[0], old_shards[0])
+        self.assertEqual(shards[1], old_shards[2])
+
+    def test_publish_without_built_sitemap(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pages[0].save_revision().publish()
+
+        self.assertIsNone(PregeneratedSitemap(self.site).load_manifest())
+
+    def test_rebuild_sitemaps_command(self):
+        stdout = StringIO()
+        management.call_command("rebuild_sitemaps", stdout=stdout)
+
+        self.assertIn("6 URLs in 3 sitemap file(s)", stdout.getvalue())
+        self.assertIn("http://localhost/page-4/", self.get_shard_content(3))
+
+    def test_rebuild_sitemaps_command_unknown_site(self):
+        with self.assertRaisesMessage(management.CommandError, "Site(s) not found: 0"):
+            management.call_command("rebuild_sitemaps", site=[0], stdout=StringIO())
+
+    def test_update_waits_for_lock(self):
+        self.build()
+
+        # Another process is changing the sitemap, and finishes while this
+        # one waits
+        lock = PregeneratedSitemap(self.site).lock()
+        lock.__enter__()
+
+        def finish_other_process(seconds):
+            lock.__exit__(None, None, None)
+
+        with mock.patch(
+            "wagtail.contrib.sitemaps.pregenerated.time.sleep",
+            side_effect=finish_other_process,
+        ) as sleep:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.pages[3].unpublish()
+
+        sleep.assert_called_once()
+        self.assertNotIn("http://localhost/page-3/", self.get_all_urls())
+
+    def test_lock_is_released_after_failure(self):
+        self.build()
+        sitemap = PregeneratedSitemap(self.site)
+
+        with mock.patch.object(
+            PregeneratedSitemap, "generate_shards", side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                sitemap.update(self.pages[0].path)
+
+        self.assertIsNone(cache.get(f"wagtail-sitemaps-lock-{self.site.pk}"))
+        with mock.patch(
+            "wagtail.contrib.sitemaps.pregenerated.time.sleep",
+            side_effect=AssertionError("waited for a released lock"),
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.pages[3].unpublish()
+        self.assertNotIn("http://localhost/page-3/", self.get_all_urls())
+
+    def test_manifest_is_replaced_without_leftover_files(self):
+        self.build()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pages[3].unpublish()
+
+        sitemap = PregeneratedSitemap(self.site)
+        manifest = sitemap.load_manifest()
+        _, files = sitemap.storage.listdir(sitemap.directory)
+        self.assertCountEqual(
+            files,
+            ["manifest.json", manifest["index"]["name"].rsplit("/", 1)[1]]
+            + [shard["name"].rsplit("/", 1)[1] for shard in manifest["shards"]],
+        )
+
+    def test_manifest_is_moved_into_place_on_local_storage(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        storage = FileSystemStorage(location=location)
+        sitemap = PregeneratedSitemap(self.site, storage=storage)
+        sitemap.build()
+
+        with mock.patch.object(storage, "delete", wraps=storage.delete) as delete:
+            sitemap.build()
+
+        # The old manifest is never deleted, so it can't be found missing
+        self.assertNotIn(mock.call(sitemap.manifest_name), delete.call_args_list)
+        self.assertEqual(
+            sorted(
+                name
+                for name in os.listdir(os.path.join(location, sitemap.directory))
+                if name.startswith("manifest")
+            ),
+            ["manifest.json"],
+        )
+        self.assertEqual(len(sitemap.load_manifest()["shards"]), 3)
+
+    @override_settings(ROOT_URLCONF="wagtail.test.headless_urls")
+    def test_publish_without_pregenerated_sitemap_view(self):
+        with mock.patch(
+            "wagtail.contrib.sitemaps.signal_handlers.update_pregenerated_sitemaps_task"
+        ) as task:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.pages[0].save_revision().publish()
+        task.enqueue.assert_not_called()
+
+        with mock.patch(
+            "wagtail.contrib.sitemaps.pregenerated.get_sitemap_storage"
+        ) as get_sitemap_storage:
+            update_pregenerated_sitemaps(self.pages[0].path)
+        get_sitemap_storage.assert_not_called()
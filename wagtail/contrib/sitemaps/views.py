@@ -1,7 +1,11 @@
 import inspect
 
 from django.contrib.sitemaps import views as sitemap_views
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 
+from .pregenerated import PregeneratedSitemap
 from .sitemap_generator import Sitemap
 
 
@@ -26,3 +30,61 @@ def prepare_sitemaps(request, sitemaps):
         else:
             initialised_sitemaps[name] = sitemap_cls
     return initialised_sitemaps
+
+
+def get_pregenerated_sitemap(request):
+    from wagtail.models import Site
+
+    site = Site.find_for_request(request)
+    if site is None:
+        raise Http404
+
+    sitemap = PregeneratedSitemap(site)
+    manifest = sitemap.load_manifest()
+    if manifest is None:
+        raise Http404
+    return sitemap, manifest
+
+
+def serve_pregenerated_file(request, storage, entry, content_type):
+    response = get_conditional_response(
+        request, etag=entry["etag"], last_modified=entry["last_modified"]
+    )
+    if response is None:
+        try:
+            with storage.open(entry["name"]) as f:
+                response = HttpResponse(f.read(), content_type=content_type)
+        except FileNotFoundError as e:
+            # The file was replaced since the manifest was read
+            raise Http404 from e
+
+    response.headers["ETag"] = entry["etag"]
+    response.headers["Last-Modified"] = http_date(entry["last_modified"])
+    return response
+
+
+def pregenerated_index(request):
+    """
+    Serve the pre-generated sitemap index for the current site, as built by
+    the ``rebuild_sitemaps`` management command.
+    """
+    sitemap, manifest = get_pregenerated_sitemap(request)
+    return serve_pregenerated_file(
+        request, sitemap.storage, manifest["index"], "application/xml"
+    )
+
+
+def pregenerated_sitemap(request, section):
+    """
+    Serve one gzip-compressed, pre-generated sitemap file for the current site.
+    """
+    sitemap, manifest = get_pregenerated_sitemap(request)
+    if not 1 <= section <= len(manifest["shards"]):
+        raise Http404
+
+    return serve_pregenerated_file(
+        request,
+        sitemap.storage,
+        manifest["shards"][section - 1],
+        "application/gzip",
+    )
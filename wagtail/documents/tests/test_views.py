@@ -136,6 +136,92 @@ class TestServeView(TestCase):
             b"".join(self.get().streaming_content), b"A boring example document"
         )
 
+    def get_range(self, range_header, **headers):
+        self.response = self.client.get(
+            reverse(
+                "wagtaildocs_serve", args=(self.document.id, self.document.filename)
+            ),
+            headers={"range": range_header, **headers},
+        )
+        return self.response
+
+    def test_accept_ranges_header(self):
+        self.assertEqual(self.get()["Accept-Ranges"], "bytes")
+
+    def test_single_range(self):
+        response = self.get_range("bytes=2-7")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 2-7/25")
+        self.assertEqual(response["Content-Length"], "6")
+        self.assertEqual(response["Content-Type"], "application/msword")
+        self.assertEqual(b"".join(response.streaming_content), b"boring")
+
+    def test_open_ended_and_suffix_ranges(self):
+        response = self.get_range("bytes=17-")
+        self.assertEqual(response["Content-Range"], "bytes 17-24/25")
+        self.assertEqual(b"".join(response.streaming_content), b"document")
+
+        response = self.get_range("bytes=-8")
+        self.assertEqual(response["Content-Range"], "bytes 17-24/25")
+        self.assertEqual(b"".join(response.streaming_content), b"document")
+
+    def test_multiple_ranges(self):
+        response = self.get_range("bytes=0-0, 17-24")
+
+        self.assertEqual(response.status_code, 206)
+        content_type, boundary = response["Content-Type"].split("; boundary=")
+        self.assertEqual(content_type, "multipart/byteranges")
+        content = b"".join(response.streaming_content)
+        self.assertEqual(int(response["Content-Length"]), len(content))
+        self.assertEqual(
+            content,
+            (
+                f"\r\n--{boundary}\r\n"
+                "Content-Type: application/msword\r\n"
+                "Content-Range: bytes 0-0/25\r\n\r\n"
+                "A"
+                f"\r\n--{boundary}\r\n"
+                "Content-Type: application/msword\r\n"
+                "Content-Range: bytes 17-24/25\r\n\r\n"
+                "document"
+                f"\r\n--{boundary}--\r\n"
+            ).encode(),
+        )
+
+    def test_unsatisfiable_range(self):
+        response = self.get_range("bytes=100-200")
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */25")
+        self.assertFalse(response.streaming)
+        del self.response
+
+    def test_invalid_range_is_ignored(self):
+        response = self.get_range("bytes=7-2")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Length"], "25")
+
+    def test_if_range_matching_etag(self):
+        response = self.get_range("bytes=2-7", if_range='"123456"')
+        self.assertEqual(response.status_code, 206)
+
+    def test_if_range_mismatched_etag(self):
+        response = self.get_range("bytes=2-7", if_range='"654321"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Length"], "25")
+
+    def test_if_range_last_modified(self):
+        last_modified = self.get()["Last-Modified"]
+        b"".join(self.response.streaming_content)
+
+        response = self.get_range("bytes=2-7", if_range=last_modified)
+        self.assertEqual(response.status_code, 206)
+
+        response = self.get_range("bytes=2-7", if_range="Thu, 01 Jan 1970 00:00:00 GMT")
+        self.assertEqual(response.status_code, 200)
+
     def test_document_served_fired(self):
         mock_handler = mock.MagicMock()
         models.document_served.connect(mock_handler)
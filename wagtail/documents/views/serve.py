@@ -3,7 +3,7 @@ from django.http import FileResponse, Http404, HttpResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.template.response import TemplateResponse
 from django.urls import reverse
-from django.utils.http import url_has_allowed_host_and_scheme
+from django.utils.http import quote_etag, url_has_allowed_host_and_scheme
 from django.views.decorators.http import etag
 
 from wagtail import hooks
@@ -76,13 +76,17 @@ def serve(request, document_id, document_filename):
 
     if local_path:
         # Use wagtail.utils.sendfile to serve the file;
-        # this provides support for mimetypes, if-modified-since and django-sendfile backends
+        # this provides support for mimetypes, if-modified-since, range requests
+        # and django-sendfile backends
 
         sendfile_opts = {
             "attachment": (doc.content_disposition != "inline"),
             "attachment_filename": doc.filename,
             "mimetype": doc.content_type,
         }
+        if getattr(doc, "file_hash", None):
+            # Matches the ETag header set by the @etag decorator, for If-Range requests
+            sendfile_opts["etag"] = quote_etag(doc.file_hash)
         if not hasattr(settings, "SENDFILE_BACKEND"):
             # Fallback to streaming backend if user hasn't specified SENDFILE_BACKEND
             sendfile_opts["backend"] = sendfile_streaming_backend.sendfile
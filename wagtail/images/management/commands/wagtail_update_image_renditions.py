@@ -1,9 +1,19 @@
 import logging
+import os
+import time
 
-from django.core.management.base import BaseCommand
-from django.db import transaction
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
 
 from wagtail.images import get_image_model
+from wagtail.images.warm_renditions import has_warm_renditions, warm_renditions
+from wagtail.utils.parallel import (
+    in_order,
+    load_state,
+    pk_chunks,
+    save_state,
+    worker_pool,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +29,25 @@ def progress_bar(current, total, bar_length=50):
     return (f"Progress: [{arrow}{padding}] {int(fraction * 100)}%", ending)
 
 
+def warm_renditions_for_images(pks):
+    """
+    Generate the registered warm renditions for the images with the given
+    primary keys. Runs in the worker processes when warming in parallel.
+
+    Returns the primary keys of the images that failed.
+    """
+    failed = []
+    for image in (
+        get_image_model().objects.filter(pk__in=pks).select_related("collection")
+    ):
+        try:
+            warm_renditions(image)
+        except Exception:
+            logger.exception("Error warming renditions for image %d", image.pk)
+            failed.append(image.pk)
+    return failed
+
+
 class Command(BaseCommand):
     """Command to create missing image renditions with the option to remove (purge) any existing ones."""
 
@@ -36,8 +65,39 @@ class Command(BaseCommand):
             default=50,
             help="Operate in x size chunks (default: %(default)s)",
         )
+        parser.add_argument(
+            "--warm",
+            action="store_true",
+            help=(
+                "Generate the missing renditions registered with "
+                "register_warm_renditions() for every image, instead of "
+                "regenerating existing renditions"
+            ),
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of processes used to warm renditions (default: %(default)s)",
+        )
+        parser.add_argument(
+            "--state-file",
+            default=None,
+            help=(
+                "When warming, record progress in this file after every chunk. If "
+                "the file exists, warming resumes from it instead of starting over"
+            ),
+        )
 
     def handle(self, *args, **options):
+        if options["warm"]:
+            if options["purge_only"]:
+                raise CommandError("--purge-only cannot be used with --warm")
+            return self.handle_warm(**options)
+
+        if options["workers"] != 1 or options["state_file"]:
+            raise CommandError("--workers and --state-file require --warm")
+
         Rendition = get_image_model().get_rendition_model()
 
         renditions = Rendition.objects.all()
@@ -98,3 +158,73 @@ class Command(BaseCommand):
             )
         else:
             self.stdout.write(self.style.WARNING("Could not process any renditions."))
+
+    def handle_warm(self, **options):
+        chunk_size = options["chunk_size"]
+        workers = options["workers"]
+        state_file = options["state_file"]
+
+        if workers < 1:
+            raise CommandError("--workers must be at least 1")
+        if (
+            workers > 1
+            and connection.vendor == "sqlite"
+            and connection.is_in_memory_db()
+        ):
+            raise CommandError("--workers cannot be used with an in-memory database")
+
+        if not has_warm_renditions():
+            self.stdout.write(self.style.WARNING("No warm renditions registered."))
+            return
+
+        last_pk = None
+        state = load_state(state_file)
+        if state is not None:
+            last_pk = state["last_pk"]
+            self.stdout.write(self.style.HTTP_INFO(f"Resuming after image {last_pk}"))
+
+        images = get_image_model().objects.all()
+        if last_pk is not None:
+            images = images.filter(pk__gt=last_pk)
+        num_images = images.count()
+        if not num_images:
+            self.stdout.write(self.style.WARNING("No images to warm."))
+            return
+
+        self.stdout.write(
+            self.style.HTTP_INFO(f"Warming renditions for {num_images} image(s)")
+        )
+
+        start_time = time.monotonic()
+        num_done = 0
+        failed = []
+        with worker_pool(workers) as executor:
+            # Warm a few chunks ahead, but record them as done in order so
+            # that the state file is always accurate
+            for pks, chunk_failed in in_order(
+                warm_renditions_for_images,
+                pk_chunks(images, chunk_size),
+                executor,
+                lookahead=workers,
+            ):
+                failed.extend(chunk_failed)
+                num_done += len(pks)
+                save_state(state_file, {"last_pk": pks[-1]})
+                _progress_bar = progress_bar(num_done, num_images)
+                self.stdout.write(_progress_bar[0], ending=_progress_bar[1])
+
+        for pk in failed:
+            self.stderr.write(
+                self.style.ERROR(f"Failed to warm renditions for image {pk}")
+            )
+
+        elapsed = time.monotonic() - start_time
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Warmed renditions for {num_done - len(failed)} image(s) "
+                f"in {elapsed:.1f}s"
+            )
+        )
+
+        if state_file and os.path.exists(state_file):
+            os.remove(state_file)
@@ -46,6 +46,12 @@ from wagtail.images.image_operations import (
     TransformOperation,
 )
 from wagtail.images.rect import Rect
+from wagtail.images.rendition_cache import rendition_cache
+from wagtail.images.rendition_pipeline import (
+    RENDITION_EXECUTOR_THREAD,
+    RenditionPipeline,
+    get_rendition_executor,
+)
 from wagtail.images.utils import to_svg_safe_spec
 from wagtail.models import CollectionMember, ReferenceIndex
 from wagtail.search import index
@@ -66,6 +72,17 @@ IMAGE_FORMAT_EXTENSIONS = {
     "heic": ".heic",
 }
 
+IMAGE_FORMAT_MIME_TYPES = {
+    "avif": "image/avif",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "gif": "image/gif",
+    "webp": "image/webp",
+    "svg": "image/svg+xml",
+    "ico": "image/x-icon",
+    "heic": "image/heic",
+}
+
 
 class SourceImageIOError(IOError):
     """
@@ -76,14 +93,29 @@ class SourceImageIOError(IOError):
 
 
 class ImageQuerySet(SearchableQuerySetMixin, models.QuerySet):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # set by prefetch_renditions()
+        self._cached_rendition_specs = ()
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._cached_rendition_specs = self._cached_rendition_specs
+        return clone
+
     def prefetch_renditions(self, *filters):
         """
         Prefetches generated renditions for the given filters.
         Returns all renditions when no filters are provided.
+
+        When filters are provided, the renditions are looked up in the
+        rendition cache first, with a single lookup for all of the images.
+        Only the images with renditions missing from the cache are queried.
         """
         rendition_model = self.model.get_rendition_model()
         queryset = rendition_model.objects.all()
 
+        clone = self._clone()
         if filters:
             # Get a list of filter spec strings. The given value could contain Filter objects
             filter_specs = [
@@ -91,8 +123,9 @@ class ImageQuerySet(SearchableQuerySetMixin, models.QuerySet):
                 for filter in filters
             ]
             queryset = queryset.filter(filter_spec__in=filter_specs)
+            clone._cached_rendition_specs = tuple(dict.fromkeys(filter_specs))
 
-        return self.prefetch_related(
+        return clone.prefetch_related(
             models.Prefetch(
                 "renditions",
                 queryset=queryset,
@@ -100,6 +133,41 @@ class ImageQuerySet(SearchableQuerySetMixin, models.QuerySet):
             )
         )
 
+    def _prefetch_related_objects(self):
+        if self._cached_rendition_specs:
+            self._prefetch_renditions_from_cache()
+        super()._prefetch_related_objects()
+
+    def _prefetch_renditions_from_cache(self):
+        Rendition = self.model.get_rendition_model()
+        filters = [Filter(spec) for spec in self._cached_rendition_specs]
+
+        cache_keys = {}
+        for image in self._result_cache:
+            if not isinstance(image, AbstractImage):
+                # values() and values_list() querysets
+                return
+            for filter in filters:
+                cache_key = Rendition.construct_cache_key(
+                    image, filter.get_cache_key(image), filter.spec
+                )
+                cache_keys[cache_key] = image
+
+        renditions_by_image = defaultdict(list)
+        for cache_key, rendition in rendition_cache.get_many(
+            Rendition.cache_backend, cache_keys
+        ).items():
+            image = cache_keys[cache_key]
+            rendition.image = image
+            rendition._from_cache = True
+            renditions_by_image[image].append(rendition)
+
+        # Setting prefetched_renditions leaves these images out of the
+        # database query. Images missing any renditions are queried as usual.
+        for image, renditions in renditions_by_image.items():
+            if len(renditions) == len(filters):
+                image.prefetched_renditions = renditions
+
 
 def get_upload_to(instance, filename):
     """
@@ -553,10 +621,12 @@ class AbstractImage(ImageFileMixin, CollectionMember, index.Indexed, models.Mode
             # Reuse this rendition if requested again from this object
             self._add_to_prefetched_renditions(rendition)
 
-        cache_key = Rendition.construct_cache_key(
-            self, filter.get_cache_key(self), filter.spec
-        )
-        Rendition.cache_backend.set(cache_key, rendition)
+        # prevent writing of cached data back to the cache
+        if not getattr(rendition, "_from_cache", False):
+            cache_key = Rendition.construct_cache_key(
+                self, filter.get_cache_key(self), filter.spec
+            )
+            rendition_cache.set_many(Rendition.cache_backend, {cache_key: rendition})
 
         return rendition
 
@@ -640,7 +710,7 @@ class AbstractImage(ImageFileMixin, CollectionMember, index.Indexed, models.Mode
             if not getattr(rendition, "_from_cache", False)
         }
         if cache_additions:
-            Rendition.cache_backend.set_many(cache_additions)
+            rendition_cache.set_many(Rendition.cache_backend, cache_additions)
 
         # Make sure key insertion order matches the input order.
         return {filter.spec: renditions[filter] for filter in filters}
@@ -699,11 +769,15 @@ class AbstractImage(ImageFileMixin, CollectionMember, index.Indexed, models.Mode
                 Rendition.construct_cache_key(self, filter.get_cache_key(self), spec)
                 for spec, filter in filters_by_spec.items()
             ]
-            for rendition in Rendition.cache_backend.get_many(cache_keys).values():
+            for rendition in rendition_cache.get_many(
+                Rendition.cache_backend, cache_keys
+            ).values():
                 filter = filters_by_spec[rendition.filter_spec]
                 # The retrieved rendition needs to be associated with the current image instance, so that any
                 # locally-set properties such as contextual_alt_text are respected
                 rendition.image = self
+                # to prevent writing of cached data back to the cache
+                rendition._from_cache = True
                 found[filter] = rendition
 
             # For items not found in the cache, look in the database
@@ -752,18 +826,7 @@ class AbstractImage(ImageFileMixin, CollectionMember, index.Indexed, models.Mode
         with self.open_file() as file:
             original_image_bytes = file.read()
 
-        to_create = []
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
-            for future in concurrent.futures.as_completed(
-                executor.submit(
-                    self.generate_rendition_instance,
-                    filter,
-                    BytesIO(original_image_bytes),
-                )
-                for filter in filters
-            ):
-                to_create.append(future.result())
+        to_create = self.generate_rendition_instances(filters, original_image_bytes)
 
         # Rendition generation can take a while. So, if other processes have created
         # identical renditions in the meantime, we should find them to avoid clashes.
@@ -804,6 +867,73 @@ class AbstractImage(ImageFileMixin, CollectionMember, index.Indexed, models.Mode
 
         return return_value
 
+    def generate_rendition_instances(
+        self, filters: Iterable[Filter], source_bytes: bytes
+    ) -> list[AbstractRendition]:
+        """
+        Use the supplied ``source_bytes`` (the contents of the original image)
+        to create and return **unsaved** ``Rendition`` instances for each of
+        the supplied ``filters``.
+
+        Where possible, the renditions are generated together by a
+        ``RenditionPipeline``, which only decodes the original once and
+        resizes smaller renditions from larger ones. Renditions of SVG images,
+        and those using custom ``Filter.run()`` implementations, are each
+        generated separately with ``generate_rendition_instance()``. A single
+        rendition gains nothing from the pipeline, so it is generated on the
+        current thread rather than waiting for a worker of the shared pool.
+        """
+        filters = list(filters)
+        if len(filters) == 1:
+            return [
+                self.generate_rendition_instance(filters[0], BytesIO(source_bytes))
+            ]
+
+        Rendition = self.get_rendition_model()
+        batched_filters = []
+        if not self.is_svg() and (
+            type(self).generate_rendition_instance
+            is AbstractImage.generate_rendition_instance
+            and type(self).generate_rendition_file
+            is AbstractImage.generate_rendition_file
+        ):
+            batched_filters = [
+                filter for filter in filters if type(filter).run is Filter.run
+            ]
+
+        generated_images = RenditionPipeline(self, source_bytes).generate(
+            batched_filters
+        )
+        to_create = [
+            Rendition(
+                image=self,
+                filter_spec=filter.spec,
+                focal_point_key=filter.get_cache_key(self),
+                file=File(
+                    generated_image.f,
+                    name=self.get_rendition_filename(filter, generated_image),
+                ),
+            )
+            for filter, generated_image in generated_images.items()
+        ]
+
+        remaining_filters = [
+            filter for filter in filters if filter not in generated_images
+        ]
+        if remaining_filters:
+            executor = get_rendition_executor(RENDITION_EXECUTOR_THREAD)
+            for future in concurrent.futures.as_completed(
+                executor.submit(
+                    self.generate_rendition_instance,
+                    filter,
+                    BytesIO(source_bytes),
+                )
+                for filter in remaining_filters
+            ):
+                to_create.append(future.result())
+
+        return to_create
+
     def generate_rendition_instance(
         self, filter: Filter, source: BytesIO
     ) -> AbstractRendition:
@@ -839,9 +969,6 @@ class AbstractImage(ImageFileMixin, CollectionMember, index.Indexed, models.Mode
         the original image), you might want to consider swapping out ``filter``
         for an instance of a custom ``Filter`` subclass of your design.
         """
-
-        cache_key = filter.get_cache_key(self)
-
         logger.debug(
             "Generating '%s' rendition for image %d",
             filter.spec,
@@ -871,7 +998,17 @@ class AbstractImage(ImageFileMixin, CollectionMember, index.Indexed, models.Mode
             )
             raise
 
-        # Generate filename
+        return File(
+            generated_image.f, name=self.get_rendition_filename(filter, generated_image)
+        )
+
+    def get_rendition_filename(self, filter: Filter, generated_image) -> str:
+        """
+        Returns the filename for a rendition file generated with the supplied
+        ``filter``, based on the original filename and the output format.
+        """
+        cache_key = filter.get_cache_key(self)
+
         input_filename = os.path.basename(self.file.name)
         input_filename_without_extension, input_extension = os.path.splitext(
             input_filename
@@ -887,9 +1024,7 @@ class AbstractImage(ImageFileMixin, CollectionMember, index.Indexed, models.Mode
         output_filename_without_extension = input_filename_without_extension[
             : (59 - len(output_extension))
         ]
-        output_filename = output_filename_without_extension + "." + output_extension
-
-        return File(generated_image.f, name=output_filename)
+        return output_filename_without_extension + "." + output_extension
 
     def is_portrait(self):
         return self.width < self.height
@@ -1059,109 +1194,121 @@ class Filter:
             willow = willow.auto_orient()
 
             # Transform the image
-            transform = self.get_transform(
-                image, (willow.image.width, willow.image.height)
-            )
-            willow = willow.crop(transform.get_rect().round())
-            willow = willow.resize(transform.size)
+            willow = self.apply_transforms(willow, image)
+
+            return self.save_rendition(willow, image, output, original_format)
+
+    def apply_transforms(self, willow, image: AbstractImage):
+        """
+        Crops and resizes the (auto-oriented) ``willow`` image according to
+        the transform operations in this filter.
+        """
+        transform = self.get_transform(image, (willow.image.width, willow.image.height))
+        willow = willow.crop(transform.get_rect().round())
+        return willow.resize(transform.size)
+
+    def save_rendition(
+        self, willow, image: AbstractImage, output: BytesIO, original_format: str
+    ):
+        """
+        Applies the filter operations in this filter to the transformed
+        ``willow`` image, and saves it to ``output`` in the output format.
+        """
+        # Apply filters
+        env = {
+            "original-format": original_format,
+        }
+        for operation in self.filter_operations:
+            willow = operation.run(willow, image, env) or willow
 
-            # Apply filters
-            env = {
-                "original-format": original_format,
+        # Find the output format to use
+        if "output-format" in env:
+            # Developer specified an output format
+            output_format = env["output-format"]
+        else:
+            # Convert avif, bmp and webp to png, and heic to jpg, by default
+            default_conversions = {
+                "avif": "png",
+                "bmp": "png",
+                "webp": "png",
+                "heic": "jpeg",
             }
-            for operation in self.filter_operations:
-                willow = operation.run(willow, image, env) or willow
 
-            # Find the output format to use
-            if "output-format" in env:
-                # Developer specified an output format
-                output_format = env["output-format"]
-            else:
-                # Convert avif, bmp and webp to png, and heic to jpg, by default
-                default_conversions = {
-                    "avif": "png",
-                    "bmp": "png",
-                    "webp": "png",
-                    "heic": "jpeg",
-                }
-
-                # Convert unanimated GIFs to PNG as well
-                if not willow.has_animation():
-                    default_conversions["gif"] = "png"
-
-                # Allow the user to override the conversions
-                conversion = getattr(settings, "WAGTAILIMAGES_FORMAT_CONVERSIONS", {})
-                default_conversions.update(conversion)
-
-                # Get the converted output format falling back to the original
-                output_format = default_conversions.get(
-                    original_format, original_format
-                )
+            # Convert unanimated GIFs to PNG as well
+            if not willow.has_animation():
+                default_conversions["gif"] = "png"
 
-            if output_format == "jpeg":
-                # Allow changing of JPEG compression quality
-                if "jpeg-quality" in env:
-                    quality = env["jpeg-quality"]
-                else:
-                    quality = getattr(settings, "WAGTAILIMAGES_JPEG_QUALITY", 76)
+            # Allow the user to override the conversions
+            conversion = getattr(settings, "WAGTAILIMAGES_FORMAT_CONVERSIONS", {})
+            default_conversions.update(conversion)
 
-                # If the image has an alpha channel, give it a white background
-                if willow.has_alpha():
-                    willow = willow.set_background_color_rgb((255, 255, 255))
+            # Get the converted output format falling back to the original
+            output_format = default_conversions.get(original_format, original_format)
 
-                return willow.save_as_jpeg(
-                    output, quality=quality, progressive=True, optimize=True
-                )
-            elif output_format == "png":
-                return willow.save_as_png(output, optimize=True)
-            elif output_format == "gif":
-                return willow.save_as_gif(output)
-            elif output_format == "webp":
-                # Allow changing of WebP compression quality
-                if (
-                    "output-format-options" in env
-                    and "lossless" in env["output-format-options"]
-                ):
-                    return willow.save_as_webp(output, lossless=True)
-                elif "webp-quality" in env:
-                    quality = env["webp-quality"]
-                else:
-                    quality = getattr(settings, "WAGTAILIMAGES_WEBP_QUALITY", 80)
+        if output_format == "jpeg":
+            # Allow changing of JPEG compression quality
+            if "jpeg-quality" in env:
+                quality = env["jpeg-quality"]
+            else:
+                quality = getattr(settings, "WAGTAILIMAGES_JPEG_QUALITY", 76)
 
-                return willow.save_as_webp(output, quality=quality)
-            elif output_format == "avif":
-                # Allow changing of AVIF compression quality
-                if (
-                    "output-format-options" in env
-                    and "lossless" in env["output-format-options"]
-                ):
-                    return willow.save_as_avif(output, lossless=True)
-                elif "avif-quality" in env:
-                    quality = env["avif-quality"]
-                else:
-                    quality = getattr(settings, "WAGTAILIMAGES_AVIF_QUALITY", 61)
-                return willow.save_as_avif(output, quality=quality)
-            elif output_format == "heic":
-                # Allow changing of HEIC compression quality. Safari is the only browser that supports HEIC,
-                # so there is little value in outputting it - for that reason, we make it work if someone
-                # explicitly requests it, but these settings are not documented.
-                if (
-                    "output-format-options" in env
-                    and "lossless" in env["output-format-options"]
-                ):
-                    return willow.save_as_heic(output, lossless=True)
-                elif "heic-quality" in env:
-                    quality = env["heic-quality"]
-                else:
-                    quality = getattr(settings, "WAGTAILIMAGES_HEIC_QUALITY", 80)
-                return willow.save_as_heic(output, quality=quality)
-            elif output_format == "svg":
-                return willow.save_as_svg(output)
-            elif output_format == "ico":
-                return willow.save_as_ico(output)
-            raise UnknownOutputImageFormatError(
-                f"Unknown output image format '{output_format}'"
+            # If the image has an alpha channel, give it a white background
+            if willow.has_alpha():
+                willow = willow.set_background_color_rgb((255, 255, 255))
+
+            return willow.save_as_jpeg(
+                output, quality=quality, progressive=True, optimize=True
             )
+        elif output_format == "png":
+            return willow.save_as_png(output, optimize=True)
+        elif output_format == "gif":
+            return willow.save_as_gif(output)
+        elif output_format == "webp":
+            # Allow changing of WebP compression quality
+            if (
+                "output-format-options" in env
+                and "lossless" in env["output-format-options"]
+            ):
+                return willow.save_as_webp(output, lossless=True)
+            elif "webp-quality" in env:
+                quality = env["webp-quality"]
+            else:
+                quality = getattr(settings, "WAGTAILIMAGES_WEBP_QUALITY", 80)
+
+            return willow.save_as_webp(output, quality=quality)
+        elif output_format == "avif":
+            # Allow changing of AVIF compression quality
+            if (
+                "output-format-options" in env
+                and "lossless" in env["output-format-options"]
+            ):
+                return willow.save_as_avif(output, lossless=True)
+            elif "avif-quality" in env:
+                quality = env["avif-quality"]
+            else:
+                quality = getattr(settings, "WAGTAILIMAGES_AVIF_QUALITY", 61)
+            return willow.save_as_avif(output, quality=quality)
+        elif output_format == "heic":
+            # Allow changing of HEIC compression quality. Safari is the only browser that supports HEIC,
+            # so there is little value in outputting it - for that reason, we make it work if someone
+            # explicitly requests it, but these settings are not documented.
+            if (
+                "output-format-options" in env
+                and "lossless" in env["output-format-options"]
+            ):
+                return willow.save_as_heic(output, lossless=True)
+            elif "heic-quality" in env:
+                quality = env["heic-quality"]
+            else:
+                quality = getattr(settings, "WAGTAILIMAGES_HEIC_QUALITY", 80)
+            return willow.save_as_heic(output, quality=quality)
+        elif output_format == "svg":
+            return willow.save_as_svg(output)
+        elif output_format == "ico":
+            return willow.save_as_ico(output)
+        raise UnknownOutputImageFormatError(
+            f"Unknown output image format '{output_format}'"
+        )
 
     def get_cache_key(self, image):
         vary_parts = []
@@ -1379,6 +1526,21 @@ class AbstractRendition(ImageFileMixin, models.Model):
     def filter(self):
         return Filter(self.filter_spec)
 
+    @property
+    def mime_type(self):
+        """
+        The MIME type of the rendition's file. Rendition filenames always end
+        with the extension of the output format, so this only needs to read
+        the file for an extension Wagtail doesn't generate.
+        """
+        _, extension = os.path.splitext(self.file.name)
+        for format_name, format_extension in IMAGE_FORMAT_EXTENSIONS.items():
+            if extension.lower() == format_extension:
+                return IMAGE_FORMAT_MIME_TYPES[format_name]
+
+        with self.get_willow_image() as willow_image:
+            return willow_image.mime_type
+
     @cached_property
     def focal_point(self):
         image_focal_point = self.image.get_focal_point()
@@ -1525,7 +1687,7 @@ class AbstractRendition(ImageFileMixin, models.Model):
         )
 
     def purge_from_cache(self):
-        self.cache_backend.delete(self.get_cache_key())
+        rendition_cache.delete(self.cache_backend, self.get_cache_key())
 
     class Meta:
         abstract = True
@@ -0,0 +1,169 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache.backends.dummy import DummyCache
+
+# Stored in the local cache for keys known to be missing from the shared cache
+MISSING = object()
+
+
+class RenditionLookupCache:
+    """
+    A two-tier cache for rendition lookups: a bounded, per-process LRU cache
+    in front of the shared cache backend (``AbstractRendition.cache_backend``).
+
+    The local tier holds up to ``WAGTAILIMAGES_RENDITION_LOCAL_CACHE_SIZE``
+    renditions (default ``0``, which disables it) for up to
+    ``WAGTAILIMAGES_RENDITION_LOCAL_CACHE_TIMEOUT`` seconds (default 300).
+    It is skipped when the shared backend is a ``DummyCache``, where rendition
+    lookups aren't meant to be cached at all. Rendition cache keys include the image's file hash and focal point, so
+    changes to those never return stale renditions. Purging a rendition
+    removes it from the local tier of the current process straight away, and
+    from other processes once their entries time out.
+
+    Keys missing from the shared cache are also remembered, so that lookups
+    for them go straight to the database until the rendition is cached.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    @property
+    def max_size(self):
+        return getattr(settings, "WAGTAILIMAGES_RENDITION_LOCAL_CACHE_SIZE", 0)
+
+    @property
+    def timeout(self):
+        return getattr(settings, "WAGTAILIMAGES_RENDITION_LOCAL_CACHE_TIMEOUT", 300)
+
+    def is_enabled(self, backend):
+        return bool(self.max_size) and not isinstance(backend, DummyCache)
+
+    def reset_stats(self):
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def get_stats(self):
+        """
+        Return the number of lookups answered by each tier since the stats
+        were last reset, and the ratio of lookups each tier answered.
+        """
+        lookups = self.local_hits + self.shared_hits + self.misses
+        return {
+            "lookups": lookups,
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "local_hit_ratio": self.local_hits / lookups if lookups else 0.0,
+            "hit_ratio": (
+                (self.local_hits + self.shared_hits) / lookups if lookups else 0.0
+            ),
+            "size": len(self._entries),
+        }
+
+    def _get_local(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires <= now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _set_local(self, key, value, now):
+        max_size = self.max_size
+        if not max_size:
+            return
+        self._entries[key] = (value, now + self.timeout)
+        self._entries.move_to_end(key)
+        while len(self._entries) > max_size:
+            self._entries.popitem(last=False)
+
+    def get_many(self, backend, keys):
+        """
+        Return a dict of the renditions found for the given cache keys,
+        looking in the local tier first (if enabled), then in ``backend`` with
+        a single ``get_many()`` call for the rest.
+        """
+        found = {}
+        to_fetch = []
+        enabled = self.is_enabled(backend)
+        now = time.monotonic()
+        if not enabled:
+            to_fetch = list(keys)
+        else:
+            with self._lock:
+                for key in keys:
+                    value = self._get_local(key, now)
+                    if value is MISSING:
+                        self.misses += 1
+                    elif value is not None:
+                        # Renditions are returned to several threads, which may
+                        # set attributes (such as ``image``) on them
+                        found[key] = copy.copy(value)
+                        self.local_hits += 1
+                    else:
+                        to_fetch.append(key)
+
+        if not to_fetch:
+            return found
+
+        fetched = backend.get_many(to_fetch)
+        now = time.monotonic()
+        with self._lock:
+            for key in to_fetch:
+                value = fetched.get(key)
+                if value is None:
+                    if enabled:
+                        self._set_local(key, MISSING, now)
+                    self.misses += 1
+                else:
+                    if enabled:
+                        self._set_local(key, value, now)
+                    found[key] = copy.copy(value)
+                    self.shared_hits += 1
+        return found
+
+    def set_many(self, backend, data):
+        """
+        Store the given renditions (a dict keyed by cache key) in both tiers.
+        """
+        backend.set_many(data)
+        if self.is_enabled(backend):
+            self.set_many_local(data)
+
+    def set_many_local(self, data):
+        now = time.monotonic()
+        with self._lock:
+            for key, rendition in data.items():
+                self._set_local(key, copy.copy(rendition), now)
+
+    def delete(self, backend, key):
+        backend.delete(key)
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_for_image(self, image_id):
+        """
+        Remove the local entries for all renditions of the image with the
+        given ID.
+        """
+        prefix = f"wagtail-rendition-{image_id}-"
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+rendition_cache = RenditionLookupCache()
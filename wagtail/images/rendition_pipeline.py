@@ -0,0 +1,248 @@
+import concurrent.futures
+import logging
+import multiprocessing
+import threading
+import time
+from collections import defaultdict
+from io import BytesIO
+from tempfile import SpooledTemporaryFile
+
+import willow
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files import File
+
+logger = logging.getLogger("wagtail.images")
+
+RENDITION_EXECUTOR_THREAD = "thread"
+RENDITION_EXECUTOR_PROCESS = "process"
+
+# A rendition is only resized from a larger rendition when that is at least
+# this many times its size, so that the result is indistinguishable from
+# resizing the original
+CASCADE_MIN_SCALE = 2
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_rendition_workers():
+    return getattr(settings, "WAGTAILIMAGES_RENDITION_WORKERS", 3)
+
+
+def _init_process_worker():
+    # Workers are spawned rather than forked, so that they don't inherit the
+    # state (threads, database connections) of the web server process
+    import django
+
+    django.setup()
+
+
+def get_rendition_executor(kind=None):
+    """
+    Return the pool that renditions are generated on in this process.
+
+    ``kind`` is either ``"thread"`` or ``"process"``, defaulting to the
+    ``WAGTAILIMAGES_RENDITION_EXECUTOR`` setting. The number of workers is set
+    by ``WAGTAILIMAGES_RENDITION_WORKERS``. The pool is shared by all requests,
+    which also bounds the number of renditions generated at the same time.
+
+    Daemonic processes (such as the workers of Django's parallel test runner
+    or Celery's prefork pool) can't start processes of their own, so they get
+    a thread pool instead.
+    """
+    if kind is None:
+        kind = getattr(
+            settings, "WAGTAILIMAGES_RENDITION_EXECUTOR", RENDITION_EXECUTOR_THREAD
+        )
+    workers = get_rendition_workers()
+
+    in_daemon = (
+        kind == RENDITION_EXECUTOR_PROCESS and multiprocessing.current_process().daemon
+    )
+    if in_daemon:
+        kind = RENDITION_EXECUTOR_THREAD
+
+    with _executors_lock:
+        executor = _executors.get((kind, workers))
+        if executor is None:
+            if in_daemon:
+                logger.warning(
+                    "Generating renditions on threads rather than processes, "
+                    "as daemonic processes can't have children"
+                )
+            if kind == RENDITION_EXECUTOR_THREAD:
+                executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="wagtail-renditions"
+                )
+            elif kind == RENDITION_EXECUTOR_PROCESS:
+                executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_process_worker,
+                )
+            else:
+                raise ImproperlyConfigured(
+                    "WAGTAILIMAGES_RENDITION_EXECUTOR must be 'thread' or 'process', "
+                    f"not {kind!r}"
+                )
+            _executors[(kind, workers)] = executor
+    return executor
+
+
+def resize_image(willow_image, size):
+    return willow_image.resize(size)
+
+
+def save_rendition_image(filter, image, willow_image, original_format, output=None):
+    if output is None:
+        # Files generated in another process must be sent back in memory
+        output = BytesIO()
+    return filter.save_rendition(willow_image, image, output, original_format)
+
+
+class RenditionPipeline:
+    """
+    Generates the files for several renditions of one image from a single
+    decode of the original.
+
+    The original is opened and auto-oriented once, and filters that crop the
+    same region of it share the crop. Renditions are then resized from the
+    largest down: each one is resized from the smallest rendition of the same
+    crop that is at least ``CASCADE_MIN_SCALE`` times its size, or from the
+    crop if there is none. Renditions of the same crop and size (such as
+    ``width-400`` and ``width-400|format-webp``) are only resized once.
+
+    Resizing and saving runs on the pool returned by ``get_rendition_executor``,
+    as soon as the image each step depends on is ready.
+    """
+
+    def __init__(self, image, source_bytes, executor=None):
+        self.image = image
+        self.source_bytes = source_bytes
+        self.executor = executor or get_rendition_executor()
+        self.in_process = isinstance(
+            self.executor, concurrent.futures.ProcessPoolExecutor
+        )
+
+    def open(self):
+        source = willow.Image.open(
+            File(BytesIO(self.source_bytes), name=self.image.file.name)
+        )
+        return source.format_name, source.auto_orient()
+
+    def plan(self, filters, size):
+        """
+        Work out the steps needed to generate renditions for the supplied
+        filters from an original of the given (auto-oriented) size.
+
+        Returns a dict mapping each crop rect to a list of ``(size, filters,
+        parent)`` steps, largest first, where ``parent`` is the index of the
+        step to resize from, or ``None`` to resize from the crop.
+        """
+        filters_by_target = defaultdict(list)
+        for filter in filters:
+            transform = filter.get_transform(self.image, size)
+            rect = tuple(transform.get_rect().round())
+            filters_by_target[rect, tuple(transform.size)].append(filter)
+
+        plan = defaultdict(list)
+        for rect, target_size in sorted(
+            filters_by_target,
+            key=lambda target: target[1][0] * target[1][1],
+            reverse=True,
+        ):
+            steps = plan[rect]
+            parent = None
+            for i in reversed(range(len(steps))):
+                width, height = steps[i][0]
+                if (
+                    width >= target_size[0] * CASCADE_MIN_SCALE
+                    and height >= target_size[1] * CASCADE_MIN_SCALE
+                ):
+                    parent = i
+                    break
+            steps.append((target_size, filters_by_target[rect, target_size], parent))
+        return plan
+
+    def generate(self, filters):
+        """
+        Return a dict mapping each of the supplied filters to the image file
+        generated for it (as returned by ``Filter.run()``).
+
+        Returns an empty dict if the original can't be processed in a batch
+        (for example, if it is animated). Filters must use the default
+        ``Filter.run()`` implementation.
+        """
+        if not filters:
+            return {}
+
+        start_time = time.time()
+        original_format, source = self.open()
+        if source.has_animation():
+            return {}
+
+        plan = self.plan(filters, source.get_size())
+        results = {}
+        futures = {}
+
+        def submit_resize(rect, index, willow_image):
+            size = plan[rect][index][0]
+            future = self.executor.submit(resize_image, willow_image, size)
+            futures[future] = (rect, index)
+
+        def submit_save(filter, willow_image):
+            output = None
+            if not self.in_process:
+                output = SpooledTemporaryFile(
+                    max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+                )
+            future = self.executor.submit(
+                save_rendition_image,
+                filter,
+                self.image,
+                willow_image,
+                original_format,
+                output,
+            )
+            futures[future] = (filter, None)
+
+        for rect, steps in plan.items():
+            crop = source.crop(rect)
+            for index, (_, _, parent) in enumerate(steps):
+                if parent is None:
+                    submit_resize(rect, index, crop)
+
+        try:
+            while futures:
+                done, _ = concurrent.futures.wait(
+                    futures, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    key, index = futures.pop(future)
+                    if index is None:
+                        results[key] = future.result()
+                        continue
+
+                    resized = future.result()
+                    for filter in plan[key][index][1]:
+                        submit_save(filter, resized)
+                    for child, (_, _, parent) in enumerate(plan[key]):
+                        if parent == index:
+                            submit_resize(key, child, resized)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            logger.debug(
+                "Failed to generate renditions for image %d",
+                self.image.pk,
+            )
+            raise
+
+        logger.debug(
+            "Generated %d renditions for image %d in %.1fms",
+            len(results),
+            self.image.pk,
+            (time.time() - start_time) * 1000,
+        )
+        return results
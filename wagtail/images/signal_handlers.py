@@ -3,9 +3,22 @@ from django.db import transaction
 from django.db.models.signals import post_delete, post_save
 
 from wagtail.images import get_image_model
+from wagtail.rich_text import cache as rich_text_cache
 from wagtail.tasks import delete_file_from_storage_task
 
-from .tasks import set_image_focal_point_task
+from .rendition_cache import rendition_cache
+from .tasks import set_image_focal_point_task, warm_image_renditions_task
+from .warm_renditions import has_warm_renditions
+
+# Fields that the renditions of an image depend on
+RENDITION_FIELDS = {
+    "file",
+    "collection",
+    "focal_point_x",
+    "focal_point_y",
+    "focal_point_width",
+    "focal_point_height",
+}
 
 
 def post_delete_file_cleanup(instance, **kwargs):
@@ -20,6 +33,17 @@ def post_delete_purge_rendition_cache(instance, **kwargs):
     instance.purge_from_cache()
 
 
+def post_delete_invalidate_rich_text_cache(instance, **kwargs):
+    # Cached rich text may embed the URL of the deleted rendition
+    rich_text_cache.invalidate_objects(get_image_model(), [instance.image_id])
+
+
+def purge_local_rendition_cache(instance, **kwargs):
+    # Renditions for a different file or focal point have different cache
+    # keys, so this only frees up the local cache
+    rendition_cache.delete_for_image(instance.pk)
+
+
 def post_save_image_feature_detection(instance, **kwargs):
     if getattr(settings, "WAGTAILIMAGES_FEATURE_DETECTION_ENABLED", False):
         # Make sure the image is not from a fixture
@@ -31,11 +55,30 @@ def post_save_image_feature_detection(instance, **kwargs):
             )
 
 
+def post_save_warm_renditions(instance, **kwargs):
+    if kwargs["raw"] or not has_warm_renditions():
+        return
+
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None and not RENDITION_FIELDS.intersection(update_fields):
+        return
+
+    transaction.on_commit(
+        lambda: warm_image_renditions_task.enqueue(
+            instance._meta.app_label, instance._meta.model_name, str(instance.pk)
+        )
+    )
+
+
 def register_signal_handlers():
     Image = get_image_model()
     Rendition = Image.get_rendition_model()
 
     post_save.connect(post_save_image_feature_detection, sender=Image)
+    post_save.connect(post_save_warm_renditions, sender=Image)
+    post_save.connect(purge_local_rendition_cache, sender=Image)
+    post_delete.connect(purge_local_rendition_cache, sender=Image)
     post_delete.connect(post_delete_file_cleanup, sender=Image)
     post_delete.connect(post_delete_file_cleanup, sender=Rendition)
     post_delete.connect(post_delete_purge_rendition_cache, sender=Rendition)
+    post_delete.connect(post_delete_invalidate_rich_text_cache, sender=Rendition)
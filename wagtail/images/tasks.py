@@ -16,3 +16,16 @@ def set_image_focal_point_task(app_label, model_name, pk):
             "focal_point_height",
         ]
     )
+
+
+@task()
+def warm_image_renditions_task(app_label, model_name, pk):
+    from wagtail.images.warm_renditions import warm_renditions
+
+    model = apps.get_model(app_label, model_name)
+    try:
+        instance = model.objects.select_related("collection").get(pk=pk)
+    except model.DoesNotExist:
+        # The image was deleted before the task ran
+        return
+    warm_renditions(instance)
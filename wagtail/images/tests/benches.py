@@ -0,0 +1,55 @@
+from io import BytesIO
+
+import PIL.Image
+from django.core.files.images import ImageFile
+from django.test import TestCase
+
+from wagtail.images.models import Filter
+from wagtail.test.benchmark import Benchmark
+
+from .utils import Image
+
+SRCSET_SPECS = [f"width-{width}" for width in (320, 480, 640, 960, 1280, 1920)]
+
+
+def get_photo_file():
+    # A detailed image compresses and resizes more like a photo than a
+    # solid colour does
+    f = BytesIO()
+    PIL.Image.effect_mandelbrot((3000, 2000), (-2, -1, 1, 1), 100).convert("RGB").save(
+        f, "JPEG"
+    )
+    return ImageFile(f, name="photo.jpg")
+
+
+class BenchSrcsetRenditions(Benchmark, TestCase):
+    """
+    Generates the renditions for a srcset of 6 widths of a 3000x2000 JPEG,
+    with the batched rendition pipeline.
+    """
+
+    repeat = 5
+
+    def setUp(self):
+        self.image = Image.objects.create(title="Photo", file=get_photo_file())
+        with self.image.open_file() as f:
+            self.source_bytes = f.read()
+
+    def bench(self):
+        renditions = self.image.generate_rendition_instances(
+            [Filter(spec) for spec in SRCSET_SPECS], self.source_bytes
+        )
+        self.assertEqual(len(renditions), 6)
+
+
+class BenchSrcsetRenditionsSeparately(BenchSrcsetRenditions):
+    """
+    Generates the same renditions one at a time, decoding and resizing the
+    original for each of them (as custom ``Filter`` implementations are).
+    """
+
+    def bench(self):
+        for spec in SRCSET_SPECS:
+            self.image.generate_rendition_instance(
+                Filter(spec), BytesIO(self.source_bytes)
+            )
@@ -604,7 +604,7 @@ class TestImageIndexView(WagtailTestUtils, TestCase):
                 )
                 with (
                     self.subTest(layout=layout, ordering=ordering),
-                    self.assertNumQueries(22),
+                    self.assertNumQueries(12),
                 ):
                     response = self.client.get(
                         reverse("wagtailimages:index"),
@@ -2246,7 +2246,7 @@ class TestImageChooserView(WagtailTestUtils, TestCase):
             VariousOnDeleteModel.objects.create(protected_image=image)
 
         response = self.get({"layout": "list"})
-        with self.assertNumQueries(16):
+        with self.assertNumQueries(11):
             response = self.get({"layout": "list"})
 
         self.assertEqual(response.status_code, 200)
@@ -1,11 +1,20 @@
+import json
+import multiprocessing
+import os
 import re
+import shutil
+import tempfile
 import warnings
 from io import StringIO
+from unittest import mock
 
 from django.core import management
-from django.test import TestCase, override_settings
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
 
 from ..management.commands.wagtail_update_image_renditions import progress_bar
+from ..warm_renditions import register_warm_renditions, unregister_warm_renditions
 from .utils import Image, get_test_image_file
 
 # note .utils.Image already does get_image_model()
@@ -138,3 +147,159 @@ class TestUpdateImageRenditions(TestCase):
         self.assertIn(
             f"Successfully processed {total_renditions} rendition(s)\n", output_string
         )
+
+
+class TestWarmImageRenditions(TestCase):
+    REAESC = re.compile(r"\x1b[^m]*m")
+
+    def setUp(self):
+        register_warm_renditions("width-{100,200}")
+        self.addCleanup(unregister_warm_renditions, "width-{100,200}")
+
+        self.images = [
+            Image.objects.create(
+                title=f"Test image {i}", file=get_test_image_file(colour="white")
+            )
+            for i in range(3)
+        ]
+
+    def run_command(self, **options):
+        output = StringIO()
+        management.call_command(
+            "wagtail_update_image_renditions", warm=True, stdout=output, **options
+        )
+        output.seek(0)
+
+        return self.REAESC.sub("", output.read())
+
+    def get_filter_specs(self, image):
+        return set(image.renditions.values_list("filter_spec", flat=True))
+
+    def test_warm(self):
+        # One image already has one of the renditions
+        self.images[0].get_rendition("width-100")
+
+        output = self.run_command(chunk_size=2)
+
+        self.assertIn("Warming renditions for 3 image(s)\n", output)
+        self.assertIn(
+            "Progress: [------------------------------------------------->] 100%\n",
+            output,
+        )
+        self.assertIn("Warmed renditions for 3 image(s)", output)
+        for image in self.images:
+            self.assertEqual(self.get_filter_specs(image), {"width-100", "width-200"})
+        self.assertEqual(Rendition.objects.count(), 6)
+
+    def test_resume_from_state_file(self):
+        state_file = os.path.join(tempfile.mkdtemp(), "state.json")
+        self.addCleanup(shutil.rmtree, os.path.dirname(state_file))
+        with open(state_file, "w") as f:
+            json.dump({"last_pk": self.images[0].pk}, f)
+
+        output = self.run_command(state_file=state_file)
+
+        self.assertIn(f"Resuming after image {self.images[0].pk}\n", output)
+        self.assertIn("Warming renditions for 2 image(s)\n", output)
+        self.assertEqual(self.get_filter_specs(self.images[0]), set())
+        self.assertEqual(
+            self.get_filter_specs(self.images[2]), {"width-100", "width-200"}
+        )
+        # The state file is removed once warming is complete
+        self.assertFalse(os.path.exists(state_file))
+
+    def test_state_file_records_progress(self):
+        state_file = os.path.join(tempfile.mkdtemp(), "state.json")
+        self.addCleanup(shutil.rmtree, os.path.dirname(state_file))
+
+        with mock.patch(
+            "wagtail.images.management.commands.wagtail_update_image_renditions.warm_renditions",
+            side_effect=[2, 2, KeyboardInterrupt],
+        ):
+            with self.assertRaises(KeyboardInterrupt):
+                self.run_command(state_file=state_file, chunk_size=1)
+
+        with open(state_file) as f:
+            self.assertEqual(json.load(f), {"last_pk": self.images[1].pk})
+
+    def test_failed_image(self):
+        with mock.patch(
+            "wagtail.images.management.commands.wagtail_update_image_renditions.warm_renditions",
+            side_effect=[2, ValueError, 2],
+        ):
+            stderr = StringIO()
+            output = self.run_command(stderr=stderr)
+
+        self.assertIn(
+            f"Failed to warm renditions for image {self.images[1].pk}",
+            stderr.getvalue(),
+        )
+        self.assertIn("Warmed renditions for 2 image(s)", output)
+
+    def test_nothing_registered(self):
+        unregister_warm_renditions("width-{100,200}")
+        self.addCleanup(register_warm_renditions, "width-{100,200}")
+
+        output = self.run_command()
+
+        self.assertEqual(output, "No warm renditions registered.\n")
+        self.assertEqual(Rendition.objects.count(), 0)
+
+    def test_invalid_options(self):
+        with self.assertRaisesMessage(
+            CommandError, "--purge-only cannot be used with --warm"
+        ):
+            self.run_command(purge_only=True)
+
+        with self.assertRaisesMessage(
+            CommandError, "--workers and --state-file require --warm"
+        ):
+            management.call_command("wagtail_update_image_renditions", workers=2)
+
+        with self.assertRaisesMessage(
+            CommandError, "--workers cannot be used with an in-memory database"
+        ):
+            self.run_command(workers=2)
+
+
+class TestWarmImageRenditionsWithWorkers(TransactionTestCase):
+    # The workers use their own database connections, so the images must be
+    # committed, in a database they can open
+    def setUp(self):
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.skipTest("Workers can't share an in-memory database")
+        if multiprocessing.current_process().daemon:
+            # Such as when running with --parallel
+            self.skipTest("daemonic processes can't start workers")
+        if multiprocessing.get_start_method() != "fork":
+            # Workers that aren't forked only know the renditions registered
+            # in wagtail_hooks.py, not those registered by this test
+            self.skipTest("Requires workers to be forked")
+
+        self.images = [
+            Image.objects.create(
+                title=f"Test image {i}", file=get_test_image_file(colour="white")
+            )
+            for i in range(5)
+        ]
+        # Registered after the images are saved, so that saving them doesn't
+        # warm the renditions
+        register_warm_renditions("width-{100,200}")
+        self.addCleanup(unregister_warm_renditions, "width-{100,200}")
+
+    def test_warm_with_workers(self):
+        output = StringIO()
+        management.call_command(
+            "wagtail_update_image_renditions",
+            warm=True,
+            workers=2,
+            chunk_size=2,
+            stdout=output,
+        )
+
+        self.assertIn("Warmed renditions for 5 image(s)", output.getvalue())
+        for image in self.images:
+            self.assertEqual(
+                set(image.renditions.values_list("filter_spec", flat=True)),
+                {"width-100", "width-200"},
+            )
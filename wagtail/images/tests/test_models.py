@@ -1,5 +1,7 @@
 import hashlib
+import multiprocessing
 import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from io import StringIO
 from unittest import mock
 
@@ -7,6 +9,7 @@ from django.conf import settings
 from django.contrib.auth.models import Group, Permission
 from django.core import checks, management
 from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
 from django.core.files import File
 from django.core.files.storage import Storage, default_storage, storages
 from django.core.files.uploadedfile import SimpleUploadedFile
@@ -16,6 +19,7 @@ from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_
 from django.urls import reverse
 from willow.image import Image as WillowImage
 
+from wagtail.images import rendition_pipeline
 from wagtail.images.exceptions import InvalidFilterSpecError
 from wagtail.images.models import (
     Filter,
@@ -26,6 +30,8 @@ from wagtail.images.models import (
     get_rendition_storage,
 )
 from wagtail.images.rect import Rect
+from wagtail.images.rendition_cache import rendition_cache
+from wagtail.images.rendition_pipeline import RenditionPipeline, get_rendition_executor
 from wagtail.models import Collection, GroupCollectionPermission, Page, ReferenceIndex
 from wagtail.search.backends import get_search_backend
 from wagtail.test.dummy_external_storage import (
@@ -1092,6 +1098,194 @@ class TestRenditions(TestCase):
         self.assertEqual(renditions["width-200"].url, filename2)
 
 
+class TestRenditionPipeline(TestCase):
+    SRCSET_SPECS = [f"width-{width}" for width in (160, 240, 320, 480, 640, 960)]
+
+    def setUp(self):
+        self.image = Image.objects.create(
+            title="Test image",
+            file=get_test_image_file(size=(1200, 900)),
+        )
+
+    def test_plan_resizes_from_larger_renditions(self):
+        pipeline = RenditionPipeline(self.image, b"")
+        plan = pipeline.plan([Filter(spec) for spec in self.SRCSET_SPECS], (1200, 900))
+
+        self.assertEqual(list(plan), [(0, 0, 1200, 900)])
+        self.assertEqual(
+            [
+                (size, [f.spec for f in filters], parent)
+                for size, filters, parent in plan[0, 0, 1200, 900]
+            ],
+            [
+                ((960, 720), ["width-960"], None),
+                ((640, 480), ["width-640"], None),
+                ((480, 360), ["width-480"], 0),
+                ((320, 240), ["width-320"], 1),
+                ((240, 180), ["width-240"], 2),
+                ((160, 120), ["width-160"], 3),
+            ],
+        )
+
+    def test_plan_groups_by_crop_and_size(self):
+        pipeline = RenditionPipeline(self.image, b"")
+        plan = pipeline.plan(
+            [
+                Filter("width-400"),
+                Filter("width-400|format-webp"),
+                Filter("fill-100x100"),
+            ],
+            (1200, 900),
+        )
+
+        self.assertEqual(list(plan), [(0, 0, 1200, 900), (150, 0, 1050, 900)])
+        ((size, filters, parent),) = plan[0, 0, 1200, 900]
+        self.assertEqual(size, (400, 300))
+        self.assertEqual(
+            [f.spec for f in filters], ["width-400", "width-400|format-webp"]
+        )
+
+    def test_get_renditions_decodes_original_once(self):
+        with mock.patch.object(
+            WillowImage, "open", wraps=WillowImage.open
+        ) as open_image:
+            renditions = self.image.get_renditions(*self.SRCSET_SPECS)
+
+        # Rendition files are also opened to read their dimensions
+        original_opens = [
+            call
+            for call in open_image.call_args_list
+            if call.args[0].name.startswith("original_images/")
+        ]
+        self.assertEqual(len(original_opens), 1)
+        for spec, width in zip(self.SRCSET_SPECS, (160, 240, 320, 480, 640, 960)):
+            rendition = renditions[spec]
+            self.assertEqual(
+                (rendition.width, rendition.height), (width, width * 3 // 4)
+            )
+            with rendition.get_willow_image() as willow_image:
+                self.assertEqual(willow_image.get_size(), (width, width * 3 // 4))
+
+    def test_get_renditions_output_formats(self):
+        renditions = self.image.get_renditions(
+            "width-400", "width-400|format-webp", "fill-100x100|format-jpeg"
+        )
+
+        self.assertTrue(renditions["width-400"].file.name.endswith(".png"))
+        self.assertTrue(renditions["width-400|format-webp"].file.name.endswith(".webp"))
+        self.assertTrue(
+            renditions["fill-100x100|format-jpeg"].file.name.endswith(".jpg")
+        )
+        self.assertEqual(
+            (
+                renditions["fill-100x100|format-jpeg"].width,
+                renditions["fill-100x100|format-jpeg"].height,
+            ),
+            (100, 100),
+        )
+
+    def test_get_renditions_with_exif_orientation(self):
+        with open("wagtail/images/tests/image_files/landscape_6.jpg", "rb") as f:
+            image = Image.objects.create(title="Test image", file=File(f))
+
+        renditions = image.get_renditions("width-400", "width-200")
+        self.assertEqual(
+            (renditions["width-400"].width, renditions["width-400"].height),
+            (400, 300),
+        )
+        self.assertEqual(
+            (renditions["width-200"].width, renditions["width-200"].height),
+            (200, 150),
+        )
+
+    def test_custom_filter_is_generated_separately(self):
+        class CustomFilter(Filter):
+            def run(self, image, output, source=None):
+                return super().run(image, output, source=source)
+
+        with mock.patch.object(
+            CustomFilter, "run", autospec=True, side_effect=CustomFilter.run
+        ) as run:
+            renditions = self.image.create_renditions(
+                CustomFilter("width-100"), Filter("width-200")
+            )
+
+        run.assert_called_once()
+        self.assertEqual(
+            sorted(rendition.width for rendition in renditions.values()), [100, 200]
+        )
+
+    def test_svg_is_generated_separately(self):
+        svg_image = Image.objects.create(
+            title="Test SVG image",
+            file=get_test_image_file_svg(),
+        )
+        with mock.patch.object(RenditionPipeline, "open") as open_image:
+            renditions = svg_image.get_renditions("width-50", "width-20")
+
+        open_image.assert_not_called()
+        self.assertEqual(renditions["width-50"].width, 50)
+        self.assertEqual(renditions["width-20"].width, 20)
+
+    def test_single_rendition_is_generated_on_current_thread(self):
+        # Rather than waiting for a worker of the shared pool
+        with mock.patch.object(
+            rendition_pipeline, "get_rendition_executor"
+        ) as get_executor, mock.patch(
+            "wagtail.images.models.get_rendition_executor"
+        ) as get_models_executor:
+            rendition = self.image.get_rendition("width-100")
+
+        get_executor.assert_not_called()
+        get_models_executor.assert_not_called()
+        self.assertEqual(rendition.width, 100)
+
+    @override_settings(WAGTAILIMAGES_RENDITION_EXECUTOR="process")
+    def test_process_executor(self):
+        if multiprocessing.current_process().daemon:
+            # Such as when running with --parallel, see the test below
+            self.skipTest("daemonic processes can't start rendition workers")
+
+        executor = get_rendition_executor()
+        self.addCleanup(rendition_pipeline._executors.clear)
+        self.addCleanup(executor.shutdown)
+        self.assertIsInstance(executor, ProcessPoolExecutor)
+
+        renditions = self.image.get_renditions("width-400", "width-100")
+        self.assertEqual(renditions["width-400"].width, 400)
+        with renditions["width-100"].get_willow_image() as willow_image:
+            self.assertEqual(willow_image.get_size(), (100, 75))
+
+    @override_settings(WAGTAILIMAGES_RENDITION_EXECUTOR="process")
+    def test_process_executor_in_daemonic_process(self):
+        # Start without any pools, which other tests may have created
+        executors_patcher = mock.patch.dict(rendition_pipeline._executors, clear=True)
+        executors_patcher.start()
+        self.addCleanup(executors_patcher.stop)
+        with mock.patch.object(
+            rendition_pipeline.multiprocessing, "current_process"
+        ) as current_process:
+            current_process.return_value.daemon = True
+            with self.assertLogs("wagtail.images", "WARNING"):
+                executor = get_rendition_executor()
+            self.addCleanup(executor.shutdown)
+            self.assertIsInstance(executor, ThreadPoolExecutor)
+
+            # The thread pool is shared, and the fallback only logged once
+            with self.assertNoLogs("wagtail.images", "WARNING"):
+                self.assertIs(get_rendition_executor(), executor)
+                self.assertIs(get_rendition_executor("thread"), executor)
+
+            renditions = self.image.get_renditions("width-400", "width-100")
+        self.assertEqual(renditions["width-400"].width, 400)
+        self.assertEqual(renditions["width-100"].width, 100)
+
+    @override_settings(WAGTAILIMAGES_RENDITION_EXECUTOR="fibers")
+    def test_unknown_executor(self):
+        with self.assertRaises(ImproperlyConfigured):
+            get_rendition_executor()
+
+
 @override_settings(
     CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
 )
@@ -1150,6 +1344,210 @@ class TestPrefetchRenditions(TestCase):
         self.assertListEqual(self.large_renditions, large_renditions)
 
 
+@override_settings(
+    CACHES={
+        "renditions": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        },
+    },
+    WAGTAILIMAGES_RENDITION_LOCAL_CACHE_SIZE=100,
+)
+class TestRenditionLookupCache(TestCase):
+    def setUp(self):
+        self.image = Image.objects.create(
+            title="Test image",
+            file=get_test_image_file(),
+        )
+        rendition_cache.clear()
+        rendition_cache.reset_stats()
+        self.addCleanup(rendition_cache.clear)
+        self.addCleanup(Rendition.cache_backend.clear)
+
+    def test_local_hit_skips_shared_cache(self):
+        rendition = self.image.get_rendition("width-100")
+        Rendition.cache_backend.clear()
+
+        image = Image.objects.get(pk=self.image.pk)
+        with self.assertNumQueries(0):
+            cached_rendition = image.get_rendition("width-100")
+
+        self.assertEqual(cached_rendition, rendition)
+        self.assertIsNot(cached_rendition, rendition)
+        self.assertIs(cached_rendition.image, image)
+        self.assertEqual(rendition_cache.get_stats()["local_hits"], 1)
+
+    def test_shared_hit_is_stored_locally(self):
+        rendition = self.image.get_rendition("width-100")
+        rendition_cache.clear()
+
+        self.image.get_rendition("width-100")
+        Rendition.cache_backend.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.image.get_rendition("width-100"), rendition)
+
+        stats = rendition_cache.get_stats()
+        self.assertEqual(stats["shared_hits"], 1)
+        self.assertEqual(stats["local_hits"], 1)
+
+    def test_negative_entries_skip_shared_cache(self):
+        filter = Filter("width-100")
+        self.assertEqual(self.image.find_existing_renditions(filter), {})
+
+        with mock.patch.object(Rendition.cache_backend, "get_many") as get_many:
+            self.assertEqual(self.image.find_existing_renditions(filter), {})
+        get_many.assert_not_called()
+        self.assertEqual(rendition_cache.get_stats()["misses"], 2)
+
+        # Generating the rendition replaces the negative entry
+        rendition = self.image.get_rendition(filter)
+        self.assertEqual(
+            self.image.find_existing_renditions(filter), {filter: rendition}
+        )
+
+    def test_purge_from_cache(self):
+        rendition = self.image.get_rendition("width-100")
+        self.assertEqual(rendition_cache.get_stats()["size"], 1)
+
+        rendition.purge_from_cache()
+
+        self.assertEqual(rendition_cache.get_stats()["size"], 0)
+        self.assertIsNone(Rendition.cache_backend.get(rendition.get_cache_key()))
+
+    def test_focal_point_change(self):
+        old_rendition = self.image.get_rendition("fill-100x100")
+        self.image.get_rendition("width-100")
+        other_image = Image.objects.create(
+            title="Other image",
+            file=get_test_image_file(),
+        )
+        other_image.get_rendition("width-100")
+
+        self.image.set_focal_point(Rect(10, 10, 20, 20))
+        self.image.save()
+
+        self.assertEqual(rendition_cache.get_stats()["size"], 1)
+        rendition = self.image.get_rendition("fill-100x100")
+        self.assertNotEqual(rendition.pk, old_rendition.pk)
+        self.assertNotEqual(rendition.focal_point_key, old_rendition.focal_point_key)
+
+    @override_settings(WAGTAILIMAGES_RENDITION_LOCAL_CACHE_SIZE=2)
+    def test_lru_eviction(self):
+        backend = mock.Mock()
+        backend.get_many.return_value = {}
+        rendition_cache.set_many(backend, {"a": "A", "b": "B"})
+        rendition_cache.get_many(backend, ["a"])
+        rendition_cache.set_many(backend, {"c": "C"})
+
+        self.assertEqual(
+            rendition_cache.get_many(backend, ["a", "c"]), {"a": "A", "c": "C"}
+        )
+        backend.get_many.assert_not_called()
+        rendition_cache.get_many(backend, ["b"])
+        backend.get_many.assert_called_once_with(["b"])
+
+    @override_settings(WAGTAILIMAGES_RENDITION_LOCAL_CACHE_TIMEOUT=10)
+    def test_timeout(self):
+        backend = mock.Mock()
+        backend.get_many.return_value = {}
+        with mock.patch(
+            "wagtail.images.rendition_cache.time.monotonic", return_value=100
+        ):
+            rendition_cache.set_many(backend, {"a": "A"})
+        with mock.patch(
+            "wagtail.images.rendition_cache.time.monotonic", return_value=109
+        ):
+            self.assertEqual(rendition_cache.get_many(backend, ["a"]), {"a": "A"})
+        with mock.patch(
+            "wagtail.images.rendition_cache.time.monotonic", return_value=110
+        ):
+            self.assertEqual(rendition_cache.get_many(backend, ["a"]), {})
+        backend.get_many.assert_called_once_with(["a"])
+
+    @override_settings(
+        CACHES={
+            "renditions": {
+                "BACKEND": "django.core.cache.backends.dummy.DummyCache",
+            },
+        },
+    )
+    def test_skipped_for_dummy_cache(self):
+        self.image.get_rendition("width-100")
+        self.assertEqual(rendition_cache.get_stats()["size"], 0)
+
+        # Every lookup goes to the database, so deleted renditions are never
+        # served from memory
+        self.image.renditions.all().delete()
+        image = Image.objects.get(pk=self.image.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(image.find_existing_renditions(Filter("width-100")), {})
+        self.assertEqual(rendition_cache.get_stats()["local_hits"], 0)
+
+    @override_settings(WAGTAILIMAGES_RENDITION_LOCAL_CACHE_SIZE=0)
+    def test_disabled(self):
+        self.image.get_rendition("width-100")
+        self.assertEqual(rendition_cache.get_stats()["size"], 0)
+
+        image = Image.objects.get(pk=self.image.pk)
+        with self.assertNumQueries(0):
+            image.get_rendition("width-100")
+        self.assertEqual(rendition_cache.get_stats()["shared_hits"], 1)
+
+    def test_get_stats(self):
+        self.image.get_renditions("width-100", "width-200")
+        rendition_cache.reset_stats()
+        rendition_cache.clear()
+
+        self.image.get_renditions("width-100", "width-200", "width-300")
+        self.image.get_rendition("width-100")
+
+        self.assertEqual(
+            rendition_cache.get_stats(),
+            {
+                "lookups": 4,
+                "local_hits": 1,
+                "shared_hits": 2,
+                "misses": 1,
+                "local_hit_ratio": 0.25,
+                "hit_ratio": 0.75,
+                "size": 3,
+            },
+        )
+
+    def test_prefetch_renditions_uses_cache(self):
+        other_image = Image.objects.create(
+            title="Other image",
+            file=get_test_image_file(),
+        )
+        images = [self.image, other_image]
+        renditions = [image.get_rendition("width-100") for image in images]
+        for image in images:
+            image.get_rendition("width-200")
+        Rendition.cache_backend.clear()
+
+        with self.assertNumQueries(1):
+            # Only the images are queried, as all of the renditions are cached
+            prefetched_images = list(
+                Image.objects.filter(pk__in=[image.pk for image in images])
+                .order_by("pk")
+                .prefetch_renditions("width-100", "width-200")
+            )
+            self.assertEqual(
+                [image.get_rendition("width-100") for image in prefetched_images],
+                renditions,
+            )
+
+        renditions[0].purge_from_cache()
+        with self.assertNumQueries(2):
+            # The renditions of the image missing from the cache are queried
+            prefetched_images = list(
+                Image.objects.filter(pk__in=[image.pk for image in images])
+                .order_by("pk")
+                .prefetch_renditions("width-100", "width-200")
+            )
+        self.assertEqual(len(prefetched_images[0].prefetched_renditions), 2)
+        self.assertEqual(len(prefetched_images[1].prefetched_renditions), 2)
+
+
 class TestUsageCount(TestCase):
     fixtures = ["test.json"]
 
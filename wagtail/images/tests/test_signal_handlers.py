@@ -2,7 +2,12 @@ from django.db import transaction
 from django.test import TestCase, TransactionTestCase, override_settings
 
 from wagtail.images import get_image_model, signal_handlers
+from wagtail.images.tasks import warm_image_renditions_task
 from wagtail.images.tests.utils import get_test_image_file
+from wagtail.images.warm_renditions import (
+    register_warm_renditions,
+    unregister_warm_renditions,
+)
 from wagtail.models import Collection
 
 from .utils import Image
@@ -97,3 +102,94 @@ class TestRawForPreSaveImageFeatureDetection(TestCase):
     def test_image_does_not_exist(self):
         bad_image = Image.objects.get(pk=1)
         self.assertFalse(bad_image.file.storage.exists(bad_image.file.name))
+
+
+class TestWarmRenditions(TestCase):
+    def setUp(self):
+        register_warm_renditions("width-{100,200}")
+        self.addCleanup(unregister_warm_renditions, "width-{100,200}")
+
+    def get_filter_specs(self, image):
+        return set(image.renditions.values_list("filter_spec", flat=True))
+
+    def test_renditions_generated_on_save(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            image = Image.objects.create(title="Test image", file=get_test_image_file())
+
+        self.assertEqual(self.get_filter_specs(image), {"width-100", "width-200"})
+
+    def test_renditions_not_generated_before_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            image = Image.objects.create(title="Test image", file=get_test_image_file())
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.get_filter_specs(image), set())
+
+    def test_unrelated_update_fields_do_not_warm(self):
+        image = Image.objects.create(title="Test image", file=get_test_image_file())
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            image.title = "New title"
+            image.save(update_fields=["title"])
+        self.assertEqual(callbacks, [])
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            image.focal_point_x = 10
+            image.save(update_fields=["focal_point_x"])
+        self.assertEqual(len(callbacks), 1)
+
+    def test_nothing_registered(self):
+        unregister_warm_renditions("width-{100,200}")
+        self.addCleanup(register_warm_renditions, "width-{100,200}")
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            Image.objects.create(title="Test image", file=get_test_image_file())
+        self.assertEqual(callbacks, [])
+
+    def test_collection_renditions(self):
+        root_collection = Collection.get_first_root_node()
+        evil_plans = root_collection.add_child(name="Evil plans")
+        secret_plans = evil_plans.add_child(name="Secret plans")
+        # Collection names aren't unique
+        other_plans = root_collection.add_child(name="Other plans")
+        other_secret_plans = other_plans.add_child(name="Secret plans")
+        register_warm_renditions("fill-50x50", collection=evil_plans)
+        self.addCleanup(unregister_warm_renditions, "fill-50x50", collection=evil_plans)
+        register_warm_renditions("fill-60x60", collection=secret_plans.pk)
+        self.addCleanup(
+            unregister_warm_renditions, "fill-60x60", collection=secret_plans.pk
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            root_image = Image.objects.create(
+                title="Test image", file=get_test_image_file()
+            )
+            secret_image = Image.objects.create(
+                title="Test image",
+                file=get_test_image_file(),
+                collection=secret_plans,
+            )
+            other_secret_image = Image.objects.create(
+                title="Test image",
+                file=get_test_image_file(),
+                collection=other_secret_plans,
+            )
+
+        self.assertEqual(self.get_filter_specs(root_image), {"width-100", "width-200"})
+        self.assertEqual(
+            self.get_filter_specs(secret_image),
+            {"width-100", "width-200", "fill-50x50", "fill-60x60"},
+        )
+        self.assertEqual(
+            self.get_filter_specs(other_secret_image), {"width-100", "width-200"}
+        )
+
+    def test_deleted_image(self):
+        image = Image.objects.create(title="Test image", file=get_test_image_file())
+        pk = image.pk
+        image.delete()
+
+        # Does not raise
+        warm_image_renditions_task.enqueue(
+            Image._meta.app_label, Image._meta.model_name, str(pk)
+        )
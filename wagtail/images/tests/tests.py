@@ -1,12 +1,14 @@
 import os
 import unittest
 from io import BytesIO
+from unittest import mock
 
 import willow
 from django import forms, template
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured, ValidationError
 from django.core.files.uploadedfile import InMemoryUploadedFile, TemporaryUploadedFile
+from django.db.models.fields.files import FieldFile
 from django.test import TestCase, override_settings
 from django.test.signals import setting_changed
 from django.urls import reverse
@@ -606,6 +608,91 @@ class TestFrontendServeView(TestCase):
         )
         self.assertEqual(response["Cache-Control"], "max-age=3600, public")
 
+    def get_serve_url(self, filter_spec="fill-800x600"):
+        signature = generate_signature(self.image.id, filter_spec)
+        return reverse(
+            "wagtailimages_serve", args=(signature, self.image.id, filter_spec)
+        )
+
+    def test_get_etag(self):
+        response = self.client.get(self.get_serve_url())
+
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertTrue(etag.startswith('"'))
+        self.assertIn("Last-Modified", response)
+
+        # The ETag is the same for the same rendition, and differs between renditions
+        self.assertEqual(self.client.get(self.get_serve_url())["ETag"], etag)
+        self.assertNotEqual(
+            self.client.get(self.get_serve_url("fill-400x300"))["ETag"], etag
+        )
+
+    def test_get_if_none_match(self):
+        etag = self.client.get(self.get_serve_url())["ETag"]
+
+        with mock.patch.object(
+            Image.get_rendition_model(), "get_willow_image", side_effect=AssertionError
+        ):
+            response = self.client.get(self.get_serve_url(), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response["Cache-Control"], "max-age=3600, public")
+
+        response = self.client.get(self.get_serve_url(), HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_get_does_not_decode_rendition(self):
+        self.image.get_rendition("fill-800x600")
+
+        with mock.patch.object(
+            Image.get_rendition_model(), "get_willow_image", side_effect=AssertionError
+        ):
+            response = self.client.get(self.get_serve_url())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/png")
+
+    def test_get_with_format_conversion(self):
+        response = self.client.get(self.get_serve_url("fill-800x600|format-webp"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/webp")
+
+    def test_get_range(self):
+        response = self.client.get(self.get_serve_url(), HTTP_RANGE="bytes=0-9")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Length"], "10")
+        self.assertEqual(len(b"".join(response.streaming_content)), 10)
+
+    @override_settings(SENDFILE_BACKEND="sendfile.backends.development")
+    def test_get_ignores_sendfile_backend(self):
+        with mock.patch("wagtail.utils.sendfile._get_sendfile") as get_sendfile:
+            response = self.client.get(self.get_serve_url())
+
+        get_sendfile.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertNotIn("attachment", response.get("Content-Disposition", ""))
+
+    def test_get_from_remote_storage(self):
+        with mock.patch.object(
+            FieldFile,
+            "path",
+            new_callable=mock.PropertyMock,
+            side_effect=NotImplementedError,
+        ):
+            response = self.client.get(self.get_serve_url())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertIn("ETag", response)
+        self.assertNotIn("Last-Modified", response)
+        image = willow.Image.open(b"".join(response.streaming_content))
+        self.assertIsInstance(image, PNGImageFile)
+
 
 class TestFrontendSendfileView(TestCase):
     def setUp(self):
@@ -1,15 +1,20 @@
+from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured, PermissionDenied
 from django.http import FileResponse, HttpResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
+from django.utils.cache import get_conditional_response
 from django.utils.decorators import classonlymethod, method_decorator
+from django.utils.http import quote_etag
 from django.views.decorators.cache import cache_control
 from django.views.generic import View
 
+from wagtail.coreutils import safe_md5
 from wagtail.images import get_image_model
 from wagtail.images.exceptions import InvalidFilterSpecError
 from wagtail.images.models import SourceImageIOError
 from wagtail.images.utils import generate_signature, verify_signature
+from wagtail.utils import sendfile_streaming_backend
 from wagtail.utils.sendfile import sendfile
 
 
@@ -60,13 +65,34 @@ class ServeView(View):
 
         return getattr(self, self.action)(rendition)
 
+    def get_etag(self, rendition):
+        """
+        Return a strong ETag for the rendition. A rendition's file never
+        changes once generated, so this identifies it without reading it.
+        """
+        return quote_etag(
+            safe_md5(
+                ":".join(
+                    [
+                        str(rendition.pk),
+                        rendition.filter_spec,
+                        rendition.focal_point_key,
+                        rendition.file.name,
+                        getattr(rendition.image, "file_hash", ""),
+                    ]
+                ).encode(),
+                usedforsecurity=False,
+            ).hexdigest()
+        )
+
     def serve(self, rendition):
-        with rendition.get_willow_image() as willow_image:
-            mime_type = willow_image.mime_type
+        etag = self.get_etag(rendition)
 
-        # Serve the file
-        rendition.file.open("rb")
-        response = FileResponse(rendition.file, content_type=mime_type)
+        # Answer If-None-Match (and If-Match) before opening the file
+        response = get_conditional_response(self.request, etag=etag)
+        if response is None:
+            response = self.serve_file(rendition, etag)
+        response["ETag"] = etag
 
         # Add a CSP header to prevent inline execution
         response["Content-Security-Policy"] = "default-src 'none'"
@@ -76,6 +102,27 @@ class ServeView(View):
 
         return response
 
+    def serve_file(self, rendition, etag):
+        try:
+            local_path = rendition.file.path
+        except NotImplementedError:
+            local_path = None
+
+        if local_path:
+            # Use the streaming backend to serve the file; this provides
+            # support for if-modified-since and range requests. SENDFILE_BACKEND
+            # only applies to SendFileView
+            response = sendfile_streaming_backend.sendfile(
+                self.request, local_path, mimetype=rendition.mime_type, etag=etag
+            )
+            if response.status_code == 200:
+                response["Content-Type"] = rendition.mime_type
+            return response
+
+        # Serve the file
+        rendition.file.open("rb")
+        return FileResponse(rendition.file, content_type=rendition.mime_type)
+
     def redirect(self, rendition):
         # Redirect to the file's public location
         return redirect(rendition.url)
@@ -87,13 +134,16 @@ serve = ServeView.as_view()
 class SendFileView(ServeView):
     backend = None
 
-    def serve(self, rendition):
-        response = sendfile(self.request, rendition.file.path, backend=self.backend)
-
-        # Add a CSP header to prevent inline execution
-        response["Content-Security-Policy"] = "default-src 'none'"
-
-        # Prevent browsers from auto-detecting the content-type of a document
-        response["X-Content-Type-Options"] = "nosniff"
-
-        return response
+    def serve_file(self, rendition, etag):
+        backend = self.backend
+        if backend is None and not hasattr(settings, "SENDFILE_BACKEND"):
+            # Fallback to streaming backend if user hasn't specified SENDFILE_BACKEND
+            backend = sendfile_streaming_backend.sendfile
+
+        return sendfile(
+            self.request,
+            rendition.file.path,
+            mimetype=rendition.mime_type,
+            backend=backend,
+            etag=etag,
+        )
@@ -0,0 +1,97 @@
+import logging
+
+from wagtail import hooks
+from wagtail.images.models import Filter, SourceImageIOError
+
+logger = logging.getLogger("wagtail.images")
+
+# Filter specs to generate for every image
+SITE_WIDE_SPECS = []
+# Filter specs to generate for the images in a collection (or its
+# descendants), keyed by the collection's primary key
+COLLECTION_SPECS = {}
+
+
+def _get_collection_pk(collection):
+    # Collection names aren't unique, so collections are identified by pk
+    return getattr(collection, "pk", collection)
+
+
+def register_warm_renditions(*specs, collection=None):
+    """
+    Register filter specs whose renditions are generated in the background
+    as soon as an image is saved, rather than on the first request that uses
+    them. Specs may use brace expansion, such as ``"width-{320,640,960}"``.
+
+    If ``collection`` (a ``Collection`` or its primary key) is given, the
+    specs only apply to images in that collection or any collection below it.
+    """
+    registered = (
+        SITE_WIDE_SPECS
+        if collection is None
+        else COLLECTION_SPECS.setdefault(_get_collection_pk(collection), [])
+    )
+    for spec in specs:
+        for expanded_spec in Filter.expand_spec(spec):
+            if expanded_spec not in registered:
+                registered.append(expanded_spec)
+
+
+def unregister_warm_renditions(*specs, collection=None):
+    registered = (
+        SITE_WIDE_SPECS
+        if collection is None
+        else COLLECTION_SPECS.get(_get_collection_pk(collection), [])
+    )
+    for spec in specs:
+        for expanded_spec in Filter.expand_spec(spec):
+            try:
+                registered.remove(expanded_spec)
+            except ValueError as e:
+                raise KeyError(
+                    "Warm rendition '%s' is not registered" % expanded_spec
+                ) from e
+
+
+def has_warm_renditions():
+    # Registrations are usually made in wagtail_hooks.py
+    hooks.search_for_hooks()
+    return bool(SITE_WIDE_SPECS) or any(COLLECTION_SPECS.values())
+
+
+def get_warm_filter_specs(image):
+    """
+    Return the filter specs registered for the given image.
+    """
+    if not has_warm_renditions():
+        return []
+
+    specs = list(SITE_WIDE_SPECS)
+    if any(COLLECTION_SPECS.values()) and image.collection_id:
+        for pk in image.collection.get_ancestors(inclusive=True).values_list(
+            "pk", flat=True
+        ):
+            specs.extend(
+                spec for spec in COLLECTION_SPECS.get(pk, []) if spec not in specs
+            )
+    return specs
+
+
+def warm_renditions(image):
+    """
+    Generate any missing renditions for the filter specs registered for the
+    given image. Returns the number of filter specs that were warmed.
+    """
+    specs = get_warm_filter_specs(image)
+    if not specs:
+        return 0
+
+    try:
+        image.get_renditions(*specs)
+    except SourceImageIOError:
+        logger.warning(
+            "Could not warm renditions for image %d: the original file is missing",
+            image.pk,
+        )
+        return 0
+    return len(specs)
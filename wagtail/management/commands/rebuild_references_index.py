@@ -1,13 +1,51 @@
+import functools
+import os
+import time
+
 from django.apps import apps
-from django.core.management.base import BaseCommand
-from django.db import transaction
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from modelcluster.models import ClusterableModel, get_all_child_relations
 
 from wagtail.models import ReferenceIndex
 from wagtail.signal_handlers import disable_reference_index_auto_update
+from wagtail.utils.parallel import (
+    in_order,
+    load_state,
+    pk_chunks,
+    save_state,
+    worker_pool,
+)
 
 DEFAULT_CHUNK_SIZE = 1000
 
 
+def get_bulk_queryset(model):
+    queryset = model.objects.all()
+    if issubclass(model, ClusterableModel):
+        # Fetch the first level of child relations in one query per relation
+        # rather than one per object
+        queryset = queryset.prefetch_related(
+            *[
+                child_relation.get_accessor_name()
+                for child_relation in get_all_child_relations(model)
+            ]
+        )
+    return queryset
+
+
+def extract_reference_rows(model_label, pks):
+    """
+    Return the reference rows for the objects of the given model with the
+    given primary keys. Runs in the worker processes of a bulk rebuild.
+    """
+    model = apps.get_model(model_label)
+    rows = []
+    for instance in get_bulk_queryset(model).filter(pk__in=pks):
+        rows.extend(ReferenceIndex.get_reference_rows_for_object(instance))
+    return rows
+
+
 class Command(BaseCommand):
     def write(self, *args, **kwargs):
         """
@@ -27,10 +65,44 @@ class Command(BaseCommand):
             type=int,
             help="Set number of records to be fetched at once for inserting into the index",
         )
+        parser.add_argument(
+            "--bulk",
+            action="store_true",
+            dest="bulk",
+            default=False,
+            help=(
+                "Insert the references of each chunk in bulk and commit after every chunk, "
+                "instead of updating each object in a single transaction"
+            ),
+        )
+        parser.add_argument(
+            "--workers",
+            action="store",
+            dest="workers",
+            default=1,
+            type=int,
+            help="Number of processes used to extract references in bulk mode",
+        )
+        parser.add_argument(
+            "--state_file",
+            action="store",
+            dest="state_file",
+            default=None,
+            help=(
+                "In bulk mode, record progress in this file after every chunk. If the "
+                "file exists, the rebuild resumes from it instead of starting over"
+            ),
+        )
 
     def handle(self, **options):
         self.verbosity = options["verbosity"]
 
+        if options["bulk"]:
+            return self.handle_bulk(**options)
+
+        if options["workers"] != 1 or options["state_file"]:
+            raise CommandError("--workers and --state_file require --bulk")
+
         chunk_size = options.get("chunk_size")
         object_count = 0
 
@@ -62,6 +134,117 @@ class Command(BaseCommand):
         self.write("Indexed %d objects" % object_count)
         self.print_newline()
 
+    def handle_bulk(self, **options):
+        chunk_size = options["chunk_size"]
+        workers = options["workers"]
+        state_file = options["state_file"]
+
+        if workers < 1:
+            raise CommandError("--workers must be at least 1")
+        if (
+            workers > 1
+            and connection.vendor == "sqlite"
+            and connection.is_in_memory_db()
+        ):
+            raise CommandError("--workers cannot be used with an in-memory database")
+
+        state = load_state(state_file)
+        if state is None:
+            self.write("Rebuilding reference index")
+            with transaction.atomic(), disable_reference_index_auto_update():
+                # Use `_raw_delete` to avoid loading instances into memory
+                all_references = ReferenceIndex.objects.all()
+                all_references._raw_delete(using=all_references.db)
+            state = {"completed": [], "model": None, "last_pk": None}
+            save_state(state_file, state)
+        else:
+            self.write("Resuming reference index rebuild")
+
+        start_time = time.monotonic()
+        object_count = 0
+        with worker_pool(workers) as executor:
+            for model in apps.get_models():
+                model_label = model._meta.label
+                if (
+                    not ReferenceIndex.is_indexed(model)
+                    or model_label in state["completed"]
+                ):
+                    continue
+
+                self.write(model_label)
+                model_start_time = time.monotonic()
+                model_object_count = self.rebuild_model_bulk(
+                    model, chunk_size, executor, workers, state, state_file
+                )
+                object_count += model_object_count
+                self.print_newline()
+                self.write(
+                    "%d objects%s"
+                    % (
+                        model_object_count,
+                        self.format_rate(model_object_count, model_start_time),
+                    )
+                )
+
+                state["completed"].append(model_label)
+                state["model"] = state["last_pk"] = None
+                save_state(state_file, state)
+
+        self.write(
+            "Indexed %d objects%s"
+            % (object_count, self.format_rate(object_count, start_time))
+        )
+
+        if state_file:
+            os.remove(state_file)
+
+    def rebuild_model_bulk(
+        self, model, chunk_size, executor, workers, state, state_file
+    ):
+        model_label = model._meta.label
+        last_pk = state["last_pk"] if state["model"] == model_label else None
+
+        # With multi-table inheritance, the same object is indexed once for
+        # each indexed model in the hierarchy, so references to fields they
+        # have in common may already be recorded. The first chunk after
+        # resuming may also have been inserted before the rebuild stopped
+        shares_objects = any(
+            ReferenceIndex.is_indexed(parent)
+            for parent in model._meta.get_parent_list()
+        ) or any(
+            model in indexed_model._meta.get_parent_list()
+            for indexed_model in ReferenceIndex.indexed_models
+        )
+        resumed = last_pk is not None
+
+        # Extract references for a few chunks ahead, but insert them in order
+        # so that the recorded progress is always accurate
+        object_count = 0
+        for pks, rows in in_order(
+            functools.partial(extract_reference_rows, model_label),
+            self.print_iter_progress(
+                pk_chunks(model.objects.all(), chunk_size, last_pk)
+            ),
+            executor,
+            lookahead=workers,
+        ):
+            with transaction.atomic():
+                ReferenceIndex.bulk_create_from_rows(
+                    rows, skip_existing=shares_objects or resumed
+                )
+            resumed = False
+            state["model"] = model_label
+            state["last_pk"] = pks[-1]
+            save_state(state_file, state)
+            object_count += len(pks)
+
+        return object_count
+
+    def format_rate(self, object_count, start_time):
+        elapsed = time.monotonic() - start_time
+        rate = object_count / elapsed if elapsed else 0
+        return f" in {elapsed:.1f}s ({rate:.1f} objects/s)"
+
     def print_newline(self):
         self.write("")
 
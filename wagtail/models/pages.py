@@ -61,7 +61,7 @@ from wagtail.signals import (
     page_slug_changed,
     pre_validate_delete,
 )
-from wagtail.url_routing import RouteResult
+from wagtail.url_routing import RouteResult, page_route_cache
 from wagtail.utils.timestamps import ensure_utc
 
 from .audit_log import BaseLogEntry, BaseLogEntryManager, LogEntryQuerySet
@@ -507,7 +507,7 @@ class Page(AbstractPage, index.Indexed, ClusterableModel, metaclass=PageBase):
                         component for component in path.split("/") if component
                     ]
                     request._wagtail_route_for_request = (
-                        site.root_page.localized.specific.route(
+                        site.root_page.localized.specific._route_by_url_path(
                             request, path_components
                         )
                     )
@@ -780,11 +780,13 @@ class Page(AbstractPage, index.Indexed, ClusterableModel, metaclass=PageBase):
                 )
             )
 
-        # Check if this is a root page of any sites and clear the 'wagtail_site_root_paths' key if so
+        # Check if this is a root page of any sites and clear the 'wagtail_site_root_paths' key
+        # and the site lookup (which holds the root pages) if so
         # Note: New translations of existing site roots are considered site roots as well, so we must
         # always check if this page is a site root, even if it's new.
         if self.is_site_root():
             Site.clear_site_root_paths_cache()
+            Site.clear_site_lookup_cache()
 
         # Log
         if is_new:
@@ -929,6 +931,92 @@ class Page(AbstractPage, index.Indexed, ClusterableModel, metaclass=PageBase):
             else:
                 raise Http404
 
+    def _route_by_url_path(self, request, path_components):
+        """
+        Equivalent to ``self.route(request, path_components)``, but rather than
+        walking the tree one level (and two queries) at a time, find every page
+        along the path in a single query on ``url_path``. Routing is handed over
+        to the ``route()`` method of the first page on the path whose class
+        overrides it (such as ``RoutablePageMixin``), or of the last page.
+
+        The page that handles each path is remembered in ``page_route_cache``,
+        so that subsequent requests only need to fetch that page.
+        """
+        if not path_components or type(self).route is not Page.route:
+            return self.route(request, path_components)
+
+        cache_key = (self.pk, tuple(path_components))
+        cached = page_route_cache.get(cache_key)
+        if cached is not None:
+            page_id, content_type_id, consumed = cached
+            model = ContentType.objects.get_for_id(content_type_id).model_class()
+            if model is not None:
+                # Make sure the page is still at this path (it may have been
+                # moved or renamed by another process)
+                page = model._default_manager.filter(
+                    pk=page_id,
+                    content_type_id=content_type_id,
+                    path__startswith=self.path,
+                    url_path=self._get_url_path_for(path_components[:consumed]),
+                ).first()
+                if page is not None:
+                    # Cache the parent page as the uncached lookup does, so
+                    # that hits and misses behave the same from here on
+                    if consumed == 1:
+                        page._cached_parent_obj = self
+                    else:
+                        page.get_parent()
+                    return page.route(request, path_components[consumed:])
+            page_route_cache.delete(cache_key)
+
+        url_paths = [
+            self._get_url_path_for(path_components[:index])
+            for index in range(1, len(path_components) + 1)
+        ]
+        # url_path isn't indexed (it's a TextField, which MySQL can't index
+        # without a prefix length), so this relies on the index on path to
+        # narrow the query down to the pages below this one
+        candidates = {}
+        for page in Page.objects.filter(
+            url_path__in=url_paths, path__startswith=self.path
+        ).order_by("path"):
+            candidates.setdefault(page.url_path, []).append(page)
+
+        parent = self
+        for consumed, url_path in enumerate(url_paths, 1):
+            page = next(
+                (
+                    page
+                    for page in candidates.get(url_path, [])
+                    if page.depth == parent.depth + 1
+                    and page.path.startswith(parent.path)
+                ),
+                None,
+            )
+            if page is None:
+                raise Http404
+
+            # Cache the parent page on the subpage to avoid another db query
+            page._cached_parent_obj = parent
+            specific_class = page.specific_class
+            if specific_class is not None and specific_class.route is not Page.route:
+                break
+            parent = page
+
+        page_route_cache.set(cache_key, (page.pk, page.content_type_id, consumed))
+        return page.specific.route(request, path_components[consumed:])
+
+    def _get_url_path_for(self, path_components):
+        return self.url_path + "".join(component + "/" for component in path_components)
+
+    @staticmethod
+    def clear_route_cache():
+        """
+        Forget the pages that handle each URL path, after a change to the page
+        tree (publishing, unpublishing, moving or deleting pages).
+        """
+        page_route_cache.clear()
+
     def get_admin_display_title(self):
         """
         Return the title for this page as it should appear in the admin backend;
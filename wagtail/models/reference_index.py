@@ -549,6 +549,114 @@ class ReferenceIndex(models.Model):
         # Perform the deletion
         cls.objects.filter(id__in=deleted_reference_ids).delete()
 
+    @classmethod
+    def get_reference_rows_for_object(cls, object):
+        """
+        Extracts the outbound references of the given object as plain tuples,
+        suitable for passing between processes and to ``bulk_create_from_rows``.
+
+        Args:
+            object (Model): The model instance to extract references from
+
+        Returns:
+            A list of tuples (content_type_id, base_content_type_id, object_id,
+            to_content_type_id, to_object_id, model_path, content_path)
+        """
+        content_types = [
+            ContentType.objects.get_for_model(model_or_object, for_concrete_model=False)
+            for model_or_object in ([object] + object._meta.get_parent_list())
+        ]
+        content_type_id = content_types[0].id
+        base_content_type_id = content_types[-1].id
+        object_id = str(object.pk)
+
+        return [
+            (
+                content_type_id,
+                base_content_type_id,
+                object_id,
+                to_content_type_id,
+                to_object_id,
+                model_path,
+                content_path,
+            )
+            for to_content_type_id, to_object_id, model_path, content_path in set(
+                cls._extract_references_from_object(object)
+            )
+        ]
+
+    @classmethod
+    def bulk_create_from_rows(cls, rows, skip_existing=False):
+        """
+        Inserts ReferenceIndex records for rows returned by
+        ``get_reference_rows_for_object``.
+
+        Unlike ``create_or_update_for_object``, this does not look up or delete
+        the existing records of each object, so it is intended for populating an
+        index that has just been cleared.
+
+        Args:
+            rows (list[tuple]): The reference rows to insert
+            skip_existing (bool): Whether some of the rows may already be in the
+                index (for example, recorded against a parent model), in which
+                case they are not inserted again
+
+        Returns:
+            The number of rows passed for insertion
+        """
+        if not rows:
+            return 0
+
+        records = [
+            cls(
+                content_type_id=content_type_id,
+                base_content_type_id=base_content_type_id,
+                object_id=object_id,
+                to_content_type_id=to_content_type_id,
+                to_object_id=to_object_id,
+                model_path=model_path,
+                content_path=content_path,
+                content_path_hash=cls._get_content_path_hash(content_path),
+            )
+            for content_type_id, base_content_type_id, object_id, to_content_type_id, to_object_id, model_path, content_path in rows
+        ]
+
+        bulk_create_kwargs = {}
+        if skip_existing:
+            if connection.features.supports_ignore_conflicts:
+                bulk_create_kwargs["ignore_conflicts"] = True
+            else:
+                # Look up the existing records for all of the objects at once
+                existing = set(
+                    cls.objects.filter(
+                        base_content_type_id__in={
+                            record.base_content_type_id for record in records
+                        },
+                        object_id__in={record.object_id for record in records},
+                    ).values_list(
+                        "base_content_type_id",
+                        "object_id",
+                        "to_content_type_id",
+                        "to_object_id",
+                        "content_path_hash",
+                    )
+                )
+                records = [
+                    record
+                    for record in records
+                    if (
+                        record.base_content_type_id,
+                        record.object_id,
+                        record.to_content_type_id,
+                        record.to_object_id,
+                        record.content_path_hash,
+                    )
+                    not in existing
+                ]
+
+        cls.objects.bulk_create(records, **bulk_create_kwargs)
+        return len(rows)
+
     @classmethod
     def remove_for_object(cls, object):
         """
@@ -1,11 +1,13 @@
-from collections import namedtuple
+import copy
+import uuid
+from collections import defaultdict, namedtuple
 
 from django.apps import apps
 from django.conf import settings
 from django.contrib.auth.models import Group, Permission
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
 from django.db.models import Case, IntegerField, Q, When
 from django.db.models.functions import Lower
 from django.http.request import split_domain_port
@@ -17,8 +19,11 @@ MATCH_DEFAULT = 2
 MATCH_HOSTNAME = 3
 
 
-def get_site_for_hostname(hostname, port):
-    """Return the wagtailcore.Site object for the given hostname and port."""
+def query_site_for_hostname(hostname, port):
+    """
+    Return the wagtailcore.Site object for the given hostname and port,
+    querying the database.
+    """
     Site = apps.get_model("wagtailcore.Site")
 
     sites = list(
@@ -62,6 +67,103 @@ def get_site_for_hostname(hostname, port):
     raise Site.DoesNotExist()
 
 
+SITE_LOOKUP_GENERATION_CACHE_KEY = "wagtail_site_lookup_generation"
+
+# The SiteLookup for the current generation, shared by all threads of this process
+_site_lookup = None
+
+
+class SiteLookup:
+    """
+    An in-memory table of all sites (with their root pages), used to find the
+    site for a hostname and port without querying the database.
+
+    Each process keeps one table, tagged with the generation it was built for.
+    The current generation is held in the default cache, and is discarded
+    whenever a site or a site's root page is saved or deleted, so every process
+    rebuilds its table on its next lookup.
+    """
+
+    def __init__(self, generation, sites):
+        self.generation = generation
+        self.sites_by_hostname_port = {}
+        self.sites_by_hostname = defaultdict(list)
+        self.default_site = None
+
+        for site in sites:
+            self.sites_by_hostname_port[site.hostname, site.port] = site
+            self.sites_by_hostname[site.hostname].append(site)
+            if site.is_default_site:
+                self.default_site = site
+
+    @classmethod
+    def get(cls):
+        """
+        Return the table for the current generation, building it if this
+        process doesn't have it yet.
+        """
+        global _site_lookup
+
+        generation = cache.get(SITE_LOOKUP_GENERATION_CACHE_KEY)
+        site_lookup = _site_lookup
+        if (
+            generation is None
+            or site_lookup is None
+            or site_lookup.generation != generation
+        ):
+            if generation is None:
+                generation = uuid.uuid4().hex
+                cache.set(SITE_LOOKUP_GENERATION_CACHE_KEY, generation, 3600)
+
+            Site = apps.get_model("wagtailcore.Site")
+            site_lookup = _site_lookup = cls(
+                generation, Site.objects.select_related("root_page")
+            )
+        return site_lookup
+
+    def find(self, hostname, port):
+        """
+        Return the site for the given hostname and port, or ``None``, using
+        the same rules as ``query_site_for_hostname()``.
+        """
+        try:
+            site = self.sites_by_hostname_port.get((hostname, int(port)))
+        except (TypeError, ValueError):
+            site = None
+
+        if site is None:
+            sites = self.sites_by_hostname.get(hostname, [])
+            if len(sites) == 1:
+                site = sites[0]
+            else:
+                site = next(
+                    (site for site in sites if site.is_default_site),
+                    self.default_site,
+                )
+
+        if site is None:
+            return None
+
+        # Sites and their root pages are shared by all requests in the process,
+        # so return copies that can be modified (or cache things like
+        # `root_page.specific`) safely
+        site_copy = copy.copy(site)
+        site_copy.root_page = copy.copy(site.root_page)
+        return site_copy
+
+
+def get_site_for_hostname(hostname, port):
+    """Return the wagtailcore.Site object for the given hostname and port."""
+    if not getattr(settings, "WAGTAIL_SITE_LOOKUP_CACHE", False):
+        return query_site_for_hostname(hostname, port)
+
+    site = SiteLookup.get().find(hostname, port)
+    if site is None:
+        Site = apps.get_model("wagtailcore.Site")
+        raise Site.DoesNotExist()
+    return site
+
+
 class SiteManager(models.Manager):
     def get_queryset(self):
         return super().get_queryset().order_by(Lower("hostname"))
@@ -270,6 +372,17 @@ class Site(models.Model):
     def clear_site_root_paths_cache():
         cache.delete(SITE_ROOT_PATHS_CACHE_KEY, version=SITE_ROOT_PATHS_CACHE_VERSION)
 
+    @staticmethod
+    def clear_site_lookup_cache():
+        """
+        Make every process rebuild its in-memory table of sites on its next
+        lookup. This is repeated once the current transaction is committed,
+        as other processes may rebuild their tables from the uncommitted data
+        in the meantime.
+        """
+        cache.delete(SITE_LOOKUP_GENERATION_CACHE_KEY)
+        transaction.on_commit(lambda: cache.delete(SITE_LOOKUP_GENERATION_CACHE_KEY))
+
 
 class GroupSitePermissionManager(models.Manager):
     def get_by_natural_key(self, group, site, permission):
@@ -1,9 +1,29 @@
+import hashlib
+import uuid
+
+from django.conf import settings
 from django.contrib.auth import get_permission_codename, get_user_model
+from django.core.cache import caches
+from django.db import transaction
 from django.db.models import Q
 
 from wagtail.models import GroupPagePermission, Page
 from wagtail.permission_policies.base import OwnershipPermissionPolicy
 
+PERMISSION_CACHE_VERSION_KEY = "wagtail-page-permissions-version"
+
+
+def get_page_permission_cache():
+    """
+    Return the cache that page permissions are shared between requests in, as
+    set by the ``WAGTAIL_PAGE_PERMISSION_CACHE`` setting, or ``None`` if
+    permissions are only cached for the duration of a request.
+    """
+    alias = getattr(settings, "WAGTAIL_PAGE_PERMISSION_CACHE", None)
+    if alias is None:
+        return None
+    return caches[alias]
+
 
 class PagePermissionPolicy(OwnershipPermissionPolicy):
     permission_cache_name = "_page_permission_cache"
@@ -19,6 +39,81 @@ class PagePermissionPolicy(OwnershipPermissionPolicy):
             "page", "permission"
         )
 
+    def get_cached_permissions_for_user(self, user):
+        if hasattr(user, self.permission_cache_name):
+            return getattr(user, self.permission_cache_name)
+
+        perms = None
+        cache = get_page_permission_cache()
+        if (
+            cache is not None
+            and user.is_active
+            and not user.is_anonymous
+            and not user.is_superuser
+        ):
+            perms = self._get_shared_permissions_for_user(user, cache)
+        if perms is None:
+            perms = self.get_all_permissions_for_user(user)
+
+        setattr(user, self.permission_cache_name, perms)
+        return perms
+
+    def _get_shared_permissions_for_user(self, user, cache):
+        """
+        Return the page permissions of the user's groups from ``cache``, where
+        they are shared by all users in the same groups. Both the user's groups
+        and the permissions of each set of groups are stored under the current
+        version, which is replaced whenever either of them may have changed.
+        Returns ``None`` if the permissions can't be cached.
+        """
+        user_key = f"wagtail-page-permissions-user-{user.pk}"
+        cached = cache.get_many([PERMISSION_CACHE_VERSION_KEY, user_key])
+        version = cached.get(PERMISSION_CACHE_VERSION_KEY)
+        if version is None:
+            version = uuid.uuid4().hex
+            # If another process has just replaced the version (because
+            # permissions have changed), nothing can be stored under it
+            if not cache.add(PERMISSION_CACHE_VERSION_KEY, version, None):
+                return None
+
+        user_entry = cached.get(user_key)
+        if user_entry is not None and user_entry[0] == version:
+            group_ids = user_entry[1]
+        else:
+            group_ids = sorted(user.groups.values_list("pk", flat=True))
+            cache.set(user_key, (version, group_ids))
+
+        if not group_ids:
+            return []
+
+        groups_key = "wagtail-page-permissions-{}-{}".format(
+            version,
+            hashlib.sha1(",".join(map(str, group_ids)).encode()).hexdigest(),
+        )
+        perms = cache.get(groups_key)
+        if perms is None:
+            perms = list(
+                GroupPagePermission.objects.filter(group__in=group_ids).select_related(
+                    "page", "permission"
+                )
+            )
+            cache.set(groups_key, perms)
+        return perms
+
+    @staticmethod
+    def clear_permission_cache():
+        """
+        Discard the page permissions shared between requests, if enabled. This
+        is repeated once the current transaction is committed, in case the
+        permissions are cached from the uncommitted data in the meantime.
+        """
+        cache = get_page_permission_cache()
+        if cache is None:
+            return
+
+        cache.delete(PERMISSION_CACHE_VERSION_KEY)
+        transaction.on_commit(lambda: cache.delete(PERMISSION_CACHE_VERSION_KEY))
+
     def _base_user_has_permission(self, user):
         if not user.is_active:
             return False
@@ -318,6 +318,25 @@ class SpecificQuerySetMixin:
 
 
 class PageQuerySet(SearchableQuerySetMixin, SpecificQuerySetMixin, TreeQuerySet):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # set by prefetch_stream_blocks(); an empty tuple means all StreamFields
+        self._prefetch_stream_block_fields = None
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._prefetch_stream_block_fields = self._prefetch_stream_block_fields
+        return clone
+
+    def _fetch_all(self):
+        prefetch_stream_blocks = (
+            self._result_cache is None
+            and self._prefetch_stream_block_fields is not None
+        )
+        super()._fetch_all()
+        if prefetch_stream_blocks:
+            self._prefetch_stream_blocks()
+
     def live_q(self):
         return Q(live=True)
 
@@ -559,6 +578,41 @@ class PageQuerySet(SearchableQuerySetMixin, SpecificQuerySetMixin, TreeQuerySet)
             return clone
         return clone.defer(*streamfield_names)
 
+    def prefetch_stream_blocks(self, *field_names):
+        """
+        Performance optimisation for listing pages.
+        Converts the blocks of the given StreamFields (or of all StreamFields, if no field
+        names are given) for every page in the result at once, calling each child block's
+        ``bulk_to_python`` method once for the whole result rather than once per page.
+        Pages without the given fields, or where they are deferred, are skipped.
+        """
+        clone = self._clone()
+        if not field_names:
+            clone._prefetch_stream_block_fields = ()
+        elif self._prefetch_stream_block_fields != ():
+            clone._prefetch_stream_block_fields = tuple(
+                dict.fromkeys((self._prefetch_stream_block_fields or ()) + field_names)
+            )
+        return clone
+
+    def _prefetch_stream_blocks(self):
+        from wagtail.blocks import StreamValue
+
+        stream_values = []
+        for obj in self._result_cache:
+            if not isinstance(obj, self.model):
+                # values() and values_list() querysets
+                return
+            for field_name in (
+                self._prefetch_stream_block_fields or obj.get_streamfield_names()
+            ):
+                # Look in __dict__ to avoid fetching deferred fields
+                value = obj.__dict__.get(field_name)
+                if isinstance(value, StreamValue):
+                    stream_values.append(value)
+
+        StreamValue.bulk_prefetch_blocks(stream_values)
+
     def in_site(self, site):
         """
         This filters the QuerySet to only contain pages within the specified site.
@@ -53,8 +53,13 @@ def expand_db_html(html):
     """
     Expand database-representation HTML into proper HTML usable on front-end templates
     """
+    from wagtail.rich_text.cache import cached_expand, get_rich_text_cache
+
     rewriter = get_rewriter()
-    return rewriter(html)
+    cache = get_rich_text_cache()
+    if cache is None:
+        return rewriter(html)
+    return cached_expand(html, rewriter, cache)
 
 
 def extract_references_from_rich_text(html):
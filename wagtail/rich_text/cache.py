@@ -0,0 +1,173 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import CharField
+from django.db.models.functions import Cast
+from django.utils import translation
+
+# Bumped whenever a site changes, as that can change the URLs of all pages
+SITES_GENERATION_KEY = "wagtail-richtext-gen-sites"
+
+
+def get_rich_text_cache():
+    """
+    Return the cache that expanded rich text is stored in, as set by the
+    ``WAGTAIL_RICH_TEXT_CACHE`` setting, or ``None`` if caching is disabled.
+    """
+    alias = getattr(settings, "WAGTAIL_RICH_TEXT_CACHE", None)
+    if alias is None:
+        return None
+    return caches[alias]
+
+
+def get_generation_key(model_or_object, object_id):
+    from wagtail.models import ReferenceIndex
+
+    # References are recorded against the base model (such as Page), as they
+    # are in the reference index
+    content_type = ReferenceIndex._get_base_content_type(model_or_object)
+    return f"wagtail-richtext-gen-{content_type.id}-{object_id}"
+
+
+def get_cache_key(html):
+    return "wagtail-richtext-{}-{}".format(
+        hashlib.sha1(html.encode()).hexdigest(), translation.get_language()
+    )
+
+
+def cached_expand(html, rewriter, cache):
+    """
+    Expand the given rich text with ``rewriter``, reusing the result from
+    ``cache`` if none of the objects it references have changed since.
+
+    The cached result is stored along with a generation for each referenced
+    object (and for the site configuration), which is replaced whenever that
+    object changes. The result and the current generations are looked up with
+    a single ``get_many()`` call.
+    """
+    try:
+        generation_keys = [SITES_GENERATION_KEY] + list(
+            dict.fromkeys(
+                get_generation_key(model, object_id)
+                for model, object_id, _, _ in rewriter.extract_references(html)
+            )
+        )
+    except KeyError:
+        # Entities without an ID can't be tracked, but are still expanded
+        return rewriter(html)
+
+    cache_key = get_cache_key(html)
+    cached = cache.get_many([cache_key, *generation_keys])
+    generations = [cached.get(key) for key in generation_keys]
+
+    entry = cached.get(cache_key)
+    if entry is not None and None not in generations and entry[0] == generations:
+        return entry[1]
+
+    store = True
+    for i, key in enumerate(generation_keys):
+        if generations[i] is None:
+            generations[i] = uuid.uuid4().hex
+            # If another process has just set the generation (because the
+            # object has changed), the result can't be tagged with it
+            store = cache.add(key, generations[i], None) and store
+
+    expanded = rewriter(html)
+    if store:
+        cache.set(cache_key, (generations, expanded))
+    return expanded
+
+
+def _bump_generations(cache, keys):
+    cache.set_many({key: uuid.uuid4().hex for key in keys}, None)
+
+
+def invalidate_generations(keys):
+    """
+    Replace the generations with the given keys, so that any expanded rich text
+    tagged with them is expanded again. This is repeated once the current
+    transaction is committed, in case the rich text is expanded from the
+    uncommitted data in the meantime.
+    """
+    cache = get_rich_text_cache()
+    keys = list(keys)
+    if cache is None or not keys:
+        return
+
+    _bump_generations(cache, keys)
+    transaction.on_commit(lambda: _bump_generations(cache, keys))
+
+
+def invalidate_objects(model, object_ids):
+    """
+    Invalidate expanded rich text that references any of the given objects.
+    """
+    invalidate_generations(
+        get_generation_key(model, object_id) for object_id in object_ids
+    )
+
+
+def invalidate_referenced_pages(pages):
+    """
+    Invalidate expanded rich text that references any page in the ``pages``
+    queryset. Only pages that are referenced according to the reference index
+    are invalidated, so that this stays cheap for large querysets.
+    """
+    from wagtail.models import Page, ReferenceIndex
+
+    if get_rich_text_cache() is None:
+        return
+
+    referenced_ids = (
+        ReferenceIndex.objects.filter(
+            to_content_type=ReferenceIndex._get_base_content_type(Page),
+            to_object_id__in=pages.annotate(
+                str_id=Cast("pk", output_field=CharField())
+            ).values("str_id"),
+        )
+        .values_list("to_object_id", flat=True)
+        .distinct()
+    )
+    invalidate_objects(Page, referenced_ids)
+
+
+def get_referenced_models():
+    """
+    Return the models that rich text entities (such as page links and image
+    embeds) can refer to.
+    """
+    from wagtail.rich_text import features
+
+    models = set()
+    for handler in [
+        *features.get_link_types().values(),
+        *features.get_embed_types().values(),
+    ]:
+        try:
+            models.add(handler.get_model())
+        except NotImplementedError:
+            pass
+    return tuple(models)
+
+
+def invalidate_object(instance):
+    """
+    Invalidate expanded rich text that refers to the given object. For pages,
+    rich text linking to its translations is invalidated too, as links point
+    to the translation in the active language.
+    """
+    from wagtail.models import Page
+
+    if get_rich_text_cache() is None or not isinstance(
+        instance, get_referenced_models()
+    ):
+        return
+
+    invalidate_objects(instance, [instance.pk])
+    if isinstance(instance, Page):
+        invalidate_referenced_pages(
+            Page.objects.filter(translation_key=instance.translation_key)
+        )
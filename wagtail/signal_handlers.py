@@ -2,9 +2,12 @@ import logging
 from contextlib import contextmanager
 
 from asgiref.local import Local
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
 from django.core.cache import cache
 from django.db import transaction
 from django.db.models.signals import (
+    m2m_changed,
     post_delete,
     post_migrate,
     post_save,
@@ -12,20 +15,32 @@ from django.db.models.signals import (
     pre_migrate,
 )
 
-from wagtail.models import Locale, Page, ReferenceIndex, Site
+from wagtail.models import GroupPagePermission, Locale, Page, ReferenceIndex, Site
+from wagtail.permission_policies.pages import PagePermissionPolicy
+from wagtail.rich_text import cache as rich_text_cache
+from wagtail.signals import (
+    page_published,
+    page_slug_changed,
+    page_unpublished,
+    post_page_move,
+)
 
 from .tasks import update_reference_index_task
 
 logger = logging.getLogger("wagtail")
 
 
-# Clear the wagtail_site_root_paths from the cache whenever Site records are updated.
+# Clear the wagtail_site_root_paths and site lookup from the cache whenever Site records are updated.
 def post_save_site_signal_handler(instance, update_fields=None, **kwargs):
     Site.clear_site_root_paths_cache()
+    Site.clear_site_lookup_cache()
+    rich_text_cache.invalidate_generations([rich_text_cache.SITES_GENERATION_KEY])
 
 
 def post_delete_site_signal_handler(instance, **kwargs):
     Site.clear_site_root_paths_cache()
+    Site.clear_site_lookup_cache()
+    rich_text_cache.invalidate_generations([rich_text_cache.SITES_GENERATION_KEY])
 
 
 def pre_delete_page_unpublish(sender, instance, **kwargs):
@@ -39,6 +54,39 @@ def post_delete_page_log_deletion(sender, instance, **kwargs):
     logger.info('Page deleted: "%s" id=%d', instance.title, instance.id)
 
 
+# Clear the cache of which page handles each URL path whenever the page tree changes.
+def clear_page_route_cache(**kwargs):
+    Page.clear_route_cache()
+
+
+def post_save_page_clear_route_cache(instance, created=False, **kwargs):
+    if created and isinstance(instance, Page):
+        Page.clear_route_cache()
+
+
+# Invalidate cached rich text that refers to an object (or, for pages, to a page
+# whose URL depends on it) whenever it changes
+def invalidate_rich_text_cache(instance, **kwargs):
+    rich_text_cache.invalidate_object(instance)
+
+
+def invalidate_rich_text_cache_for_descendants(instance, **kwargs):
+    rich_text_cache.invalidate_referenced_pages(
+        Page.objects.descendant_of(instance, inclusive=True)
+    )
+
+
+# Discard page permissions shared between requests whenever permissions, group
+# membership or the paths of pages (which permissions are checked against) change
+def clear_page_permission_cache(**kwargs):
+    PagePermissionPolicy.clear_permission_cache()
+
+
+def user_groups_changed_clear_page_permission_cache(action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        PagePermissionPolicy.clear_permission_cache()
+
+
 def reset_locales_display_names_cache(sender, instance, **kwargs):
     cache.delete("wagtail_locales_display_name")
 
@@ -112,6 +160,32 @@ def register_signal_handlers():
     pre_delete.connect(pre_delete_page_unpublish, sender=Page)
     post_delete.connect(post_delete_page_log_deletion, sender=Page)
 
+    page_published.connect(clear_page_route_cache)
+    page_unpublished.connect(clear_page_route_cache)
+    page_slug_changed.connect(clear_page_route_cache)
+    post_page_move.connect(clear_page_route_cache)
+    post_delete.connect(clear_page_route_cache, sender=Page)
+    # post_save is only sent for the concrete page model, not for Page
+    post_save.connect(post_save_page_clear_route_cache)
+
+    # post_save is sent for the concrete model, so listen for all models
+    post_save.connect(invalidate_rich_text_cache)
+    post_delete.connect(invalidate_rich_text_cache)
+    page_slug_changed.connect(invalidate_rich_text_cache_for_descendants)
+    post_page_move.connect(invalidate_rich_text_cache_for_descendants)
+
+    post_save.connect(clear_page_permission_cache, sender=GroupPagePermission)
+    post_delete.connect(clear_page_permission_cache, sender=GroupPagePermission)
+    # Deleting a group removes its members without sending m2m_changed
+    post_delete.connect(clear_page_permission_cache, sender=Group)
+    post_page_move.connect(clear_page_permission_cache)
+    user_groups = getattr(get_user_model(), "groups", None)
+    if user_groups is not None:
+        m2m_changed.connect(
+            user_groups_changed_clear_page_permission_cache,
+            sender=user_groups.through,
+        )
+
     post_save.connect(reset_locales_display_names_cache, sender=Locale)
     post_delete.connect(reset_locales_display_names_cache, sender=Locale)
 
@@ -7,18 +7,22 @@ class Benchmark:
 
     def test(self):
         timings = []
+        cpu_timings = []
         memory_usage = []
         tracemalloc.start()
 
         for i in range(self.repeat):
             before_memory = tracemalloc.take_snapshot()
             start_time = time.time()
+            start_cpu_time = time.process_time()
 
             self.bench()
 
+            end_cpu_time = time.process_time()
             end_time = time.time()
             after_memory = tracemalloc.take_snapshot()
             timings.append(end_time - start_time)
+            cpu_timings.append(end_cpu_time - start_cpu_time)
             memory_usage.append(
                 sum(
                     [t.size for t in after_memory.compare_to(before_memory, "filename")]
@@ -33,6 +37,14 @@ class Benchmark:
             "avg:",
             sum(timings) / len(timings),
         )
+        print(  # noqa: T201
+            "cpu time min:",
+            min(cpu_timings),
+            "max:",
+            max(cpu_timings),
+            "avg:",
+            sum(cpu_timings) / len(cpu_timings),
+        )
         print(  # noqa: T201
             "memory min:",
             min(memory_usage),
@@ -1,5 +1,7 @@
+from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser, Group, Permission
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 
 from wagtail.models import GroupPagePermission, Page, get_default_page_content_type
 from wagtail.permission_policies.pages import PagePermissionPolicy
@@ -521,3 +523,96 @@ class TestPagePermissionPolicy(PermissionPolicyTestCase):
             ),
             [self.superuser],
         )
+
+
+@override_settings(
+    WAGTAIL_PAGE_PERMISSION_CACHE="default",
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+)
+class TestPagePermissionPolicyWithSharedCache(TestPagePermissionPolicy):
+    """
+    Run the page permission policy tests with permissions shared between
+    requests through the cache, which should give exactly the same results.
+    """
+
+    def setUp(self):
+        cache.clear()
+        super().setUp()
+
+    def get_permissions(self, user):
+        # Simulate a new request, where the user is loaded from the database
+        user = get_user_model()._default_manager.get(pk=user.pk)
+        return self.policy.get_cached_permissions_for_user(user)
+
+    def test_permissions_shared_between_requests(self):
+        self.get_permissions(self.root_editor)
+
+        # Only the user is queried
+        with self.assertNumQueries(1):
+            self.assertResultSetEqual(
+                self.get_permissions(self.root_editor), {self.root_edit_perm}
+            )
+
+    def test_permissions_shared_between_users_in_same_groups(self):
+        other_root_editor = self.create_user(
+            "otherrooteditor", "otherrooteditor@example.com", "password"
+        )
+        other_root_editor.groups.add(self.root_edit_perm.group)
+        self.get_permissions(self.root_editor)
+
+        # Only the user and their groups are queried
+        with self.assertNumQueries(2):
+            self.assertResultSetEqual(
+                self.get_permissions(other_root_editor), {self.root_edit_perm}
+            )
+
+    def test_permission_changes_invalidate_cache(self):
+        self.get_permissions(self.report_editor)
+
+        publish_perm = GroupPagePermission.objects.create(
+            group=self.report_edit_perm.group,
+            page=self.reports_page,
+            permission=Permission.objects.get(
+                content_type=get_default_page_content_type(), codename="publish_page"
+            ),
+        )
+        self.assertResultSetEqual(
+            self.get_permissions(self.report_editor),
+            {self.report_edit_perm, publish_perm},
+        )
+
+        self.report_edit_perm.delete()
+        self.assertResultSetEqual(
+            self.get_permissions(self.report_editor), {publish_perm}
+        )
+
+    def test_group_membership_changes_invalidate_cache(self):
+        self.get_permissions(self.report_editor)
+
+        self.report_editor.groups.add(self.root_edit_perm.group)
+        self.assertResultSetEqual(
+            self.get_permissions(self.report_editor),
+            {self.report_edit_perm, self.root_edit_perm},
+        )
+
+        self.root_edit_perm.group.user_set.remove(self.report_editor)
+        self.assertResultSetEqual(
+            self.get_permissions(self.report_editor), {self.report_edit_perm}
+        )
+
+        self.report_editor.groups.clear()
+        self.assertResultSetEqual(self.get_permissions(self.report_editor), {})
+
+    def test_group_deletion_invalidates_cache(self):
+        self.get_permissions(self.root_editor)
+        self.root_edit_perm.group.delete()
+        self.assertResultSetEqual(self.get_permissions(self.root_editor), {})
+
+    def test_page_move_invalidates_cache(self):
+        self.get_permissions(self.report_editor)
+
+        self.reports_page.move(self.editor_page, pos="last-child")
+        self.reports_page.refresh_from_db()
+
+        (perm,) = self.get_permissions(self.report_editor)
+        self.assertEqual(perm.page.path, self.reports_page.path)
@@ -1,13 +1,14 @@
 import datetime
 import json
 import unittest
-from unittest.mock import Mock
+from unittest.mock import ANY, Mock, patch
 
 from asgiref.sync import async_to_sync
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser, Group
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.core.exceptions import PermissionDenied, ValidationError
 from django.http import Http404
 from django.test import Client, TestCase, override_settings
@@ -364,6 +365,64 @@ class TestSiteRouting(TestCase):
             self.assertEqual(Site.find_for_request(request), self.default_site)
 
 
+@override_settings(
+    WAGTAIL_SITE_LOOKUP_CACHE=True,
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+)
+class TestSiteRoutingWithLookupCache(TestSiteRouting):
+    """
+    Run the site routing tests against the in-memory site lookup, which
+    should resolve sites in exactly the same way as the database query.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_lookup_is_reused(self):
+        request = get_dummy_request(site=self.events_site)
+        with self.assertNumQueries(1):
+            Site.find_for_request(request)
+
+        request = get_dummy_request(site=self.about_site)
+        with self.assertNumQueries(0):
+            self.assertEqual(Site.find_for_request(request), self.about_site)
+
+    def test_site_changes_invalidate_lookup(self):
+        Site.find_for_request(get_dummy_request())
+
+        self.about_site.hostname = "about.example.org"
+        self.about_site.save()
+        request = get_dummy_request()
+        request.META["HTTP_HOST"] = "about.example.org"
+        with self.assertNumQueries(1):
+            self.assertEqual(Site.find_for_request(request), self.about_site)
+
+        self.about_site.delete()
+        request = get_dummy_request()
+        request.META["HTTP_HOST"] = "about.example.org"
+        self.assertEqual(Site.find_for_request(request), self.default_site)
+
+    def test_root_page_changes_invalidate_lookup(self):
+        Site.find_for_request(get_dummy_request(site=self.about_site))
+
+        about_page = self.about_site.root_page
+        about_page.title = "About"
+        about_page.save()
+
+        site = Site.find_for_request(get_dummy_request(site=self.about_site))
+        self.assertEqual(site.root_page.title, "About")
+
+    def test_returns_copies(self):
+        site = Site.find_for_request(get_dummy_request(site=self.about_site))
+        site.root_page.title = "Changed"
+
+        other_site = Site.find_for_request(get_dummy_request(site=self.about_site))
+        self.assertIsNot(other_site, site)
+        self.assertIsNot(other_site.root_page, site.root_page)
+        self.assertEqual(other_site.root_page.title, "About us")
+
+
 class TestRouting(TestCase):
     fixtures = ["test.json"]
 
@@ -550,6 +609,124 @@ class TestRouting(TestCase):
         with self.assertRaises(Http404):
             homepage.route(request, ["events", "tentative-unpublished-event"])
 
+    def create_simple_pages(self):
+        homepage = Page.objects.get(url_path="/home/")
+        section = homepage.add_child(
+            instance=SimplePage(title="Section", slug="section", content="Section")
+        )
+        subsection = section.add_child(
+            instance=SimplePage(
+                title="Subsection", slug="subsection", content="Subsection"
+            )
+        )
+        article = subsection.add_child(
+            instance=SimplePage(title="Article", slug="article", content="Article")
+        )
+        return homepage.specific, article
+
+    def test_route_by_url_path(self):
+        homepage, article = self.create_simple_pages()
+        Page.clear_route_cache()
+
+        request = get_dummy_request(path="/section/subsection/article/")
+        # One query for every page along the path, one for the specific page
+        with self.assertNumQueries(2):
+            (found_page, args, kwargs) = homepage._route_by_url_path(
+                request, ["section", "subsection", "article"]
+            )
+        self.assertEqual(found_page, article)
+        self.assertIsInstance(found_page, SimplePage)
+        with self.assertNumQueries(0):
+            self.assertEqual(found_page.get_parent().slug, "subsection")
+
+        # The page that handles the path is cached, so only that page and its
+        # parent are fetched
+        with self.assertNumQueries(2):
+            (found_page, args, kwargs) = homepage._route_by_url_path(
+                request, ["section", "subsection", "article"]
+            )
+        self.assertEqual(found_page, article)
+        with self.assertNumQueries(0):
+            self.assertEqual(found_page.get_parent().slug, "subsection")
+
+    def test_route_by_url_path_to_child_page(self):
+        homepage, article = self.create_simple_pages()
+        Page.clear_route_cache()
+
+        request = get_dummy_request(path="/section/")
+        homepage._route_by_url_path(request, ["section"])
+
+        # The parent of a cached child page is the page routing the request
+        with self.assertNumQueries(1):
+            (found_page, args, kwargs) = homepage._route_by_url_path(
+                request, ["section"]
+            )
+        self.assertEqual(found_page.slug, "section")
+        with self.assertNumQueries(0):
+            self.assertEqual(found_page.get_parent(), homepage)
+
+    def test_route_by_url_path_hands_over_to_overridden_route(self):
+        homepage = Page.objects.get(url_path="/home/").specific
+        christmas_page = EventPage.objects.get(url_path="/home/events/christmas/")
+
+        # EventIndex overrides route(), so routing continues from there
+        request = get_dummy_request(path="/events/christmas/")
+        with patch.object(
+            EventIndex, "route", autospec=True, side_effect=EventIndex.route
+        ) as route:
+            (found_page, args, kwargs) = homepage._route_by_url_path(
+                request, ["events", "christmas"]
+            )
+        self.assertEqual(found_page, christmas_page)
+        route.assert_called_once_with(ANY, request, ["christmas"])
+
+    def test_route_by_url_path_to_unknown_page_returns_404(self):
+        homepage, article = self.create_simple_pages()
+
+        request = get_dummy_request(path="/section/subsection/unknown/")
+        with self.assertRaises(Http404):
+            homepage._route_by_url_path(request, ["section", "subsection", "unknown"])
+        with self.assertRaises(Http404):
+            homepage._route_by_url_path(request, ["unknown", "subsection", "article"])
+
+    def test_route_by_url_path_to_unpublished_page_returns_404(self):
+        homepage, article = self.create_simple_pages()
+
+        request = get_dummy_request(path="/section/subsection/article/")
+        homepage._route_by_url_path(request, ["section", "subsection", "article"])
+
+        article.unpublish()
+        with self.assertRaises(Http404):
+            homepage._route_by_url_path(request, ["section", "subsection", "article"])
+
+    def test_route_by_url_path_after_move(self):
+        homepage, article = self.create_simple_pages()
+        section = Page.objects.get(url_path="/home/section/")
+
+        request = get_dummy_request(path="/section/subsection/article/")
+        homepage._route_by_url_path(request, ["section", "subsection", "article"])
+
+        article.move(section, pos="last-child")
+        with self.assertRaises(Http404):
+            homepage._route_by_url_path(request, ["section", "subsection", "article"])
+        (found_page, args, kwargs) = homepage._route_by_url_path(
+            request, ["section", "article"]
+        )
+        self.assertEqual(found_page, article)
+
+    def test_route_by_url_path_ignores_stale_cache_entries(self):
+        homepage, article = self.create_simple_pages()
+
+        request = get_dummy_request(path="/section/subsection/article/")
+        homepage._route_by_url_path(request, ["section", "subsection", "article"])
+
+        # A change made without sending signals (e.g. from another process)
+        Page.objects.filter(pk=article.pk).update(
+            slug="renamed", url_path="/home/section/subsection/renamed/"
+        )
+        with self.assertRaises(Http404):
+            homepage._route_by_url_path(request, ["section", "subsection", "article"])
+
     # Override CACHES so we don't generate any cache-related SQL queries (tests use DatabaseCache
     # otherwise) and so cache.get will always return None.
     @override_settings(
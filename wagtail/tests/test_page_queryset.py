@@ -1,3 +1,4 @@
+import json
 from io import StringIO
 from unittest import mock
 
@@ -7,6 +8,8 @@ from django.core import management
 from django.db.models import Count, Q
 from django.test import TestCase, TransactionTestCase
 
+from wagtail.images import get_image_model
+from wagtail.images.tests.utils import get_test_image_file
 from wagtail.models import Locale, Page, PageViewRestriction, Site, Workflow
 from wagtail.search.query import MATCH_ALL
 from wagtail.signals import page_unpublished
@@ -1365,3 +1368,89 @@ class TestFirstCommonAncestor(TestCase):
             self.assertNotIn("body", page.__dict__)
             with self.assertNumQueries(1):
                 page.body
+
+
+class TestPrefetchStreamBlocks(TestCase):
+    fixtures = ["test.json"]
+
+    def setUp(self):
+        self.root_page = Page.objects.get(url_path="/home/")
+        self.images = [
+            get_image_model().objects.create(
+                title=f"Image {i}", file=get_test_image_file()
+            )
+            for i in range(3)
+        ]
+        for i, image in enumerate(self.images):
+            self.root_page.add_child(
+                instance=StreamPage(
+                    title=f"Stream page {i}",
+                    body=json.dumps(
+                        [
+                            {"type": "text", "value": "foo"},
+                            {"type": "image", "value": image.pk},
+                            {
+                                "type": "image_with_alt",
+                                "value": {
+                                    "image": image.pk,
+                                    "alt_text": "alt",
+                                    "decorative": False,
+                                },
+                            },
+                        ]
+                    ),
+                )
+            )
+
+    def test_without_prefetch(self):
+        pages = list(StreamPage.objects.order_by("pk"))
+        with self.assertNumQueries(3):
+            for page in pages:
+                page.body[1].value
+
+    def test_prefetch_stream_blocks(self):
+        with self.assertNumQueries(3):
+            # One query for the pages, and one for the images of each block type
+            pages = list(
+                StreamPage.objects.order_by("pk").prefetch_stream_blocks("body")
+            )
+
+        with self.assertNumQueries(0):
+            self.assertEqual([page.body[1].value for page in pages], self.images)
+            self.assertEqual(
+                [page.body[2].value.pk for page in pages],
+                [image.pk for image in self.images],
+            )
+            self.assertEqual([page.body[0].value for page in pages], ["foo"] * 3)
+            self.assertEqual(pages[0].body[2].value.contextual_alt_text, "alt")
+
+    def test_prefetch_all_streamfields_of_specific_pages(self):
+        queryset = (
+            Page.objects.child_of(self.root_page)
+            .specific()
+            .prefetch_stream_blocks()
+            .order_by("pk")
+        )
+        pages = [page for page in queryset if isinstance(page, StreamPage)]
+        self.assertEqual(len(pages), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual([page.body[1].value for page in pages], self.images)
+
+    def test_deferred_streamfields_are_skipped(self):
+        with self.assertNumQueries(1):
+            pages = list(
+                StreamPage.objects.defer_streamfields().prefetch_stream_blocks("body")
+            )
+        self.assertNotIn("body", pages[0].__dict__)
+
+    def test_prefetched_values_are_unchanged(self):
+        page = StreamPage.objects.prefetch_stream_blocks("body").get(
+            pk=StreamPage.objects.first().pk
+        )
+        fresh_page = StreamPage.objects.get(pk=page.pk)
+        self.assertEqual(page.body.get_prep_value(), fresh_page.body.get_prep_value())
+
+    def test_values_queryset(self):
+        self.assertEqual(
+            len(StreamPage.objects.prefetch_stream_blocks("body").values("pk")), 3
+        )
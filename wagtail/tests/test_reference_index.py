@@ -1,10 +1,14 @@
+import json
+import multiprocessing
+import os
+import tempfile
 from io import StringIO
 
 from django.contrib.contenttypes.models import ContentType
 from django.core import management
 from django.core.exceptions import FieldDoesNotExist
-from django.db import models
-from django.test import TestCase
+from django.db import connection, models
+from django.test import TestCase, TransactionTestCase
 from django.utils.functional import SimpleLazyObject
 
 from wagtail.blocks import StreamValue, StructValue
@@ -312,6 +316,147 @@ class TestCreateOrUpdateForObject(TestCase):
         self.assertEqual(refs.count(), 1)
 
 
+class RebuildReferencesIndexMixin:
+    fixtures = ["test.json"]
+
+    def get_references(self):
+        return set(
+            ReferenceIndex.objects.values_list(
+                "content_type_id",
+                "base_content_type_id",
+                "object_id",
+                "to_content_type_id",
+                "to_object_id",
+                "model_path",
+                "content_path",
+                "content_path_hash",
+            )
+        )
+
+    def rebuild(self, **options):
+        stdout = StringIO()
+        management.call_command("rebuild_references_index", stdout=stdout, **options)
+        return stdout.getvalue()
+
+
+class TestRebuildReferencesIndexBulk(RebuildReferencesIndexMixin, TestCase):
+    def setUp(self):
+        self.state_file = os.path.join(tempfile.mkdtemp(), "state.json")
+        self.addCleanup(
+            lambda: os.path.exists(self.state_file) and os.remove(self.state_file)
+        )
+
+    def test_bulk_rebuild_matches_rebuild(self):
+        self.rebuild()
+        expected = self.get_references()
+        self.assertTrue(expected)
+
+        ReferenceIndex.objects.all().delete()
+        output = self.rebuild(bulk=True, chunk_size=2)
+
+        self.assertEqual(self.get_references(), expected)
+        self.assertIn("objects/s", output)
+
+    def test_bulk_rebuild_clears_stale_references(self):
+        self.rebuild()
+        expected = self.get_references()
+        ReferenceIndex.objects.create(
+            content_type=ContentType.objects.get_for_model(Page),
+            base_content_type=ContentType.objects.get_for_model(Page),
+            object_id="2",
+            to_content_type=ContentType.objects.get_for_model(Page),
+            to_object_id="12345",
+            model_path="stale",
+            content_path="stale",
+            content_path_hash=ReferenceIndex._get_content_path_hash("stale"),
+        )
+
+        self.rebuild(bulk=True)
+
+        self.assertEqual(self.get_references(), expected)
+
+    def test_bulk_rebuild_with_state_file(self):
+        self.rebuild()
+        expected = self.get_references()
+
+        self.rebuild(bulk=True, state_file=self.state_file)
+
+        self.assertEqual(self.get_references(), expected)
+        # The state file is removed once the rebuild is complete
+        self.assertFalse(os.path.exists(self.state_file))
+
+    def test_bulk_rebuild_resumes_from_state_file(self):
+        self.rebuild()
+        expected = self.get_references()
+
+        # Simulate a rebuild that stopped part of the way through the event pages
+        event_page_ids = sorted(EventPage.objects.values_list("pk", flat=True))
+        last_pk = event_page_ids[0]
+        completed = [
+            model._meta.label
+            for model in ReferenceIndex.indexed_models
+            if model is not EventPage
+        ]
+        ReferenceIndex.objects.filter(
+            content_type=ContentType.objects.get_for_model(EventPage)
+        ).exclude(object_id=str(last_pk)).delete()
+        with open(self.state_file, "w") as f:
+            json.dump(
+                {
+                    "completed": completed,
+                    "model": EventPage._meta.label,
+                    "last_pk": last_pk,
+                },
+                f,
+            )
+
+        output = self.rebuild(bulk=True, state_file=self.state_file)
+
+        self.assertIn("Resuming reference index rebuild", output)
+        self.assertEqual(self.get_references(), expected)
+        self.assertFalse(os.path.exists(self.state_file))
+
+    def test_workers_without_bulk(self):
+        with self.assertRaisesMessage(
+            management.CommandError, "--workers and --state_file require --bulk"
+        ):
+            self.rebuild(workers=2)
+
+    def test_workers_with_in_memory_database(self):
+        if not (connection.vendor == "sqlite" and connection.is_in_memory_db()):
+            self.skipTest("Requires an in-memory SQLite database")
+
+        with self.assertRaisesMessage(
+            management.CommandError,
+            "--workers cannot be used with an in-memory database",
+        ):
+            self.rebuild(bulk=True, workers=2)
+
+
+class TestRebuildReferencesIndexWorkers(
+    RebuildReferencesIndexMixin, TransactionTestCase
+):
+    # The workers use their own database connections, so the data must be
+    # committed, in a database they can open
+
+    def setUp(self):
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.skipTest("Workers can't share an in-memory database")
+        if multiprocessing.current_process().daemon:
+            # Such as when running with --parallel
+            self.skipTest("daemonic processes can't start workers")
+
+    def test_rebuild_with_workers(self):
+        self.rebuild()
+        expected = self.get_references()
+        self.assertTrue(expected)
+
+        ReferenceIndex.objects.all().delete()
+        self.rebuild(bulk=True, workers=2, chunk_size=2)
+
+        self.assertEqual(self.get_references(), expected)
+
+
 class TestDescribeOnDelete(TestCase):
     fixtures = ["test.json"]
 
@@ -1,10 +1,13 @@
 from unittest.mock import patch
 
+from django.core.cache import cache
 from django.forms.models import modelform_factory
 from django.test import TestCase, override_settings
 from django.utils import translation
 
 from wagtail.fields import RichTextField
+from wagtail.images.models import Image
+from wagtail.images.tests.utils import get_test_image_file
 from wagtail.models import Locale, Page, Site
 from wagtail.rich_text import (
     RichText,
@@ -219,6 +222,101 @@ This is another image: <embed embedtype="image" id="2" format="left" />
         )
 
 
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        },
+        "renditions": {
+            "BACKEND": "django.core.cache.backends.dummy.DummyCache",
+        },
+    },
+    WAGTAIL_RICH_TEXT_CACHE="default",
+)
+class TestExpandDbHtmlCache(TestCase):
+    fixtures = ["test.json"]
+
+    def setUp(self):
+        cache.clear()
+        self.christmas_page = Page.objects.get(url_path="/home/events/christmas/")
+        self.html = '<a linktype="page" id="%d">Christmas</a>' % self.christmas_page.pk
+
+    def test_cached(self):
+        expected = '<a href="/events/christmas/">Christmas</a>'
+        self.assertEqual(expand_db_html(self.html), expected)
+        with self.assertNumQueries(0):
+            self.assertEqual(expand_db_html(self.html), expected)
+
+    @override_settings(WAGTAIL_RICH_TEXT_CACHE=None)
+    def test_disabled(self):
+        expand_db_html(self.html)
+        with self.assertNumQueries(2):
+            expand_db_html(self.html)
+
+    def test_page_change_invalidates(self):
+        expand_db_html(self.html)
+
+        self.christmas_page.slug = "xmas"
+        self.christmas_page.save()
+
+        self.assertEqual(
+            expand_db_html(self.html), '<a href="/events/xmas/">Christmas</a>'
+        )
+
+    def test_page_delete_invalidates(self):
+        expand_db_html(self.html)
+
+        self.christmas_page.delete()
+
+        self.assertEqual(expand_db_html(self.html), "<a>Christmas</a>")
+
+    def test_parent_slug_change_invalidates_referenced_descendants(self):
+        # Record the link to the Christmas page in the reference index
+        linking_page = EventPage.objects.get(url_path="/home/events/final-event/")
+        linking_page.body = self.html
+        linking_page.save()
+        expand_db_html(self.html)
+
+        events_page = Page.objects.get(url_path="/home/events/")
+        events_page.slug = "whats-on"
+        with self.captureOnCommitCallbacks(execute=True):
+            events_page.save()
+
+        self.assertEqual(
+            expand_db_html(self.html), '<a href="/whats-on/christmas/">Christmas</a>'
+        )
+
+    def test_site_change_invalidates(self):
+        expand_db_html(self.html)
+
+        Site.objects.create(
+            hostname="other.example.com", root_page=Page.objects.get(url_path="/home/")
+        )
+
+        self.assertEqual(
+            expand_db_html(self.html),
+            '<a href="http://localhost/events/christmas/">Christmas</a>',
+        )
+
+    def test_rendition_delete_invalidates(self):
+        image = Image.objects.create(title="Test image", file=get_test_image_file())
+        html = '<embed embedtype="image" id="%d" format="left" />' % image.pk
+        expand_db_html(html)
+        with self.assertNumQueries(0):
+            expand_db_html(html)
+
+        image.renditions.all().delete()
+
+        # The rendition is generated again, rather than its URL served from the cache
+        expand_db_html(html)
+        self.assertEqual(image.renditions.count(), 1)
+
+    def test_cached_per_language(self):
+        expand_db_html(self.html)
+        with translation.override("fr"), self.assertNumQueries(2):
+            expand_db_html(self.html)
+
+
 class TestRichTextValue(TestCase):
     fixtures = ["test.json"]
 
@@ -1,15 +1,19 @@
 import hashlib
+import multiprocessing
 import os
 import pickle
 import tempfile
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 from pathlib import Path
 
+from django.apps import apps
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ImproperlyConfigured, SuspiciousOperation
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import SimpleTestCase, TestCase, override_settings
 from django.utils.text import slugify
 from django.utils.translation import _trans
@@ -31,6 +35,14 @@ from wagtail.coreutils import (
 )
 from wagtail.models import Page, Site
 from wagtail.utils.file import hash_filelike
+from wagtail.utils.parallel import (
+    in_order,
+    load_state,
+    pk_chunks,
+    save_state,
+    worker_pool,
+)
+from wagtail.utils.sendfile_streaming_backend import parse_range_header
 from wagtail.utils.templates import template_is_overridden
 from wagtail.utils.utils import deep_update, flatten_choices
 from wagtail.utils.version import get_main_version
@@ -655,3 +667,94 @@ class TestFlattenChoices(SimpleTestCase):
                 "unknown": "Unknown",
             },
         )
+
+
+class TestParseRangeHeader(SimpleTestCase):
+    def test_single_ranges(self):
+        self.assertEqual(parse_range_header("bytes=0-99", 1000), [(0, 99)])
+        self.assertEqual(parse_range_header("bytes=500-", 1000), [(500, 999)])
+        self.assertEqual(parse_range_header("bytes=-100", 1000), [(900, 999)])
+        # Ranges are clipped to the end of the file
+        self.assertEqual(parse_range_header("bytes=900-2000", 1000), [(900, 999)])
+        self.assertEqual(parse_range_header("bytes=-2000", 1000), [(0, 999)])
+
+    def test_multiple_ranges_are_sorted_and_coalesced(self):
+        self.assertEqual(
+            parse_range_header("bytes=500-599, 0-99", 1000), [(0, 99), (500, 599)]
+        )
+        self.assertEqual(
+            parse_range_header("bytes=0-99, 50-199, 200-299", 1000), [(0, 299)]
+        )
+
+    def test_unsatisfiable(self):
+        self.assertEqual(parse_range_header("bytes=1000-", 1000), [])
+        self.assertEqual(parse_range_header("bytes=-0", 1000), [])
+        self.assertEqual(parse_range_header("bytes=0-", 0), [])
+        # Satisfiable ranges are kept
+        self.assertEqual(parse_range_header("bytes=2000-3000, 0-9", 1000), [(0, 9)])
+
+    def test_invalid(self):
+        self.assertIsNone(parse_range_header("bytes=", 1000))
+        self.assertIsNone(parse_range_header("bytes=-", 1000))
+        self.assertIsNone(parse_range_header("bytes=abc", 1000))
+        self.assertIsNone(parse_range_header("bytes=10-5", 1000))
+        self.assertIsNone(parse_range_header("items=0-5", 1000))
+        self.assertIsNone(parse_range_header("bytes=" + ",".join(["0-1"] * 100), 1000))
+
+
+def get_worker_state():
+    return apps.ready, connection.settings_dict["NAME"]
+
+
+class TestParallel(TestCase):
+    def test_pk_chunks(self):
+        pks = list(Page.objects.order_by("pk").values_list("pk", flat=True))
+        self.assertEqual(
+            [pk for chunk in pk_chunks(Page.objects.all(), 1) for pk in chunk], pks
+        )
+        self.assertEqual(list(pk_chunks(Page.objects.all(), 10, pks[0])), [pks[1:]])
+        self.assertEqual(list(pk_chunks(Page.objects.all(), 10, pks[-1])), [])
+
+    def test_in_order(self):
+        chunks = [[3, 1], [2], [5, 4]]
+        expected = [(chunk, sorted(chunk)) for chunk in chunks]
+        self.assertEqual(list(in_order(sorted, chunks)), expected)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            for lookahead in (1, 2, 5):
+                with self.subTest(lookahead=lookahead):
+                    self.assertEqual(
+                        list(in_order(sorted, chunks, executor, lookahead)), expected
+                    )
+
+    def test_state(self):
+        state_file = os.path.join(tempfile.mkdtemp(), "state.json")
+        self.addCleanup(os.rmdir, os.path.dirname(state_file))
+        self.addCleanup(os.remove, state_file)
+
+        self.assertIsNone(load_state(state_file))
+        self.assertIsNone(load_state(None))
+        save_state(None, {"last_pk": 1})
+
+        save_state(state_file, {"last_pk": 1})
+        save_state(state_file, {"last_pk": 2})
+        self.assertEqual(load_state(state_file), {"last_pk": 2})
+        self.assertFalse(os.path.exists(state_file + ".tmp"))
+
+    def test_worker_pool_without_workers(self):
+        with worker_pool(1) as executor:
+            self.assertIsNone(executor)
+
+    def test_worker_pool_with_spawned_workers(self):
+        if multiprocessing.current_process().daemon:
+            # Such as when running with --parallel
+            self.skipTest("daemonic processes can't start workers")
+
+        # Spawned workers start a fresh interpreter, so they must set up Django
+        # and use the same database as this process
+        spawn = multiprocessing.get_context("spawn")
+        with worker_pool(2, mp_context=spawn) as executor:
+            self.assertEqual(
+                executor.submit(get_worker_state).result(),
+                (True, connection.settings_dict["NAME"]),
+            )
@@ -1,3 +1,7 @@
+import threading
+from collections import OrderedDict
+
+
 class RouteResult:
     """
     An object to be returned from Page.route, which encapsulates
@@ -14,3 +18,48 @@ class RouteResult:
 
     def __getitem__(self, index):
         return (self.page, self.args, self.kwargs)[index]
+
+
+class PageRouteCache:
+    """
+    A per-process LRU cache of the page that handles a URL path below a site
+    root page, used by ``Page.route_for_request``.
+
+    Entries are ``(page_id, content_type_id, consumed)`` tuples, where
+    ``consumed`` is the number of path components up to and including that
+    page. Cached entries are only hints: the page is fetched again on every
+    request and its ``url_path`` and content type checked, so an entry made
+    stale by a change in another process is never trusted. Changes in this
+    process clear the cache through signal handlers.
+    """
+
+    def __init__(self, maxsize=1000):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                self._entries.move_to_end(key)
+            except KeyError:
+                return None
+            return self._entries[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+page_route_cache = PageRouteCache()
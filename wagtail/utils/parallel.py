@@ -0,0 +1,139 @@
+"""
+Helpers for management commands that work through large tables in chunks of
+primary keys, optionally on several worker processes, recording their
+progress in a state file so that an interrupted run can be resumed.
+"""
+
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import django
+from django.apps import apps
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+
+
+def init_worker(database_settings):
+    """
+    Prepare a worker process to use the ORM, with the same databases as the
+    process that started it.
+    """
+    # Workers that aren't forked (with the "spawn" or "forkserver" start
+    # methods) run in a fresh interpreter, where Django isn't set up yet
+    if not apps.ready:
+        django.setup()
+
+    # Worker processes must not share the parent process's database
+    # connections. The parent's database settings are used rather than those
+    # in the settings module, as they may have been changed at runtime (such
+    # as by the test runner).
+    for alias, settings_dict in database_settings.items():
+        conn = connections[alias]
+        conn.close()
+        conn.settings_dict.update(settings_dict)
+
+
+@contextmanager
+def worker_pool(workers, mp_context=None):
+    """
+    Yield a pool of ``workers`` processes, or ``None`` if ``workers`` is 1 so
+    that the work is done in the current process. Work that hasn't started is
+    cancelled on exit.
+
+    The workers are started with the platform's default start method, or with
+    the given ``multiprocessing`` context.
+    """
+    if workers <= 1:
+        yield None
+        return
+
+    # Start the workers while there are no open connections for them to inherit
+    connections.close_all()
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=mp_context,
+        initializer=init_worker,
+        initargs=(
+            {conn.alias: dict(conn.settings_dict) for conn in connections.all()},
+        ),
+    )
+    try:
+        executor.submit(int).result()
+        yield executor
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def pk_chunks(queryset, chunk_size, last_pk=None):
+    """
+    Yield the primary keys of the queryset's objects in ascending order, in
+    lists of at most ``chunk_size``, starting after ``last_pk``. Each chunk is
+    fetched by a separate query, so objects added or removed in the meantime
+    don't shift the following chunks.
+    """
+    queryset = queryset.order_by("pk").values_list("pk", flat=True)
+    while True:
+        chunk_queryset = queryset
+        if last_pk is not None:
+            chunk_queryset = chunk_queryset.filter(pk__gt=last_pk)
+        pks = list(chunk_queryset[:chunk_size])
+        if not pks:
+            break
+        yield pks
+        last_pk = pks[-1]
+
+
+def in_order(func, chunks, executor=None, lookahead=1):
+    """
+    Call ``func(chunk)`` for each of the chunks and yield ``(chunk, result)``
+    pairs in the order of the chunks.
+
+    With an ``executor``, up to ``lookahead`` further chunks are submitted to
+    it before waiting for each result, so that the workers stay busy while the
+    results are handled in order (and the recorded progress is always
+    accurate). ``func`` must then be picklable, such as a module-level function
+    or a ``functools.partial`` of one.
+    """
+    pending = deque()
+    for chunk in chunks:
+        if executor is None:
+            yield chunk, func(chunk)
+            continue
+
+        pending.append((chunk, executor.submit(func, chunk)))
+        if len(pending) > lookahead:
+            chunk, future = pending.popleft()
+            yield chunk, future.result()
+
+    while pending:
+        chunk, future = pending.popleft()
+        yield chunk, future.result()
+
+
+def load_state(state_file):
+    """
+    Return the state saved in ``state_file``, or ``None`` if there is no file.
+    """
+    if not state_file or not os.path.exists(state_file):
+        return None
+
+    with open(state_file) as f:
+        return json.load(f)
+
+
+def save_state(state_file, state):
+    """
+    Save ``state`` as JSON to ``state_file``, if given.
+    """
+    if not state_file:
+        return
+
+    # Write to a temporary file first so that an interruption never leaves
+    # a partially written state behind
+    temp_file = state_file + ".tmp"
+    with open(temp_file, "w") as f:
+        json.dump(state, f, cls=DjangoJSONEncoder)
+    os.replace(temp_file, state_file)
@@ -1,27 +1,76 @@
 # Sendfile "streaming" backend
 # This is based on sendfiles builtin "simple" backend but uses a StreamingHttpResponse
+#
+# It also implements HTTP range requests (RFC 7233), so that video seeking and
+# resumed downloads only transfer the requested bytes. Single-range responses are
+# still served as a FileResponse over the open file, so WSGI servers that implement
+# wsgi.file_wrapper with os.sendfile (such as gunicorn) can send them zero-copy.
 
 import os
+import re
 import stat
+import uuid
 from email.utils import mktime_tz, parsedate_tz
 
-from django.http import FileResponse, HttpResponseNotModified
+from django.http import (
+    FileResponse,
+    HttpResponse,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
 from django.utils.http import http_date
 
+# Range requests with more ranges than this are served as a full response,
+# as RFC 7233 allows, to avoid the overhead of serving many tiny parts
+MAX_RANGES = 20
 
-def sendfile(request, filename, **kwargs):
+BYTE_RANGE_RE = re.compile(r"^\s*(\d*)\s*-\s*(\d*)\s*$")
+
+CHUNK_SIZE = 4096
+
+
+def sendfile(request, filename, mimetype=None, etag=None, **kwargs):
     # Respect the If-Modified-Since header.
     statobj = os.stat(filename)
+    mtime = statobj[stat.ST_MTIME]
+    size = statobj[stat.ST_SIZE]
 
     if not was_modified_since(
         request.headers.get("if-modified-since"),
-        statobj[stat.ST_MTIME],
+        mtime,
     ):
         return HttpResponseNotModified()
 
-    response = FileResponse(open(filename, "rb"))
+    mimetype = mimetype or "application/octet-stream"
+
+    ranges = None
+    range_header = request.headers.get("range")
+    if (
+        range_header
+        and request.method in ("GET", "HEAD")
+        and if_range_matches(request.headers.get("if-range"), mtime, etag)
+    ):
+        ranges = parse_range_header(range_header, size)
+
+    if ranges is None:
+        response = FileResponse(open(filename, "rb"))
+    elif not ranges:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+    elif len(ranges) == 1:
+        start, end = ranges[0]
+        response = FileResponse(
+            FileRange(open(filename, "rb"), start, end - start + 1),
+            status=206,
+            content_type=mimetype,
+        )
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Length"] = end - start + 1
+    else:
+        response = multipart_byteranges_response(filename, ranges, size, mimetype)
 
-    response["Last-Modified"] = http_date(statobj[stat.ST_MTIME])
+    response["Accept-Ranges"] = "bytes"
+    response["Last-Modified"] = http_date(mtime)
     return response
 
 
@@ -48,3 +97,159 @@ def was_modified_since(header=None, mtime=0):
     except (ValueError, OverflowError):
         return True
     return False
+
+
+def if_range_matches(header=None, mtime=0, etag=None):
+    """
+    Should the Range header be honoured, according to the If-Range header?
+
+    header
+      This is the value of the If-Range header. If this is None, the Range
+      header always applies.
+
+    mtime
+      This is the modification time of the item we're talking about.
+
+    etag
+      This is the (quoted) entity tag of the item, if known. Only a strong
+      comparison can match, so weak entity tags in If-Range never do.
+    """
+    if header is None:
+        return True
+
+    header = header.strip()
+    if header.startswith(('"', "W/")):
+        return etag is not None and not header.startswith("W/") and header == etag
+
+    try:
+        header_date = parsedate_tz(header)
+        if header_date is None:
+            return False
+        return mktime_tz(header_date) == mtime
+    except (ValueError, OverflowError):
+        return False
+
+
+def parse_range_header(header, size):
+    """
+    Parse a Range header into a list of inclusive (start, end) byte offsets
+    into a file of the given size.
+
+    Returns None if the header is syntactically invalid, uses a unit other
+    than bytes, or asks for too many ranges, meaning it should be ignored.
+    Returns an empty list if no range is satisfiable (i.e. a 416 response).
+    Overlapping and adjacent ranges are coalesced.
+    """
+    unit, _, specs = header.partition("=")
+    if unit.strip().lower() != "bytes" or not specs.strip():
+        return None
+
+    specs = specs.split(",")
+    if len(specs) > MAX_RANGES:
+        return None
+
+    ranges = []
+    for spec in specs:
+        match = BYTE_RANGE_RE.match(spec)
+        if not match:
+            return None
+        first, last = match.groups()
+
+        if first:
+            start = int(first)
+            if last:
+                end = int(last)
+                if end < start:
+                    return None
+            else:
+                end = size - 1
+        elif last:
+            # Suffix range: the last N bytes of the file
+            suffix_length = int(last)
+            if suffix_length == 0:
+                continue
+            start = max(size - suffix_length, 0)
+            end = size - 1
+        else:
+            return None
+
+        if start >= size:
+            # Unsatisfiable, but other ranges may still be satisfiable
+            continue
+        ranges.append((start, min(end, size - 1)))
+
+    ranges.sort()
+    coalesced = []
+    for start, end in ranges:
+        if coalesced and start <= coalesced[-1][1] + 1:
+            coalesced[-1] = (coalesced[-1][0], max(coalesced[-1][1], end))
+        else:
+            coalesced.append((start, end))
+    return coalesced
+
+
+class FileRange:
+    """
+    A file-like object exposing ``length`` bytes of ``file`` from ``start``.
+
+    The underlying file is positioned at ``start`` and ``fileno()`` is passed
+    through, so that a wsgi.file_wrapper using os.sendfile can send the range
+    from the file descriptor directly (bounded by the Content-Length header).
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        self.file.seek(start)
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def multipart_byteranges_response(filename, ranges, size, mimetype):
+    boundary = uuid.uuid4().hex
+    part_headers = [
+        (
+            f"\r\n--{boundary}\r\n"
+            f"Content-Type: {mimetype}\r\n"
+            f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+        ).encode("ascii")
+        for start, end in ranges
+    ]
+    closing = f"\r\n--{boundary}--\r\n".encode("ascii")
+
+    def stream():
+        with open(filename, "rb") as f:
+            for part_header, (start, end) in zip(part_headers, ranges):
+                yield part_header
+                f.seek(start)
+                remaining = end - start + 1
+                while remaining > 0:
+                    data = f.read(min(CHUNK_SIZE, remaining))
+                    if not data:
+                        break
+                    remaining -= len(data)
+                    yield data
+            yield closing
+
+    response = StreamingHttpResponse(
+        stream(),
+        status=206,
+        content_type=f"multipart/byteranges; boundary={boundary}",
+    )
+    response["Content-Length"] = (
+        sum(len(part_header) for part_header in part_headers)
+        + sum(end - start + 1 for start, end in ranges)
+        + len(closing)
+    )
+    return response